@@ -18,6 +18,9 @@ from pymongo import MongoClient
 import pandas as pd
 from geopy.distance import geodesic
 
+from summarizer import Summarizer
+from geocoder import open_geocoder
+
 # Configuration du logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +35,13 @@ MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017/")
 NOTIFICATION_SERVICE_URL = os.environ.get("NOTIFICATION_SERVICE_URL", "http://notification-service:5003")
 DASHBOARD_SERVICE_URL = os.environ.get("DASHBOARD_SERVICE_URL", "http://dashboard-service:5004")
 
+# Résumés d'incidents
+SUMMARY_MAX_LENGTH = int(os.environ.get("INCIDENT_SUMMARY_MAX_LENGTH", "300"))
+SUMMARY_CACHE_SIZE = int(os.environ.get("INCIDENT_SUMMARY_CACHE_SIZE", "1024"))
+
+# Index local de géocodage des voies et lieux (voir geocoder.py)
+GEOCODER_INDEX = os.environ.get("GEOCODER_INDEX", "data/geocoder")
+
 class CrisisDetector:
     """
     Détecteur d'anomalies et gestionnaire de crises pour le projet ECHO.
@@ -57,6 +67,13 @@ class CrisisDetector:
             n_estimators=100
         )
         
+        # Résumé extractif des rapports d'un incident (mis en cache: un même groupe
+        # de rapports est souvent réévalué d'un traitement à l'autre)
+        self.summarizer = Summarizer(cache_size=SUMMARY_CACHE_SIZE)
+        
+        # Géocodage hors ligne des rapports sans coordonnées (None si l'index est absent)
+        self.geocoder = open_geocoder(GEOCODER_INDEX)
+        
         # Chargement des services d'urgence
         self.emergency_services = self._load_emergency_services("data/emergency_services.json")
         
@@ -179,6 +196,9 @@ class CrisisDetector:
         Returns:
             Liste de clusters (groupes) de rapports
         """
+        # Position déduite des lieux cités pour les rapports qui n'en ont pas
+        self.geocode_reports(reports)
+        
         # Filtrer les rapports sans coordonnées
         geo_reports = [r for r in reports if r.get("location") and "lat" in r.get("location", {}) and "lng" in r.get("location", {})]
         
@@ -216,6 +236,38 @@ class CrisisDetector:
         logger.info(f"Créé {len(clusters)} clusters géographiques")
         return clusters
     
+    def geocode_reports(self, reports: List[Dict[str, Any]]) -> int:
+        """
+        Complète la position des rapports sans coordonnées à partir des voies et
+        lieux reconnus par le moteur NLP (index local, sans service externe).
+        La commune du rapport (champ commune ou location.commune, à défaut les
+        villes citées) départage les voies homonymes.
+        
+        Args:
+            reports: Rapports à compléter (modifiés en place)
+            
+        Returns:
+            Nombre de rapports géocodés
+        """
+        if self.geocoder is None:
+            return 0
+        
+        geocoded = 0
+        for report in reports:
+            location = report.get("location") or {}
+            if "lat" in location and "lng" in location:
+                continue
+            entities = report.get("entities") or (report.get("nlp_analysis") or {}).get("entities") or []
+            commune = report.get("commune") or location.get("commune")
+            position = self.geocoder.geocode_entities(entities, commune)
+            if position:
+                report["location"] = {**location, **position}
+                geocoded += 1
+        
+        if geocoded:
+            logger.info(f"{geocoded} rapports géocodés à partir des lieux cités")
+        return geocoded
+    
     def evaluate_incident_severity(self, reports: List[Dict[str, Any]]) -> int:
         """
         Évalue la sévérité d'un incident basé sur plusieurs rapports.
@@ -268,13 +320,34 @@ class CrisisDetector:
         logger.debug(f"Sévérité calculée: {severity_level} (score: {severity_score:.2f})")
         return severity_level
     
-    def create_incident(self, reports: List[Dict[str, Any]], source_type: str) -> str:
+    def summarize_reports(self, groups: List[List[Dict[str, Any]]]) -> List[str]:
+        """
+        Résume plusieurs groupes de rapports en un seul appel.
+        
+        Les rapports d'un groupe sont résumés ensemble (phrases les plus
+        représentatives, sans redondance), par ordre de priorité décroissante.
+        
+        Args:
+            groups: Groupes de rapports (un groupe par incident)
+            
+        Returns:
+            Résumé de chaque groupe ("Incident détecté automatiquement" si aucun texte)
+        """
+        texts = [
+            [r.get("text", "") for r in sorted(reports, key=lambda r: r.get("priority", 1), reverse=True)]
+            for reports in groups
+        ]
+        summaries = self.summarizer.summarize_groups(texts, max_length=SUMMARY_MAX_LENGTH)
+        return [summary or "Incident détecté automatiquement" for summary in summaries]
+    
+    def create_incident(self, reports: List[Dict[str, Any]], source_type: str, summary: Optional[str] = None) -> str:
         """
         Crée un nouvel incident à partir d'un groupe de rapports.
         
         Args:
             reports: Liste des rapports associés à l'incident
             source_type: Type de source (anomaly, geo_cluster, manual)
+            summary: Résumé déjà calculé (summarize_reports), calculé ici sinon
             
         Returns:
             ID de l'incident créé
@@ -304,13 +377,9 @@ class CrisisDetector:
         else:
             location = None
         
-        # Génération d'un résumé (dans une implémentation réelle, utiliser un modèle NLP)
-        # Exemple basique: prendre le texte du rapport le plus prioritaire
-        if reports:
-            sorted_reports = sorted(reports, key=lambda r: r.get("priority", 1), reverse=True)
-            summary = sorted_reports[0].get("text", "")[:100] + "..."
-        else:
-            summary = "Incident détecté automatiquement"
+        # Résumé extractif de l'ensemble des rapports
+        if summary is None:
+            summary = self.summarize_reports([reports])[0]
         
         # Évaluation de la sévérité
         severity = self.evaluate_incident_severity(reports)
@@ -510,10 +579,11 @@ class CrisisDetector:
         
         # 2. Clustering géographique
         geo_clusters = self.cluster_by_location(recent_reports)
-        for cluster in geo_clusters:
-            if len(cluster) >= 3:  # Seuil minimal pour considérer un cluster
-                logger.info(f"Création d'un incident à partir d'un cluster de {len(cluster)} rapports")
-                self.create_incident(cluster, "geo_cluster")
+        geo_clusters = [cluster for cluster in geo_clusters if len(cluster) >= 3]  # Seuil minimal pour considérer un cluster
+        # Résumés de tous les clusters en un seul appel
+        for cluster, summary in zip(geo_clusters, self.summarize_reports(geo_clusters)):
+            logger.info(f"Création d'un incident à partir d'un cluster de {len(cluster)} rapports")
+            self.create_incident(cluster, "geo_cluster", summary=summary)
         
         logger.info("Traitement des rapports terminé")
     
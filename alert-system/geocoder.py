@@ -0,0 +1,243 @@
+"""
+Géocodage hors ligne des lieux cités dans les rapports du projet ECHO.
+
+Beaucoup de rapports (tweets, messages sans position) n'ont pas de
+coordonnées. Les voies et lieux reconnus par le moteur NLP (entités STREET,
+LOC, GPE) sont résolus à partir d'un index local construit depuis un extrait
+de référentiel (voies OSM, Base Adresse Nationale...), sans aucun service
+externe.
+
+Un même nom désigne souvent des lieux de plusieurs communes ("rue de la
+Gare"): l'index contient une entrée par couple (nom, commune), et la commune
+du rapport départage les homonymes. Sans commune, un nom porté par plusieurs
+lieux est ambigu et n'est pas résolu.
+
+L'index est un répertoire de trois fichiers ouverts en projection mémoire
+(partagés entre processus par le cache du système, rien n'est chargé au
+démarrage):
+- names.bin: clés (nom normalisé, octet nul, commune normalisée) encodées en
+  UTF-8 et triées, mises bout à bout (les entrées d'un même nom sont contiguës);
+- offsets.npy: position de chaque clé dans names.bin;
+- coords.npy: coordonnées (latitude, longitude) de chaque clé.
+
+Une recherche est une recherche dichotomique sur les clés triées; la plus
+longue suite de mots en tête du nom qui figure dans l'index est retenue,
+comme dans un arbre préfixe ("rue des lilas lyon" trouve "rue des lilas").
+"""
+
+import os
+import csv
+import bisect
+import logging
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NAMES_FILE = "names.bin"
+OFFSETS_FILE = "offsets.npy"
+COORDS_FILE = "coords.npy"
+
+# Abréviations courantes des types de voies
+ABBREVIATIONS = {
+    "av": "avenue", "ave": "avenue", "bd": "boulevard", "bld": "boulevard", "bvd": "boulevard",
+    "pl": "place", "imp": "impasse", "ch": "chemin", "che": "chemin", "rte": "route",
+    "all": "allee", "sq": "square", "fg": "faubourg", "st": "saint", "ste": "sainte",
+}
+# Mots ignorés en tête d'adresse ("12 bis rue des Lilas")
+NUMBER_SUFFIXES = {"bis", "ter", "quater"}
+
+# Entités géocodées, par ordre de précision
+ENTITY_LABELS = ("STREET", "LOC", "GPE")
+
+# Séparateur du nom et de la commune dans les clés (inférieur à tout autre caractère)
+SEPARATOR = b"\0"
+
+
+def normalize_name(name: str) -> str:
+    """
+    Forme normalisée d'un nom de lieu: minuscules sans accents, ponctuation
+    remplacée par des espaces, abréviations développées, numéro retiré.
+    """
+    decomposed = unicodedata.normalize("NFKD", name.lower())
+    text = "".join(
+        char if char.isalnum() else " "
+        for char in decomposed if not unicodedata.combining(char)
+    )
+    words = [ABBREVIATIONS.get(word, word) for word in text.split()]
+    while words and (words[0].isdigit() or words[0] in NUMBER_SUFFIXES):
+        words.pop(0)
+    return " ".join(words)
+
+
+class _SortedNames:
+    """Vue séquentielle (bisect) des noms encodés d'un index"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._data[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+
+class Geocoder:
+    """
+    Résolution de noms de voies et de lieux en coordonnées, sur un index local.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Args:
+            index_dir: Répertoire de l'index (construit par build ou from_csv)
+        """
+        self.index_dir = index_dir
+        names_path = os.path.join(index_dir, NAMES_FILE)
+        if os.path.getsize(names_path):
+            data = np.memmap(names_path, dtype=np.uint8, mode="r")
+        else:
+            # np.memmap refuse les fichiers vides (index sans aucun nom)
+            data = np.zeros(0, dtype=np.uint8)
+        self._offsets = np.load(os.path.join(index_dir, OFFSETS_FILE), mmap_mode="r")
+        self._coords = np.load(os.path.join(index_dir, COORDS_FILE), mmap_mode="r")
+        self._names = _SortedNames(data, self._offsets)
+        logger.info(f"Index de géocodage ouvert: {len(self)} lieux ({index_dir})")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @classmethod
+    def build(cls, places: Iterable[Tuple[str, float, float, str]], index_dir: str) -> "Geocoder":
+        """
+        Construit l'index à partir de lieux (nom, latitude, longitude, commune).
+        Un nom présent plusieurs fois dans une même commune (tronçons d'une
+        même voie) reçoit la moyenne de ses coordonnées; les homonymes de
+        communes différentes restent distincts.
+
+        Args:
+            places: Lieux à indexer (commune vide si inconnue)
+            index_dir: Répertoire de l'index (créé si besoin)
+
+        Returns:
+            Géocodeur ouvert sur l'index construit
+        """
+        grouped: Dict[bytes, List[Tuple[float, float]]] = defaultdict(list)
+        for name, lat, lng, commune in places:
+            key = normalize_name(name)
+            if key:
+                key = key.encode("utf-8") + SEPARATOR + normalize_name(commune or "").encode("utf-8")
+                grouped[key].append((float(lat), float(lng)))
+
+        names = sorted(grouped)
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(name) for name in names])
+        coords = np.array([np.mean(grouped[name], axis=0) for name in names], dtype=np.float64).reshape(-1, 2)
+
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, NAMES_FILE), "wb") as f:
+            f.write(b"".join(names))
+        np.save(os.path.join(index_dir, OFFSETS_FILE), offsets)
+        np.save(os.path.join(index_dir, COORDS_FILE), coords)
+        logger.info(f"Index de géocodage construit: {len(names)} lieux ({index_dir})")
+        return cls(index_dir)
+
+    @classmethod
+    def from_csv(cls, csv_path: str, index_dir: str, name_column: str = "name",
+                 lat_column: str = "lat", lng_column: str = "lng",
+                 commune_column: str = "commune") -> "Geocoder":
+        """Construit l'index à partir d'un extrait CSV (une ligne par voie ou lieu, commune facultative)"""
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            return cls.build(
+                ((row[name_column], row[lat_column], row[lng_column], row.get(commune_column, ""))
+                 for row in csv.DictReader(f)),
+                index_dir
+            )
+
+    def _find(self, name: bytes) -> range:
+        """Positions des entrées (une par commune) d'un nom normalisé"""
+        start = bisect.bisect_left(self._names, name + SEPARATOR)
+        end = bisect.bisect_left(self._names, name + b"\1", lo=start)
+        return range(start, end)
+
+    def _commune(self, i: int) -> bytes:
+        return self._names[i].split(SEPARATOR, 1)[1]
+
+    def lookup(self, name: str, commune: Optional[str] = None) -> Optional[Tuple[float, float]]:
+        """
+        Coordonnées d'un nom de voie ou de lieu.
+
+        Args:
+            name: Nom tel que cité ("12 bis rue des Lilas", "Av. de la République")
+            commune: Commune du rapport, qui départage les lieux homonymes
+
+        Returns:
+            (latitude, longitude) du lieu désigné par la plus longue suite de
+            mots en tête du nom présente dans l'index: le lieu de la commune
+            donnée (ou de commune inconnue), sinon le seul lieu portant ce nom.
+            None si aucun lieu ne correspond ou si plusieurs lieux correspondent
+        """
+        words = normalize_name(name).split()
+        for length in range(len(words), 0, -1):
+            matches = self._find(" ".join(words[:length]).encode("utf-8"))
+            if not matches:
+                continue
+            if commune:
+                key = normalize_name(commune).encode("utf-8")
+                matches = [i for i in matches if self._commune(i) in (key, b"")]
+            if len(matches) != 1:
+                # Nom d'une autre commune, ou homonymes sans commune pour les départager
+                return None
+            lat, lng = self._coords[matches[0]]
+            return float(lat), float(lng)
+        return None
+
+    def geocode_entities(self, entities: List[Dict[str, Any]], commune: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Position d'un rapport d'après ses entités nommées (la voie avant le lieu).
+
+        Args:
+            entities: Entités nommées du rapport
+            commune: Commune du rapport (à défaut, les villes citées sont essayées,
+                puis le nom seul)
+
+        Returns:
+            Position {"lat", "lng", "geocoded_from"}, None si aucune entité n'est
+            connue sans ambiguïté
+        """
+        if commune:
+            communes = [commune]
+        else:
+            communes = [entity.get("text") for entity in entities if entity.get("label") == "GPE"] + [None]
+        for label in ENTITY_LABELS:
+            for entity in entities:
+                if entity.get("label") != label:
+                    continue
+                for candidate in communes:
+                    coords = self.lookup(entity.get("text", ""), candidate)
+                    if coords:
+                        return {"lat": coords[0], "lng": coords[1], "geocoded_from": entity["text"]}
+        return None
+
+
+def open_geocoder(index_dir: str) -> Optional[Geocoder]:
+    """Géocodeur sur l'index de index_dir, None si l'index n'existe pas"""
+    if not os.path.exists(os.path.join(index_dir, OFFSETS_FILE)):
+        logger.warning(f"Index de géocodage non trouvé: {index_dir}")
+        return None
+    return Geocoder(index_dir)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construction de l'index de géocodage hors ligne")
+    parser.add_argument("csv", help="Extrait CSV des voies et lieux (colonnes name, lat, lng et commune)")
+    parser.add_argument("index_dir", help="Répertoire de l'index")
+    args = parser.parse_args()
+    Geocoder.from_csv(args.csv, args.index_dir)
@@ -8,10 +8,11 @@ import os
 import logging
 from typing import List, Optional
 from pydantic import BaseModel
-import httpx
 import json
 import enum
 
+from token_verifier import TokenVerifier
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,6 +26,9 @@ Base = declarative_base()
 # Configuration OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Vérification locale des tokens (remplace les appels à /verify)
+token_verifier = TokenVerifier()
+
 # Énumérations
 class AlertSeverity(enum.Enum):
     LOW = "low"
@@ -100,20 +104,8 @@ def get_db():
         db.close()
 
 async def verify_token(token: str = Depends(oauth2_scheme)):
-    """Vérifie le token JWT avec le service d'authentification"""
-    auth_service_url = os.getenv("AUTH_SERVICE_URL", "http://auth-service:5003")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{auth_service_url}/verify",
-                json={"token": token}
-            )
-            if response.status_code == 200:
-                return response.json()
-            raise HTTPException(status_code=401, detail="Token invalide")
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification du token: {e}")
-            raise HTTPException(status_code=500, detail="Erreur de service")
+    """Vérifie le token JWT localement (clés du service d'authentification en cache)"""
+    return await token_verifier.verify(token)
 
 async def notify_alert(alert: Alert):
     """Notification des alertes"""
@@ -0,0 +1,207 @@
+"""
+Résumé extractif des textes du projet ECHO.
+
+Les phrases sont représentées par leurs poids TF-IDF (calculés au sein de
+leur groupe de textes) et classées par TextRank sur le graphe de leurs
+similarités cosinus. Le résumé reprend les phrases les mieux classées, dans
+leur ordre d'origine, en écartant celles trop proches d'une phrase déjà
+retenue (rapports quasi identiques d'un même incident).
+
+Tous les groupes d'un appel sont traités ensemble: une seule matrice creuse
+de phrases, dont les colonnes sont propres à chaque groupe, ce qui rend la
+matrice de similarité diagonale par blocs (aucune similarité calculée entre
+groupes) et permet d'itérer TextRank sur tous les groupes à la fois.
+
+Ce module est partagé à l'identique par le moteur NLP et le système d'alertes.
+"""
+
+import re
+import hashlib
+from collections import Counter, OrderedDict
+from typing import FrozenSet, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+# Fin de phrase: ponctuation finale suivie d'espaces, ou retour à la ligne
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\n+")
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Phrases d'un texte, dans l'ordre"""
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+class Summarizer:
+    """
+    Résumés extractifs par TextRank, avec cache.
+    """
+
+    def __init__(
+        self,
+        stop_words: FrozenSet[str] = frozenset(),
+        damping: float = 0.85,
+        iterations: int = 30,
+        redundancy: float = 0.7,
+        cache_size: int = 1024,
+    ):
+        """
+        Args:
+            stop_words: Mots ignorés dans la représentation des phrases
+            damping: Facteur d'amortissement de TextRank
+            iterations: Nombre d'itérations de TextRank
+            redundancy: Similarité cosinus au-delà de laquelle une phrase est jugée redondante
+            cache_size: Nombre maximum de résumés conservés (0: pas de cache)
+        """
+        self.stop_words = stop_words
+        self.damping = damping
+        self.iterations = iterations
+        self.redundancy = redundancy
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def summarize(self, text: str, max_length: int = 200) -> str:
+        """Résumé d'un texte d'au plus max_length caractères"""
+        return self.summarize_groups([[text]], max_length)[0]
+
+    def summarize_many(self, texts: List[str], max_length: int = 200) -> List[str]:
+        """Résumés de plusieurs textes, calculés en une passe, dans l'ordre des textes"""
+        return self.summarize_groups([[text] for text in texts], max_length)
+
+    def summarize_cluster(self, texts: List[str], max_length: int = 300) -> str:
+        """Résumé unique de plusieurs textes (rapports d'un même incident)"""
+        return self.summarize_groups([texts], max_length)[0]
+
+    def summarize_groups(self, groups: List[List[str]], max_length: int = 200) -> List[str]:
+        """
+        Résumés de groupes de textes: les phrases de chaque groupe forment un
+        seul document, résumé indépendamment des autres groupes.
+
+        Args:
+            groups: Textes de chaque groupe
+            max_length: Longueur maximum de chaque résumé, en caractères
+
+        Returns:
+            Résumé de chaque groupe, dans l'ordre des groupes
+        """
+        keys = [self._cache_key(texts, max_length) for texts in groups]
+        summaries: List[Optional[str]] = [self._cache_get(key) for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        self.stats["hits"] += len(groups) - len(missing)
+        self.stats["misses"] += len(missing)
+
+        if missing:
+            for i, summary in zip(missing, self._summarize([groups[i] for i in missing], max_length)):
+                summaries[i] = summary
+                self._cache_set(keys[i], summary)
+        return summaries
+
+    def _summarize(self, groups: List[List[str]], max_length: int) -> List[str]:
+        sentences: List[str] = []
+        bounds = []
+        for texts in groups:
+            start = len(sentences)
+            for text in texts:
+                sentences.extend(split_sentences(text or ""))
+            bounds.append((start, len(sentences)))
+        if not sentences:
+            return [""] * len(groups)
+
+        block = np.repeat(np.arange(len(groups)), [end - start for start, end in bounds])
+        vectors = self._vectorize(sentences, block)
+        similarities = (vectors @ vectors.T).tocsr()
+        scores = self._textrank(similarities, block)
+
+        return [
+            self._select(sentences[start:end], scores[start:end],
+                         similarities[start:end, start:end].toarray(), max_length)
+            if end > start else ""
+            for start, end in bounds
+        ]
+
+    def _vectorize(self, sentences: List[str], block: np.ndarray) -> sparse.csr_matrix:
+        """
+        Vecteurs TF-IDF normalisés des phrases. Chaque colonne correspond à un
+        mot dans un groupe: les fréquences documentaires sont propres au groupe
+        et deux groupes n'ont aucune colonne commune.
+        """
+        vocabulary = {}
+        rows, terms, counts = [], [], []
+        for i, sentence in enumerate(sentences):
+            words = Counter(
+                word for word in WORD_PATTERN.findall(sentence.lower())
+                if len(word) > 1 and word not in self.stop_words
+            )
+            for word, count in words.items():
+                rows.append(i)
+                terms.append(vocabulary.setdefault(word, len(vocabulary)))
+                counts.append(count)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        block_sizes = np.bincount(block)
+        # Colonne propre au couple (groupe, mot); document frequency = phrases du groupe contenant le mot
+        pairs = block[rows] * max(len(vocabulary), 1) + np.asarray(terms, dtype=np.int64)
+        _, columns, frequencies = np.unique(pairs, return_inverse=True, return_counts=True)
+        sizes = block_sizes[block[rows]]
+        data = (1 + np.log(np.asarray(counts, dtype=np.float64))) * (np.log((1 + sizes) / (1 + frequencies[columns])) + 1)
+
+        norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=len(sentences)))
+        if len(data):
+            data /= norms[rows]
+        return sparse.csr_matrix(
+            (data, (rows, columns)), shape=(len(sentences), int(columns.max()) + 1 if len(columns) else 0)
+        )
+
+    def _textrank(self, similarities: sparse.csr_matrix, block: np.ndarray) -> np.ndarray:
+        """Scores TextRank de toutes les phrases (chaque groupe est une composante du graphe)"""
+        graph = similarities.copy()
+        graph.setdiag(0)
+        graph.eliminate_zeros()
+        degree = np.asarray(graph.sum(axis=1)).ravel()
+        inverse_degree = np.divide(1.0, degree, out=np.zeros_like(degree), where=degree > 0)
+
+        # Saut aléatoire vers une phrase du même groupe
+        teleport = 1.0 / np.bincount(block)[block]
+        scores = teleport.copy()
+        for _ in range(self.iterations):
+            # Matrice symétrique: graph.T @ x == graph @ x
+            scores = (1 - self.damping) * teleport + self.damping * (graph @ (scores * inverse_degree))
+        return scores
+
+    def _select(self, sentences: List[str], scores: np.ndarray, similarities: np.ndarray, max_length: int) -> str:
+        """Phrases les mieux classées, non redondantes, dans leur ordre d'origine"""
+        selected: List[int] = []
+        length = 0
+        # Tri stable: à score égal, la phrase la plus ancienne passe en premier
+        for i in np.argsort(-scores, kind="stable"):
+            if length + len(sentences[i]) > max_length:
+                continue
+            if any(similarities[i, j] > self.redundancy for j in selected):
+                continue
+            selected.append(int(i))
+            length += len(sentences[i]) + 1
+
+        if not selected:
+            # Aucune phrase ne tient: la meilleure est tronquée
+            best = sentences[int(np.argmax(scores))]
+            return best[:max(max_length - 3, 0)].rstrip() + "..."
+        return " ".join(sentences[i] for i in sorted(selected))
+
+    def _cache_key(self, texts: List[str], max_length: int) -> str:
+        return hashlib.sha256(f"{max_length}\0{chr(30).join(texts)}".encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        summary = self._cache.get(key)
+        if summary is not None:
+            self._cache.move_to_end(key)
+        return summary
+
+    def _cache_set(self, key: str, summary: str) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = summary
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
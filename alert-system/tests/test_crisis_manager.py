@@ -0,0 +1,114 @@
+import pytest
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Dépendances du détecteur de crises (absentes de certains environnements de test)
+for module in ("pandas", "geopy", "sklearn", "pymongo"):
+    pytest.importorskip(module)
+
+import crisis_manager
+from crisis_manager import CrisisDetector
+from geocoder import Geocoder
+
+
+class FakeCollection:
+    """Collection MongoDB minimale: documents insérés et mises à jour enregistrés"""
+
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.inserted = []
+        self.updates = []
+
+    def find(self, query):
+        return list(self.documents)
+
+    def insert_one(self, document):
+        self.inserted.append(document)
+
+    def update_one(self, query, update):
+        self.updates.append((query, update))
+
+
+@pytest.fixture
+def detector(monkeypatch):
+    database = SimpleNamespace(alerts=FakeCollection(), reports=FakeCollection(), incidents=FakeCollection())
+    monkeypatch.setattr(crisis_manager, "MongoClient", lambda uri: SimpleNamespace(echo_project=database))
+    monkeypatch.setattr(crisis_manager, "open_geocoder", lambda index_dir: None)
+    return CrisisDetector()
+
+
+def report(report_id, text, lat=None, lng=None, **fields):
+    document = {"_id": report_id, "text": text, "timestamp": datetime.now(), "priority": 1, **fields}
+    if lat is not None:
+        document["location"] = {"lat": lat, "lng": lng}
+    return document
+
+
+def test_summarize_reports_by_priority(detector):
+    summaries = detector.summarize_reports([
+        [report("r1", "Poubelle renversée."), report("r2", "Inondation du passage souterrain.", priority=5)],
+        [report("r3", "")],
+    ])
+
+    # Rapports les plus prioritaires en tête du résumé
+    assert summaries[0] == "Inondation du passage souterrain. Poubelle renversée."
+    assert summaries[1] == "Incident détecté automatiquement"
+
+
+def test_summarize_reports_is_cached(detector):
+    groups = [[report("r1", "Arbre tombé sur la chaussée."), report("r2", "Chaussée bloquée par un arbre.")]]
+
+    assert detector.summarize_reports(groups) == detector.summarize_reports(groups)
+    assert detector.summarizer.stats == {"hits": 1, "misses": 1}
+
+
+def test_process_reports_summarizes_clusters_in_one_call(detector, monkeypatch):
+    detector.reports.documents = [
+        report("r1", "Fuite d'eau rue Mercière.", 45.7620, 4.8330),
+        report("r2", "La rue Mercière est inondée.", 45.7622, 4.8332),
+        report("r3", "Canalisation cassée, rue inondée.", 45.7625, 4.8335),
+        report("r4", "Lampadaire éteint.", 45.7400, 4.8300),
+        report("r5", "Lampadaire clignotant.", 45.7402, 4.8302),
+    ]
+    calls = []
+    summarize_groups = detector.summarizer.summarize_groups
+    monkeypatch.setattr(detector.summarizer, "summarize_groups",
+                        lambda groups, max_length: calls.append(groups) or summarize_groups(groups, max_length))
+
+    detector.process_reports()
+
+    # Seul le cluster d'au moins trois rapports devient un incident
+    [incident] = detector.incidents.inserted
+    assert incident["source_type"] == "geo_cluster"
+    assert incident["reports"] == ["r1", "r2", "r3"]
+    assert "Mercière" in incident["summary"]
+    assert len(calls) == 1 and len(calls[0]) == 1
+    assert [query["_id"] for query, _ in detector.reports.updates] == ["r1", "r2", "r3"]
+
+
+def test_reports_without_coordinates_are_geocoded_then_clustered(detector, tmp_path):
+    detector.geocoder = Geocoder.build([
+        ("Rue Mercière", 45.7620, 4.8330, "Lyon"),
+        ("Rue de la Gare", 45.7600, 4.8600, "Lyon"),
+        ("Rue de la Gare", 45.7700, 4.8900, "Villeurbanne"),
+    ], str(tmp_path / "index"))
+    street = lambda text: {"text": text, "label": "STREET"}
+    reports = [
+        report("r1", "Fuite d'eau.", 45.7621, 4.8331),
+        report("r2", "Chaussée inondée.", entities=[street("12 rue Mercière")]),
+        report("r3", "Canalisation cassée.", nlp_analysis={"entities": [street("rue de la Gare")]}, commune="Lyon"),
+        # Voie homonyme sans commune: position inconnue
+        report("r4", "Trottoir abîmé.", entities=[street("rue de la Gare")]),
+    ]
+
+    clusters = detector.cluster_by_location(reports, max_distance_km=3.0)
+
+    assert reports[1]["location"]["geocoded_from"] == "12 rue Mercière"
+    assert (reports[2]["location"]["lat"], reports[2]["location"]["lng"]) == pytest.approx((45.76, 4.86))
+    assert "location" not in reports[3]
+    assert [[r["_id"] for r in cluster] for cluster in clusters] == [["r1", "r2", "r3"]]
@@ -0,0 +1,88 @@
+import pytest
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geocoder import Geocoder, normalize_name, open_geocoder
+
+PLACES = [
+    ("Rue des Lilas", 45.7600, 4.8500, "Lyon"),
+    ("Rue des Lilas", 45.7620, 4.8520, "Lyon"),
+    ("Avenue de la République", 45.7400, 4.8300, "Lyon"),
+    ("Avenue de la République", 45.7700, 4.8800, "Villeurbanne"),
+    ("Place Bellecour", 45.7578, 4.8320, "Lyon"),
+    ("Saint-Étienne", 45.4397, 4.3872, ""),
+]
+
+
+@pytest.fixture
+def geocoder(tmp_path):
+    return Geocoder.build(PLACES, str(tmp_path / "index"))
+
+
+def test_normalize_name():
+    assert normalize_name("12 bis Av. de la République") == "avenue de la republique"
+    assert normalize_name("  Saint-Étienne ") == "saint etienne"
+
+
+def test_lookup_resolves_cited_names(geocoder):
+    assert len(geocoder) == 5
+    # Tronçons d'une même voie: coordonnées moyennes
+    assert geocoder.lookup("12 rue des Lilas") == pytest.approx((45.7610, 4.8510))
+    # Plus longue suite de mots connue en tête du nom
+    assert geocoder.lookup("place Bellecour Lyon 2e") == pytest.approx((45.7578, 4.8320))
+    assert geocoder.lookup("rue inconnue") is None
+    assert geocoder.lookup("") is None
+
+
+def test_homonyms_are_resolved_by_commune(geocoder):
+    assert geocoder.lookup("av de la republique", "Lyon") == pytest.approx((45.74, 4.83))
+    assert geocoder.lookup("Avenue de la République", "villeurbanne") == pytest.approx((45.77, 4.88))
+    # Plusieurs lieux et aucune commune pour les départager: nom ambigu
+    assert geocoder.lookup("av de la republique") is None
+    # Voie d'une autre commune que celle du rapport
+    assert geocoder.lookup("rue des Lilas", "Villeurbanne") is None
+    # Lieu de commune inconnue
+    assert geocoder.lookup("Saint-Étienne", "Lyon") == pytest.approx((45.4397, 4.3872))
+
+
+def test_index_is_reopened_from_disk(geocoder, tmp_path):
+    reopened = open_geocoder(str(tmp_path / "index"))
+    assert reopened.lookup("Saint Etienne") == pytest.approx((45.4397, 4.3872))
+    assert open_geocoder(str(tmp_path / "absent")) is None
+
+
+def test_from_csv(tmp_path):
+    path = tmp_path / "voies.csv"
+    path.write_text("name,lat,lng,commune\nQuai Perrache,45.74,4.82,Lyon\n", encoding="utf-8")
+    geocoder = Geocoder.from_csv(str(path), str(tmp_path / "index"))
+    assert geocoder.lookup("quai Perrache") == pytest.approx((45.74, 4.82))
+    assert geocoder.lookup("quai Perrache", "Lyon") == pytest.approx((45.74, 4.82))
+
+
+def test_street_entities_take_precedence(geocoder):
+    position = geocoder.geocode_entities([
+        {"text": "Saint-Étienne", "label": "LOC"},
+        {"text": "12 rue des Lilas", "label": "STREET"},
+        {"text": "Mairie", "label": "ORG"},
+    ])
+    assert position["geocoded_from"] == "12 rue des Lilas"
+    assert (position["lat"], position["lng"]) == pytest.approx((45.7610, 4.8510))
+    assert geocoder.geocode_entities([{"text": "Mairie", "label": "ORG"}]) is None
+
+
+def test_cited_city_disambiguates_streets(geocoder):
+    street = {"text": "avenue de la République", "label": "STREET"}
+
+    assert geocoder.geocode_entities([street]) is None
+    position = geocoder.geocode_entities([street, {"text": "Villeurbanne", "label": "GPE"}])
+    assert (position["lat"], position["lng"]) == pytest.approx((45.77, 4.88))
+    # La commune du rapport prime sur les villes citées
+    position = geocoder.geocode_entities([street, {"text": "Villeurbanne", "label": "GPE"}], commune="Lyon")
+    assert (position["lat"], position["lng"]) == pytest.approx((45.74, 4.83))
+
+
+def test_empty_index(tmp_path):
+    assert Geocoder.build([], str(tmp_path / "index")).lookup("rue des Lilas") is None
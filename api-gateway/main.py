@@ -8,6 +8,8 @@ import logging
 from prometheus_client import Counter, Histogram
 import time
 
+from token_verifier import TokenVerifier
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,6 +32,9 @@ app.add_middleware(
 # Configuration OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Vérification locale des tokens (remplace les appels à /verify)
+token_verifier = TokenVerifier()
+
 # URLs des services
 SERVICES = {
     "auth": os.getenv("AUTH_SERVICE_URL", "http://auth-service:5003"),
@@ -41,19 +46,8 @@ SERVICES = {
 }
 
 async def verify_token(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
-    """Vérifie le token JWT avec le service d'authentification"""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{SERVICES['auth']}/verify",
-                json={"token": token}
-            )
-            if response.status_code == 200:
-                return response.json()
-            raise HTTPException(status_code=401, detail="Token invalide")
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification du token: {e}")
-            raise HTTPException(status_code=500, detail="Erreur de service")
+    """Vérifie le token JWT localement (clés du service d'authentification en cache)"""
+    return await token_verifier.verify(token)
 
 @app.middleware("http")
 async def monitor_requests(request, call_next):
@@ -4,10 +4,12 @@ from sqlalchemy import create_engine, Column, Integer, String, Boolean
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from passlib.context import CryptContext
-from jose import JWTError, jwt
+from jose import JWTError, jwt, jwk
 from datetime import datetime, timedelta
 from typing import Optional
 import os
+import uuid
+import hashlib
 from pydantic import BaseModel
 import logging
 
@@ -26,6 +28,13 @@ SECRET_KEY = os.getenv("JWT_SECRET", "votre_cle_secrete")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Algorithmes asymétriques (RS*/ES*): clé privée de signature, clé publique publiée en JWKS
+PRIVATE_KEY = os.getenv("JWT_PRIVATE_KEY")
+PUBLIC_KEY = os.getenv("JWT_PUBLIC_KEY")
+SIGNING_KEY = SECRET_KEY if ALGORITHM.startswith("HS") else PRIVATE_KEY
+VERIFYING_KEY = SECRET_KEY if ALGORITHM.startswith("HS") else PUBLIC_KEY
+KEY_ID = hashlib.sha256(PUBLIC_KEY.encode()).hexdigest()[:16] if PUBLIC_KEY and not ALGORITHM.startswith("HS") else None
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -83,8 +92,10 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # jti: identifiant unique du token, clé des caches de vérification des services
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    headers = {"kid": KEY_ID} if KEY_ID else None
+    encoded_jwt = jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM, headers=headers)
     return encoded_jwt
 
 async def get_current_user(
@@ -97,7 +108,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, VERIFYING_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
@@ -143,7 +154,8 @@ async def login_for_access_token(
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data={"sub": user.email, "role": "admin" if user.is_admin else "user"},
+        expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
@@ -152,7 +164,7 @@ async def login_for_access_token(
 async def verify_token(token: str):
     """Vérifie la validité d'un token JWT"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, VERIFYING_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             raise HTTPException(status_code=401, detail="Token invalide")
@@ -160,6 +172,15 @@ async def verify_token(token: str):
     except JWTError:
         raise HTTPException(status_code=401, detail="Token invalide")
 
+@app.get("/.well-known/jwks.json")
+async def get_jwks():
+    """Clés publiques de vérification des tokens (vide avec un secret partagé HS*)"""
+    if not KEY_ID:
+        return {"keys": []}
+    key = jwk.construct(PUBLIC_KEY, ALGORITHM).to_dict()
+    key.update({"kid": KEY_ID, "use": "sig"})
+    return {"keys": [key]}
+
 @app.get("/users/me", response_model=UserResponse)
 async def read_users_me(current_user: User = Depends(get_current_user)):
     """Retourne les informations de l'utilisateur connecté"""
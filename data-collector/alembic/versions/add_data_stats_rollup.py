@@ -0,0 +1,41 @@
+"""add data_stats_rollup
+
+Revision ID: add_data_stats_rollup
+Revises: add_listing_indexes_to_data_entries
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_data_stats_rollup'
+down_revision = 'add_listing_indexes_to_data_entries'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Les bases créées par Base.metadata.create_all possèdent déjà la table
+    if not sa.inspect(op.get_bind()).has_table('data_stats_rollup'):
+        op.create_table(
+            'data_stats_rollup',
+            sa.Column('source', sa.String(), nullable=False),
+            sa.Column('category', sa.String(), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('errors', sa.Integer(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('source', 'category')
+        )
+    # Initialisation des compteurs à partir des entrées existantes
+    op.execute("DELETE FROM data_stats_rollup")
+    op.execute(
+        "INSERT INTO data_stats_rollup (source, category, total, processed, errors) "
+        "SELECT source, category, COUNT(id), "
+        "SUM(CASE WHEN processed = 1 THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN processed = -1 THEN 1 ELSE 0 END) "
+        "FROM data_entries WHERE source IS NOT NULL AND category IS NOT NULL "
+        "GROUP BY source, category"
+    )
+
+def downgrade():
+    op.drop_table('data_stats_rollup')
@@ -0,0 +1,31 @@
+"""add listing indexes to data_entries
+
+Revision ID: add_listing_indexes_to_data_entries
+Revises: 
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_listing_indexes_to_data_entries'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Index de la pagination par curseur de /data (tri sur created_at, id)
+INDEXES = {
+    'ix_data_entries_created_at_id': ['created_at', 'id'],
+    'ix_data_entries_source_created_at_id': ['source', 'created_at', 'id'],
+    'ix_data_entries_category_created_at_id': ['category', 'created_at', 'id'],
+    'ix_data_entries_source_category_created_at_id': ['source', 'category', 'created_at', 'id'],
+}
+
+def upgrade():
+    # Les bases créées par Base.metadata.create_all possèdent déjà ces index
+    for name, columns in INDEXES.items():
+        op.create_index(name, 'data_entries', columns, if_not_exists=True)
+
+def downgrade():
+    for name in INDEXES:
+        op.drop_index(name, table_name='data_entries', if_exists=True)
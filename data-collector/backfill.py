@@ -0,0 +1,253 @@
+"""
+Module de collecte historique (backfill) des tweets pour le projet ECHO.
+Plusieurs requêtes de recherche sont parcourues en parallèle en partageant
+un même budget de requêtes API, les tweets sont dédupliqués par identifiant
+et stockés par lots, avec des points de reprise pour relancer une collecte
+interrompue sans tout récupérer à nouveau.
+"""
+
+import os
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitBudget:
+    """
+    Budget de requêtes partagé entre les threads de collecte (seau à jetons).
+    Par défaut, 180 requêtes par fenêtre de 15 minutes, la limite de
+    l'API de recherche standard de Twitter.
+    """
+
+    def __init__(self, max_requests: int = 180, window_seconds: float = 900.0):
+        """
+        Initialise le budget.
+
+        Args:
+            max_requests: Nombre de requêtes autorisées par fenêtre
+            window_seconds: Durée de la fenêtre en secondes
+        """
+        self.capacity = max_requests
+        self.refill_rate = max_requests / window_seconds
+        self.tokens = float(max_requests)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Consomme un jeton, en attendant si le budget est épuisé.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.refill_rate
+
+            time.sleep(wait)
+
+
+class TweepySearchClient:
+    """
+    Adaptateur de l'API de recherche tweepy vers l'interface attendue par HistoricalBackfill.
+    Tout objet exposant une méthode search(query, count, max_id) peut le remplacer,
+    par exemple un faux client local dans les tests.
+    """
+
+    def __init__(self, twitter_api):
+        """
+        Args:
+            twitter_api: Instance tweepy.API authentifiée
+        """
+        self.twitter_api = twitter_api
+
+    def search(self, query: str, count: int, max_id: Optional[int] = None) -> List[Any]:
+        """
+        Récupère une page de résultats, du plus récent au plus ancien.
+
+        Args:
+            query: Requête de recherche
+            count: Nombre maximum de tweets dans la page
+            max_id: Identifiant maximum (inclus) des tweets à retourner
+
+        Returns:
+            Liste de tweets
+        """
+        return self.twitter_api.search_tweets(
+            q=query,
+            count=count,
+            max_id=max_id,
+            tweet_mode="extended"
+        )
+
+
+class BackfillCheckpoint:
+    """
+    Points de reprise de la collecte historique, persistés dans un fichier JSON.
+    Pour chaque requête, on conserve le prochain max_id à demander,
+    le nombre de tweets récupérés et l'état terminé ou non.
+    """
+
+    def __init__(self, file_path: Optional[str] = None):
+        """
+        Args:
+            file_path: Chemin du fichier de reprise (None pour désactiver la persistance)
+        """
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.state: Dict[str, Dict[str, Any]] = {}
+
+        if file_path and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+            logger.info(f"Points de reprise chargés depuis {file_path} ({len(self.state)} requêtes)")
+
+    def get(self, query: str) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.state.get(query, {"max_id": None, "fetched": 0, "stored": 0, "done": False}))
+
+    def update(self, query: str, **values: Any) -> None:
+        with self.lock:
+            self.state.setdefault(query, {"max_id": None, "fetched": 0, "stored": 0, "done": False}).update(values)
+            self._save()
+
+    def _save(self) -> None:
+        if not self.file_path:
+            return
+
+        # Écriture atomique pour ne jamais laisser un fichier de reprise tronqué
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.file_path)
+
+
+class HistoricalBackfill:
+    """
+    Moteur de collecte historique multi-requêtes.
+    """
+
+    def __init__(
+        self,
+        client,
+        store_batch: Callable[[List[Dict[str, Any]]], List[str]],
+        prepare: Callable[[Any], Dict[str, Any]],
+        rate_limit: Optional[RateLimitBudget] = None,
+        max_workers: int = 4,
+        page_size: int = 100,
+        checkpoint_path: Optional[str] = None,
+    ):
+        """
+        Initialise le moteur de collecte.
+
+        Args:
+            client: Client de recherche exposant search(query, count, max_id)
+            store_batch: Fonction de stockage par lot, retourne les IDs des documents
+            prepare: Fonction convertissant un tweet en dictionnaire {"text", "metadata"}
+            rate_limit: Budget de requêtes partagé entre toutes les requêtes
+            max_workers: Nombre de requêtes parcourues simultanément
+            page_size: Nombre de tweets demandés par page
+            checkpoint_path: Fichier de points de reprise (optionnel)
+        """
+        self.client = client
+        self.store_batch = store_batch
+        self.prepare = prepare
+        self.rate_limit = rate_limit or RateLimitBudget()
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.checkpoint = BackfillCheckpoint(checkpoint_path)
+
+        self.seen_ids = set()
+        self.seen_lock = threading.Lock()
+
+    def run(self, queries: Iterable[str], max_per_query: int = 100) -> Dict[str, int]:
+        """
+        Lance la collecte pour toutes les requêtes.
+
+        Args:
+            queries: Requêtes de recherche
+            max_per_query: Nombre maximum de tweets à récupérer par requête
+
+        Returns:
+            Nombre de tweets stockés par requête
+        """
+        queries = list(dict.fromkeys(queries))
+        logger.info(f"Démarrage du backfill de {len(queries)} requêtes ({self.max_workers} en parallèle)")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            stored = dict(zip(queries, executor.map(lambda q: self._backfill_query(q, max_per_query), queries)))
+
+        logger.info(f"Backfill terminé: {sum(stored.values())} tweets stockés")
+        return stored
+
+    def _backfill_query(self, query: str, max_per_query: int) -> int:
+        """
+        Parcourt les pages d'une requête jusqu'à épuisement ou jusqu'à la limite.
+
+        Args:
+            query: Requête de recherche
+            max_per_query: Nombre maximum de tweets à récupérer
+
+        Returns:
+            Nombre de tweets stockés pour cette requête
+        """
+        state = self.checkpoint.get(query)
+        if state["done"]:
+            logger.info(f"Requête déjà collectée, ignorée: {query}")
+            return state["stored"]
+
+        max_id, fetched, stored = state["max_id"], state["fetched"], state["stored"]
+
+        try:
+            while fetched < max_per_query:
+                self.rate_limit.acquire()
+                page = self.client.search(query, count=min(self.page_size, max_per_query - fetched), max_id=max_id)
+                if not page:
+                    break
+
+                fetched += len(page)
+                max_id = min(tweet.id for tweet in page) - 1
+
+                items = self._deduplicate(page)
+                if items:
+                    stored += len(self.store_batch(items))
+
+                self.checkpoint.update(query, max_id=max_id, fetched=fetched, stored=stored)
+
+            self.checkpoint.update(query, done=True)
+            logger.info(f"Collecté {stored} tweets pour la requête: {query}")
+
+        except Exception as e:
+            logger.error(f"Erreur lors du backfill de la requête {query}: {e}")
+
+        return stored
+
+    def _deduplicate(self, page: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Écarte les tweets déjà vus (dans cette page ou via une autre requête).
+
+        Args:
+            page: Page de tweets
+
+        Returns:
+            Tweets inédits, convertis par la fonction prepare
+        """
+        new_tweets = []
+        with self.seen_lock:
+            for tweet in page:
+                if tweet.id in self.seen_ids:
+                    continue
+                self.seen_ids.add(tweet.id)
+                new_tweets.append(tweet)
+
+        return [self.prepare(tweet) for tweet in new_tweets]
@@ -0,0 +1,75 @@
+"""
+Benchmark de l'endpoint /collect/batch face à N appels unitaires à /collect.
+
+Le service est exécuté en mémoire (TestClient) sur une base SQLite temporaire,
+sans authentification ni appel au service NLP, pour ne mesurer que le coût
+de validation et d'insertion.
+
+Exemple:
+    python benchmarks/bench_collect_batch.py --entries 2000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+# La base doit être configurée avant l'import du service
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+# Ajout du répertoire du service au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def make_entry(i: int) -> dict:
+    return {
+        "source": ["formulaire", "capteur", "email"][i % 3],
+        "category": ["voirie", "proprete", "eclairage", "transport"][i % 4],
+        "content": {"message": f"Signalement numéro {i}", "adresse": f"{i} rue de la Paix"},
+        "metadata": {"device": f"capteur-{i % 50}"}
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark de /collect/batch")
+    parser.add_argument("--entries", type=int, default=1000, help="Nombre d'entrées à collecter")
+    parser.add_argument("--batch-size", type=int, default=500, help="Taille des lots envoyés à /collect/batch")
+    args = parser.parse_args()
+
+    main.app.dependency_overrides[main.verify_token] = lambda: {"valid": True}
+    # Sans contexte TestClient, le lifespan ne démarre pas les workers de traitement NLP
+    client = TestClient(main.app)
+
+    entries = [make_entry(i) for i in range(args.entries)]
+
+    start = time.perf_counter()
+    for entry in entries:
+        response = client.post("/collect", json=entry)
+        response.raise_for_status()
+    single_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for offset in range(0, len(entries), args.batch_size):
+        response = client.post("/collect/batch", json={"entries": entries[offset:offset + args.batch_size]})
+        response.raise_for_status()
+    batch_duration = time.perf_counter() - start
+
+    print(json.dumps({
+        "entries": args.entries,
+        "single_duration_s": round(single_duration, 3),
+        "single_entries_per_s": round(args.entries / single_duration, 1),
+        "batch_size": args.batch_size,
+        "batch_duration_s": round(batch_duration, 3),
+        "batch_entries_per_s": round(args.entries / batch_duration, 1),
+        "speedup": round(single_duration / batch_duration, 1),
+    }))
+
+
+if __name__ == "__main__":
+    main_benchmark()
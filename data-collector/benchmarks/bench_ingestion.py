@@ -0,0 +1,261 @@
+"""
+Benchmark hors ligne de l'ingestion des tweets du SocialCollector.
+
+Un fichier JSONL est rejoué via ReplaySource vers chaque pipeline d'ingestion
+enregistré dans PIPELINES, avec une base MongoDB en mémoire. Le rapport donne
+le débit (tweets/s), la latence entre la soumission d'un tweet et son
+écriture en base (p50/p99) et le pic de mémoire Python.
+
+Exemple:
+    python benchmarks/bench_ingestion.py --generate 5000 --rate 0
+    python benchmarks/bench_ingestion.py --input tweets.jsonl --rate 50 --burst 5:1,1:20
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List, Dict, Any, Callable, Tuple
+
+from bson import ObjectId
+from pymongo import InsertOne
+
+# Ajout du répertoire du service au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay import ReplaySource
+from scheduler import SourceScheduler
+from social_collector import SocialCollector
+
+SAMPLE_TEXTS = [
+    "Encore un nid-de-poule énorme rue de la République, danger pour les vélos !",
+    "Merci à la mairie pour les nouveaux espaces verts du quartier.",
+    "Le bus 12 a encore 20 minutes de retard ce matin.",
+    "Accident au carrefour, la police est sur place, urgent.",
+    "Les ordures ne sont pas ramassées depuis une semaine.",
+    "Éclairage en panne sur tout le boulevard, c'est l'insécurité totale.",
+]
+
+
+class InMemoryCollection:
+    """
+    Collection MongoDB minimale en mémoire, suffisante pour le chemin de stockage
+    du collecteur. Elle horodate l'écriture de chaque tweet pour mesurer la latence.
+    """
+
+    def __init__(self):
+        self.documents: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self.stored_at: Dict[Any, float] = {}
+
+    def create_index(self, *args, **kwargs) -> str:
+        return kwargs.get("name", "index")
+
+    def _key(self, document: Dict[str, Any]) -> Tuple[str, Any]:
+        tweet_id = (document.get("metadata") or {}).get("tweet_id")
+        return (document["source"], tweet_id if tweet_id is not None else document["_id"])
+
+    def bulk_write(self, operations: List[Any], ordered: bool = True) -> SimpleNamespace:
+        upserted_ids = {}
+        now = time.perf_counter()
+
+        for index, operation in enumerate(operations):
+            document = dict(operation._doc if isinstance(operation, InsertOne) else operation._doc["$setOnInsert"])
+            document.setdefault("_id", ObjectId())
+            if isinstance(operation, InsertOne):
+                operation._doc["_id"] = document["_id"]
+
+            key = self._key(document)
+            if key in self.documents:
+                continue
+
+            self.documents[key] = document
+            if not isinstance(operation, InsertOne):
+                upserted_ids[index] = document["_id"]
+            self.stored_at[key[1]] = now
+
+        return SimpleNamespace(upserted_ids=upserted_ids, modified_count=0)
+
+    def find(self, query: Dict[str, Any], projection: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        tweet_ids = set(query["metadata.tweet_id"]["$in"])
+        return [
+            doc for (source, tweet_id), doc in self.documents.items()
+            if source == query["source"] and tweet_id in tweet_ids
+        ]
+
+
+class InMemoryMongoClient:
+    def __init__(self):
+        self.echo_project = SimpleNamespace(social_mentions=InMemoryCollection())
+
+
+class NullDispatcher:
+    """Remplace le répartiteur NLP pour ne mesurer que l'ingestion."""
+
+    def __init__(self):
+        self.submitted = 0
+
+    def submit(self, doc_id: str, text: str) -> bool:
+        self.submitted += 1
+        return True
+
+    def stop(self, timeout: float = 0) -> None:
+        pass
+
+
+def direct_pipeline(collector: SocialCollector) -> Tuple[Callable[[Any], Any], Callable[[], None]]:
+    """Pipeline actuel: chaque tweet est stocké de manière synchrone dans on_tweet."""
+    return collector.handle_tweet, lambda: None
+
+
+def scheduler_pipeline(collector: SocialCollector) -> Tuple[Callable[[Any], Any], Callable[[], None]]:
+    """Pipeline asynchrone: les tweets passent par la file d'ingestion du SourceScheduler et sont stockés par lots."""
+    scheduler = SourceScheduler(collector._store_many, flush_interval=0.05)
+    thread = threading.Thread(target=asyncio.run, args=(scheduler.run(),), daemon=True)
+    thread.start()
+    while scheduler.loop is None:
+        time.sleep(0.001)
+
+    def on_tweet(tweet):
+        item = collector._stream_tweet_to_item(tweet)
+        if item is not None:
+            scheduler.submit_threadsafe("twitter", item)
+
+    def drain():
+        asyncio.run_coroutine_threadsafe(scheduler.stop(), scheduler.loop).result()
+        thread.join()
+
+    return on_tweet, drain
+
+
+# Pipelines comparés: nom -> fabrique retournant (on_tweet, fonction de vidage)
+PIPELINES: Dict[str, Callable[[SocialCollector], Tuple[Callable[[Any], Any], Callable[[], None]]]] = {
+    "direct": direct_pipeline,
+    "scheduler": scheduler_pipeline,
+}
+
+
+def generate_tweets(file_path: str, count: int, duplicate_ratio: float = 0.05) -> None:
+    """
+    Génère un fichier JSONL de tweets synthétiques.
+
+    Args:
+        file_path: Fichier à créer
+        count: Nombre de tweets
+        duplicate_ratio: Proportion de tweets rejoués en double (reconnexions du stream)
+    """
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    duplicate_every = int(1 / duplicate_ratio) if duplicate_ratio else 0
+
+    with open(file_path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            tweet_id = i - 1 if duplicate_every and i and i % duplicate_every == 0 else i
+            f.write(json.dumps({
+                "id": 1_000_000 + tweet_id,
+                "text": f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} #{i} https://t.co/x{i}",
+                "author_id": 42 + i % 100,
+                "created_at": (start + timedelta(milliseconds=100 * i)).isoformat(),
+                "lang": "fr",
+            }) + "\n")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def run_pipeline(name: str, source: ReplaySource) -> Dict[str, Any]:
+    """
+    Rejoue la source vers un pipeline et mesure débit, latence et mémoire.
+
+    Args:
+        name: Nom du pipeline dans PIPELINES
+        source: Source de rejeu
+
+    Returns:
+        Résultats de la mesure
+    """
+    mongo_client = InMemoryMongoClient()
+    collection = mongo_client.echo_project.social_mentions
+    collector = SocialCollector(mongo_client=mongo_client)
+    collector.nlp_dispatcher = NullDispatcher()
+
+    on_tweet, drain = PIPELINES[name](collector)
+    enqueued_at: Dict[Any, float] = {}
+
+    def timed_on_tweet(tweet):
+        enqueued_at.setdefault(tweet.id, time.perf_counter())
+        on_tweet(tweet)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = source.replay(timed_on_tweet)
+    drain()
+    duration = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = [
+        (collection.stored_at[tweet_id] - enqueued) * 1000
+        for tweet_id, enqueued in enqueued_at.items()
+        if tweet_id in collection.stored_at
+    ]
+
+    return {
+        "pipeline": name,
+        "tweets": count,
+        "stored": len(collection.documents),
+        "duration_s": round(duration, 3),
+        "tweets_per_s": round(count / duration, 1) if duration else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 50), 3),
+        "latency_p99_ms": round(percentile(latencies, 99), 3),
+        "peak_memory_mb": round(peak_memory / 1024 / 1024, 2),
+    }
+
+
+def parse_burst_profile(value: str) -> List[Tuple[float, float]]:
+    """Convertit "5:1,1:20" en [(5.0, 1.0), (1.0, 20.0)] (type argparse de --burst)."""
+    if not value:
+        return []
+    profile = []
+    for segment in value.split(","):
+        try:
+            duration, multiplier = (float(part) for part in segment.split(":"))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"segment invalide: {segment!r} (attendu durée:multiplicateur)")
+        if duration <= 0 or multiplier <= 0:
+            raise argparse.ArgumentTypeError(f"segment invalide: {segment!r} (durée et multiplicateur doivent être positifs)")
+        profile.append((duration, multiplier))
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'ingestion du SocialCollector")
+    parser.add_argument("--input", help="Fichier JSONL de tweets à rejouer")
+    parser.add_argument("--generate", type=int, default=2000, help="Nombre de tweets synthétiques si --input est absent")
+    parser.add_argument("--rate", type=float, default=0, help="Facteur d'accélération (0 = sans attente)")
+    parser.add_argument("--burst", type=parse_burst_profile, default=[], help="Profil de rafales durée:multiplicateur,...")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES), help="Pipelines à comparer")
+    args = parser.parse_args()
+
+    input_path = args.input
+    if not input_path:
+        input_path = os.path.join(tempfile.mkdtemp(), "tweets.jsonl")
+        generate_tweets(input_path, args.generate)
+
+    source = ReplaySource(input_path, rate_multiplier=args.rate, burst_profile=args.burst)
+
+    for name in args.pipelines.split(","):
+        print(json.dumps(run_pipeline(name, source)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, JSON, Text, Boolean, Enum, func
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, JSON, Index, func, insert, tuple_, case, delete
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from datetime import datetime
 import os
 import logging
-from typing import List, Optional
-from pydantic import BaseModel
-import httpx
+from typing import List, Optional, Tuple, Dict, Any
+from pydantic import BaseModel, Field, AliasChoices
 import json
+import base64
+import time
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from work_queue import ProcessingQueue, PROCESSED, FAILED
+from token_verifier import TokenVerifier
+from scheduler import SourceScheduler
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -21,9 +32,24 @@ engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Nombre maximum d'entrées acceptées par /collect/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "5000"))
+
+# Statistiques: table d'agrégats maintenue à chaque écriture (le drapeau choisit seulement
+# si /stats la lit) et cache des réponses de /stats
+STATS_ROLLUP_ENABLED = os.getenv("STATS_ROLLUP_ENABLED", "true").lower() == "true"
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "10"))
+
+# Collecte continue des réseaux sociaux dans le service (désactivée par défaut)
+SOCIAL_COLLECTION_ENABLED = os.getenv("SOCIAL_COLLECTION_ENABLED", "false").lower() == "true"
+SOCIAL_COLLECTION_INTERVAL = int(os.getenv("SOCIAL_COLLECTION_INTERVAL", "3600"))
+
 # Configuration OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Vérification locale des tokens (remplace les appels à /verify)
+token_verifier = TokenVerifier()
+
 # Modèles de base de données
 class DataEntry(Base):
     __tablename__ = "data_entries"
@@ -32,12 +58,37 @@ class DataEntry(Base):
     source = Column(String, index=True)
     category = Column(String, index=True)
     content = Column(JSON)
-    metadata = Column(JSON)
+    # "metadata" est un attribut réservé par SQLAlchemy: la colonne garde son nom en base
+    entry_metadata = Column("metadata", JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     processed = Column(Integer, default=0)
     sentiment_score = Column(Integer, nullable=True)
     keywords = Column(JSON, nullable=True)
 
+    # Index composites de la pagination par curseur (created_at, id), avec ou sans filtres
+    __table_args__ = (
+        Index("ix_data_entries_created_at_id", "created_at", "id"),
+        Index("ix_data_entries_source_created_at_id", "source", "created_at", "id"),
+        Index("ix_data_entries_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_data_entries_source_category_created_at_id", "source", "category", "created_at", "id"),
+    )
+
+class DataStatsRollup(Base):
+    """Compteurs par couple (source, catégorie), tenus à jour dans les transactions d'écriture"""
+    __tablename__ = "data_stats_rollup"
+
+    source = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+
+# Colonnes retournées par /data lorsque le contenu n'est pas demandé
+LIST_COLUMNS = (
+    DataEntry.id, DataEntry.source, DataEntry.category, DataEntry.created_at,
+    DataEntry.processed, DataEntry.sentiment_score, DataEntry.keywords
+)
+
 # Modèles Pydantic
 class DataEntryCreate(BaseModel):
     source: str
@@ -45,12 +96,28 @@ class DataEntryCreate(BaseModel):
     content: dict
     metadata: Optional[dict] = None
 
+    def to_row(self) -> dict:
+        """Valeurs de colonnes correspondant à l'entrée"""
+        return {
+            "source": self.source,
+            "category": self.category,
+            "content": self.content,
+            "entry_metadata": self.metadata
+        }
+
+class DataEntryBatchCreate(BaseModel):
+    entries: List[DataEntryCreate] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+class DataEntryBatchResponse(BaseModel):
+    ids: List[int]
+    count: int
+
 class DataEntryResponse(BaseModel):
     id: int
     source: str
     category: str
-    content: dict
-    metadata: Optional[dict]
+    content: Optional[dict] = None
+    metadata: Optional[dict] = Field(None, validation_alias=AliasChoices("entry_metadata", "metadata"))
     created_at: datetime
     processed: int
     sentiment_score: Optional[int]
@@ -59,7 +126,176 @@ class DataEntryResponse(BaseModel):
 # Création des tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="ECHO Data Collector")
+# Agrégats des statistiques
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def rollup_supported(db: Session) -> bool:
+    """La table d'agrégats nécessite un upsert natif (PostgreSQL ou SQLite)"""
+    return db.get_bind().dialect.name in _UPSERT_DIALECTS
+
+def rollup_enabled(db: Session) -> bool:
+    """/stats lit la table d'agrégats (toujours à jour, même lorsque le drapeau était désactivé)"""
+    return STATS_ROLLUP_ENABLED and rollup_supported(db)
+
+def increment_rollup(db: Session, deltas: Dict[Tuple[str, str], Tuple[int, int, int]]):
+    """
+    Incrémente les compteurs de la table d'agrégats dans la transaction courante.
+
+    Args:
+        db: Session de la transaction d'écriture
+        deltas: Variations (total, traitées, erreurs) par couple (source, catégorie)
+    """
+    if not deltas or not rollup_supported(db):
+        return
+
+    upsert = _UPSERT_DIALECTS[db.get_bind().dialect.name]
+    # Ordre fixe des couples: les transactions concurrentes verrouillent les lignes dans le même ordre
+    for (source, category), (total, processed, errors) in sorted(deltas.items()):
+        stmt = upsert(DataStatsRollup).values(
+            source=source, category=category, total=total, processed=processed, errors=errors
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["source", "category"],
+            set_={
+                "total": DataStatsRollup.total + stmt.excluded.total,
+                "processed": DataStatsRollup.processed + stmt.excluded.processed,
+                "errors": DataStatsRollup.errors + stmt.excluded.errors,
+            }
+        ))
+
+def rollup_inserted(db: Session, rows: List[dict]):
+    """Comptabilise de nouvelles entrées (en attente de traitement)"""
+    counts = Counter((row["source"], row["category"]) for row in rows)
+    increment_rollup(db, {key: (count, 0, 0) for key, count in counts.items()})
+
+def rollup_processed(db: Session, entries: List[DataEntry]):
+    """Comptabilise les entrées d'un lot qui viennent d'être traitées ou rejetées"""
+    deltas: Dict[Tuple[str, str], Tuple[int, int, int]] = {}
+    for entry in entries:
+        total, processed, errors = deltas.get((entry.source, entry.category), (0, 0, 0))
+        deltas[(entry.source, entry.category)] = (
+            total, processed + (entry.processed == PROCESSED), errors + (entry.processed == FAILED)
+        )
+    increment_rollup(db, deltas)
+
+def _stats_columns(*group_columns):
+    """Compteurs calculés en une seule passe par sommes conditionnelles"""
+    return (
+        *group_columns,
+        func.count(DataEntry.id),
+        func.coalesce(func.sum(case((DataEntry.processed == PROCESSED, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((DataEntry.processed == FAILED, 1), else_=0)), 0),
+    )
+
+def rebuild_rollup(db: Session):
+    """Reconstruit la table d'agrégats à partir de data_entries (démarrage sur une base existante)"""
+    db.execute(delete(DataStatsRollup))
+    db.execute(insert(DataStatsRollup).from_select(
+        ["source", "category", "total", "processed", "errors"],
+        db.query(*_stats_columns(DataEntry.source, DataEntry.category))
+        .filter(DataEntry.source.isnot(None), DataEntry.category.isnot(None))
+        .group_by(DataEntry.source, DataEntry.category)
+        .statement
+    ))
+    db.commit()
+
+def _fold_stats(groups) -> Dict[str, Any]:
+    """Replie des compteurs par (source, catégorie) en réponse de /stats"""
+    stats = {"total_entries": 0, "processed_entries": 0, "error_entries": 0, "sources": {}, "categories": {}}
+    for source, category, total, processed, errors in groups:
+        if not total:
+            continue
+        stats["total_entries"] += total
+        stats["processed_entries"] += processed
+        stats["error_entries"] += errors
+        stats["sources"][source] = stats["sources"].get(source, 0) + total
+        stats["categories"][category] = stats["categories"].get(category, 0) + total
+    return stats
+
+def compute_stats(db: Session) -> Dict[str, Any]:
+    """
+    Calcule les statistiques de /stats.
+
+    Avec la table d'agrégats, le coût dépend du nombre de couples (source, catégorie)
+    et non du nombre d'entrées. Sinon, une seule requête d'agrégation est exécutée:
+    GROUPING SETS sous PostgreSQL, GROUP BY source, catégorie ailleurs.
+    """
+    if rollup_enabled(db):
+        return _fold_stats(db.query(
+            DataStatsRollup.source, DataStatsRollup.category,
+            DataStatsRollup.total, DataStatsRollup.processed, DataStatsRollup.errors
+        ).all())
+
+    if db.get_bind().dialect.name != "postgresql":
+        return _fold_stats(
+            db.query(*_stats_columns(DataEntry.source, DataEntry.category))
+            .group_by(DataEntry.source, DataEntry.category)
+            .all()
+        )
+
+    rows = (
+        db.query(*_stats_columns(
+            DataEntry.source, DataEntry.category,
+            func.grouping(DataEntry.source), func.grouping(DataEntry.category)
+        ))
+        .group_by(func.grouping_sets(tuple_(DataEntry.source), tuple_(DataEntry.category), tuple_()))
+        .all()
+    )
+    stats = {"total_entries": 0, "processed_entries": 0, "error_entries": 0, "sources": {}, "categories": {}}
+    for source, category, source_grouped, category_grouped, total, processed, errors in rows:
+        if source_grouped and category_grouped:
+            stats.update(total_entries=total, processed_entries=processed, error_entries=errors)
+        elif category_grouped:
+            stats["sources"][source] = total
+        else:
+            stats["categories"][category] = total
+    return stats
+
+_stats_cache: Dict[str, Any] = {"expires_at": 0.0, "value": None}
+
+# File de traitement NLP des entrées en attente
+processing_queue = ProcessingQueue(SessionLocal, DataEntry, on_processed=rollup_processed)
+
+# Ordonnanceur des sources sociales (créé au démarrage si la collecte est activée),
+# dont l'état de santé est exposé par /health et /stats
+source_scheduler: Optional[SourceScheduler] = None
+
+def collection_health() -> Optional[Dict[str, Any]]:
+    """Santé des sources de collecte et profondeur de la file d'ingestion, None sans collecte"""
+    return source_scheduler.health() if source_scheduler else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db = SessionLocal()
+    try:
+        # Base existante sans agrégats (table créée par create_all): reconstruction unique
+        if rollup_supported(db) and db.query(DataStatsRollup).first() is None \
+                and db.query(DataEntry.id).first() is not None:
+            rebuild_rollup(db)
+    finally:
+        db.close()
+    await processing_queue.start()
+
+    global source_scheduler
+    collector = None
+    if SOCIAL_COLLECTION_ENABLED and source_scheduler is None:
+        # Import différé: dépendances des réseaux sociaux (tweepy, MongoDB) requises seulement ici
+        from social_collector import SocialCollector
+        collector = SocialCollector()
+        source_scheduler = collector.build_scheduler(SOCIAL_COLLECTION_INTERVAL)
+    collection = asyncio.create_task(source_scheduler.run()) if source_scheduler else None
+
+    yield
+
+    if collection:
+        await source_scheduler.stop()
+        await collection
+    if collector:
+        await run_in_threadpool(collector.nlp_dispatcher.stop)
+    await processing_queue.stop()
+    await token_verifier.close()
+
+app = FastAPI(title="ECHO Data Collector", lifespan=lifespan)
 
 # Dépendances
 def get_db():
@@ -70,103 +306,133 @@ def get_db():
         db.close()
 
 async def verify_token(token: str = Depends(oauth2_scheme)):
-    """Vérifie le token JWT avec le service d'authentification"""
-    auth_service_url = os.getenv("AUTH_SERVICE_URL", "http://auth-service:5003")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{auth_service_url}/verify",
-                json={"token": token}
-            )
-            if response.status_code == 200:
-                return response.json()
-            raise HTTPException(status_code=401, detail="Token invalide")
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification du token: {e}")
-            raise HTTPException(status_code=500, detail="Erreur de service")
-
-async def process_data(entry_id: int, db: Session):
-    """Traitement asynchrone des données"""
-    try:
-        entry = db.query(DataEntry).filter(DataEntry.id == entry_id).first()
-        if not entry:
-            return
-
-        # Appel au service NLP pour l'analyse
-        nlp_service_url = os.getenv("NLP_SERVICE_URL", "http://nlp-engine:5000")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{nlp_service_url}/analyze",
-                json={"text": json.dumps(entry.content)}
-            )
-            if response.status_code == 200:
-                analysis = response.json()
-                entry.sentiment_score = analysis.get("sentiment_score")
-                entry.keywords = analysis.get("keywords")
-                entry.processed = 1
-                db.commit()
-
-    except Exception as e:
-        logger.error(f"Erreur lors du traitement des données: {e}")
-        entry.processed = -1
-        db.commit()
+    """Vérifie le token JWT localement (clés du service d'authentification en cache)"""
+    return await token_verifier.verify(token)
 
 @app.post("/collect", response_model=DataEntryResponse)
 async def collect_data(
     data: DataEntryCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     token: dict = Depends(verify_token)
 ):
     """Collecte de nouvelles données"""
-    db_entry = DataEntry(**data.dict())
+    row = data.to_row()
+    db_entry = DataEntry(**row)
     db.add(db_entry)
+    rollup_inserted(db, [row])
     db.commit()
     db.refresh(db_entry)
 
-    # Lancement du traitement en arrière-plan
-    background_tasks.add_task(process_data, db_entry.id, db)
+    # Réveil des workers de traitement
+    processing_queue.notify()
 
     return db_entry
 
+@app.post("/collect/batch", response_model=DataEntryBatchResponse)
+async def collect_batch(
+    batch: DataEntryBatchCreate,
+    db: Session = Depends(get_db),
+    token: dict = Depends(verify_token)
+):
+    """Collecte d'un lot de données en une seule insertion"""
+    rows = [entry.to_row() for entry in batch.entries]
+    ids = db.scalars(
+        insert(DataEntry).returning(DataEntry.id, sort_by_parameter_order=True),
+        rows
+    ).all()
+    rollup_inserted(db, rows)
+    db.commit()
+
+    # Les workers traitent le lot en un seul appel au service NLP
+    processing_queue.notify()
+
+    return {"ids": ids, "count": len(ids)}
+
+def encode_cursor(entry) -> str:
+    """Encode la position (created_at, id) d'une entrée en curseur opaque"""
+    payload = json.dumps({"created_at": entry.created_at.isoformat(), "id": entry.id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Décode un curseur produit par encode_cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
 @app.get("/data", response_model=List[DataEntryResponse])
 async def get_data(
+    response: Response,
     source: Optional[str] = None,
     category: Optional[str] = None,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    include_content: bool = True,
     db: Session = Depends(get_db),
     token: dict = Depends(verify_token)
 ):
-    """Récupération des données collectées"""
-    query = db.query(DataEntry)
+    """
+    Récupération des données collectées, des plus récentes aux plus anciennes.
+    La page suivante s'obtient en passant l'en-tête X-Next-Cursor dans le paramètre cursor.
+    """
+    if include_content:
+        query = db.query(DataEntry)
+    else:
+        # Vue liste: les colonnes JSON volumineuses ne sont pas lues
+        query = db.query(*LIST_COLUMNS)
     
     if source:
         query = query.filter(DataEntry.source == source)
     if category:
         query = query.filter(DataEntry.category == category)
+    if cursor:
+        query = query.filter(tuple_(DataEntry.created_at, DataEntry.id) < tuple_(*decode_cursor(cursor)))
     
-    return query.order_by(DataEntry.created_at.desc()).limit(limit).all()
+    entries = query.order_by(DataEntry.created_at.desc(), DataEntry.id.desc()).limit(limit + 1).all()
+    
+    if len(entries) > limit:
+        entries = entries[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(entries[-1])
+    
+    if not include_content:
+        return [entry._asdict() for entry in entries]
+    return entries
 
 @app.get("/stats")
 async def get_stats(
     db: Session = Depends(get_db),
     token: dict = Depends(verify_token)
 ):
-    """Statistiques sur les données collectées"""
-    total_entries = db.query(DataEntry).count()
-    processed_entries = db.query(DataEntry).filter(DataEntry.processed == 1).count()
-    error_entries = db.query(DataEntry).filter(DataEntry.processed == -1).count()
-    
-    sources = db.query(DataEntry.source, func.count(DataEntry.id)).group_by(DataEntry.source).all()
-    categories = db.query(DataEntry.category, func.count(DataEntry.id)).group_by(DataEntry.category).all()
-    
-    return {
-        "total_entries": total_entries,
-        "processed_entries": processed_entries,
-        "error_entries": error_entries,
-        "sources": dict(sources),
-        "categories": dict(categories)
-    }
+    """
+    Statistiques sur les données collectées, mises en cache STATS_CACHE_TTL secondes,
+    et santé des sources de collecte (toujours à jour)
+    """
+    now = time.monotonic()
+    if _stats_cache["value"] is None or now >= _stats_cache["expires_at"]:
+        stats = await run_in_threadpool(compute_stats, db)
+        _stats_cache.update(value=stats, expires_at=now + STATS_CACHE_TTL)
+    return {**_stats_cache["value"], "collection": collection_health()}
+
+@app.get("/queue")
+async def get_queue_stats(token: dict = Depends(verify_token)):
+    """Profondeur et retard de la file de traitement"""
+    return await run_in_threadpool(processing_queue.stats)
+
+@app.get("/health")
+async def health_check():
+    """État du service et de chaque source de collecte (dégradé si une source échoue de manière répétée)"""
+    collection = collection_health()
+    failing = [
+        name for name, health in (collection or {}).get("sources", {}).items() if health["state"] == "failing"
+    ]
+    return {"status": "degraded" if failing else "healthy", "failing_sources": failing, "collection": collection}
+
+@app.get("/metrics")
+async def metrics():
+    """Métriques Prometheus"""
+    await run_in_threadpool(processing_queue.stats)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,286 @@
+"""
+Module d'envoi asynchrone des mentions vers le service NLP pour le projet ECHO.
+Les mentions prioritaires sont regroupées en lots envoyés à l'endpoint
+/analyze/batch du moteur NLP, puis les résultats sont réécrits en base
+par une mise à jour groupée, sans jamais bloquer le chemin d'ingestion.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+import httpx
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# URL du service NLP et jeton de service optionnel
+NLP_SERVICE_URL = os.environ.get("NLP_SERVICE_URL", "http://nlp-engine:5000")
+NLP_SERVICE_TOKEN = os.environ.get("NLP_SERVICE_TOKEN", "")
+
+
+class NLPDispatcher:
+    """
+    Répartiteur asynchrone des analyses NLP.
+    Il possède sa propre boucle asyncio dans un thread dédié, accumule les
+    mentions soumises et les envoie par lots via un client HTTP mutualisé.
+    """
+
+    def __init__(
+        self,
+        collection,
+        nlp_url: str = NLP_SERVICE_URL,
+        batch_size: int = 32,
+        flush_interval: float = 0.5,
+        max_in_flight: int = 4,
+        max_queue_size: int = 10000,
+        timeout: float = 10.0,
+        token: Optional[str] = NLP_SERVICE_TOKEN,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialise le répartiteur.
+
+        Args:
+            collection: Collection MongoDB où réécrire les résultats d'analyse
+            nlp_url: URL de base du service NLP
+            batch_size: Nombre maximum de mentions par requête /analyze/batch
+            flush_interval: Délai maximum (secondes) avant l'envoi d'un lot incomplet
+            max_in_flight: Nombre maximum de requêtes NLP simultanées
+            max_queue_size: Taille maximale de la file d'attente (au-delà, les mentions sont ignorées)
+            timeout: Délai d'expiration des requêtes HTTP en secondes
+            token: Jeton d'authentification envoyé au service NLP
+            transport: Transport httpx alternatif (tests)
+        """
+        self.collection = collection
+        self.nlp_url = nlp_url.rstrip("/")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_in_flight = max_in_flight
+        self.max_queue_size = max_queue_size
+        self.timeout = timeout
+        self.token = token
+        self.transport = transport
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._ready = threading.Event()
+        self._stopping = False
+        # Démarrage unique même si plusieurs threads soumettent en même temps
+        self._start_lock = threading.Lock()
+        # Mentions soumises non encore prises dans un lot, comptées sous verrou par les
+        # threads appelants: la saturation est connue au moment de submit
+        self._queued_lock = threading.Lock()
+        self._queued = 0
+
+        self.stats = {"submitted": 0, "dropped": 0, "sent": 0, "failed": 0, "updated": 0}
+
+    def start(self) -> None:
+        """
+        Démarre la boucle d'envoi dans un thread d'arrière-plan.
+        """
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+
+            self._stopping = False
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._thread_main, name="nlp-dispatcher", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+        logger.info(f"NLPDispatcher démarré (lots de {self.batch_size}, {self.max_in_flight} requêtes max)")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """
+        Vide la file d'attente, attend la fin des requêtes en cours et arrête la boucle.
+
+        Args:
+            timeout: Délai maximum d'attente en secondes
+        """
+        if not self._loop or not self._thread:
+            return
+
+        self._stopping = True
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        self._thread.join(timeout)
+        logger.info(f"NLPDispatcher arrêté: {self.stats}")
+
+    def submit(self, doc_id: str, text: str) -> bool:
+        """
+        Soumet une mention pour analyse. Appel non bloquant, utilisable depuis n'importe quel thread.
+
+        Args:
+            doc_id: ID du document dans la base de données
+            text: Texte à analyser
+
+        Returns:
+            True si la mention a été prise en compte, False si elle est ignorée (file saturée)
+        """
+        if not self._loop or self._stopping:
+            self.start()
+
+        with self._queued_lock:
+            if self._queued >= self.max_queue_size:
+                self.stats["dropped"] += 1
+                logger.warning(f"File NLP saturée, mention ignorée: {doc_id}")
+                return False
+            self._queued += 1
+            self.stats["submitted"] += 1
+
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (doc_id, text))
+        return True
+
+    def _dequeued(self, count: int) -> None:
+        with self._queued_lock:
+            self._queued -= count
+
+    def _thread_main(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        # Taille bornée par submit (voir _queued): la file elle-même n'est pas limitée.
+        # Créée avant de publier la boucle, que submit utilise dès qu'elle est définie
+        self._queue = asyncio.Queue()
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_until_complete(self._run())
+        finally:
+            loop.close()
+
+    async def _run(self) -> None:
+        """
+        Boucle principale: constitue les lots et les envoie en bornant le nombre de requêtes en vol.
+        """
+        headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+        limits = httpx.Limits(
+            max_connections=self.max_in_flight,
+            max_keepalive_connections=self.max_in_flight
+        )
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        pending = set()
+
+        async with httpx.AsyncClient(
+            base_url=self.nlp_url,
+            headers=headers,
+            limits=limits,
+            timeout=self.timeout,
+            transport=self.transport
+        ) as client:
+            while True:
+                batch, closed = await self._next_batch()
+
+                if batch:
+                    await semaphore.acquire()
+                    task = asyncio.create_task(self._send_batch(client, batch))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    task.add_done_callback(lambda _: semaphore.release())
+
+                if closed:
+                    break
+
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _next_batch(self) -> Tuple[List[Tuple[str, str]], bool]:
+        """
+        Attend la première mention puis complète le lot jusqu'à batch_size ou flush_interval.
+
+        Returns:
+            Tuple (lot de mentions, indicateur d'arrêt)
+        """
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+
+        batch = [item]
+        closed = False
+        deadline = self._loop.time() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                closed = True
+                break
+            batch.append(item)
+
+        self._dequeued(len(batch))
+        return batch, closed
+
+    async def _send_batch(self, client: httpx.AsyncClient, batch: List[Tuple[str, str]]) -> None:
+        """
+        Envoie un lot de mentions au service NLP et réécrit les résultats.
+
+        Args:
+            client: Client HTTP mutualisé
+            batch: Liste de tuples (doc_id, texte)
+        """
+        try:
+            response = await client.post(
+                "/analyze/batch",
+                json={"texts": [text for _, text in batch]}
+            )
+
+            if response.status_code != 200:
+                self.stats["failed"] += len(batch)
+                logger.error(f"Erreur lors de l'envoi au service NLP: {response.status_code}")
+                return
+
+            results = response.json()["results"]
+            if not isinstance(results, list) or not all(isinstance(result, dict) for result in results):
+                raise TypeError("liste de résultats attendue")
+
+        except httpx.HTTPError as e:
+            self.stats["failed"] += len(batch)
+            logger.error(f"Erreur de connexion au service NLP: {e}")
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            # Réponse 200 mal formée: le lot est compté en échec sans interrompre la boucle
+            self.stats["failed"] += len(batch)
+            logger.error(f"Réponse invalide du service NLP: {e!r}")
+            return
+
+        self.stats["sent"] += len(batch)
+
+        # L'écriture MongoDB est synchrone: elle est déportée hors de la boucle
+        await self._loop.run_in_executor(None, self._write_results, batch, results)
+
+    def _write_results(self, batch: List[Tuple[str, str]], results: List[Dict[str, Any]]) -> None:
+        """
+        Réécrit les résultats d'un lot en une seule opération groupée.
+
+        Args:
+            batch: Liste de tuples (doc_id, texte) envoyés
+            results: Résultats d'analyse, dans le même ordre que le lot
+        """
+        operations = []
+        for (doc_id, _), analysis in zip(batch, results):
+            try:
+                object_id = ObjectId(doc_id)
+            except (InvalidId, TypeError):
+                object_id = doc_id
+            operations.append(UpdateOne(
+                {"_id": object_id},
+                {"$set": {"nlp_analysis": analysis, "processed": True}}
+            ))
+
+        if not operations:
+            return
+
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            self.stats["updated"] += result.modified_count
+            logger.info(f"{len(operations)} analyses NLP enregistrées")
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enregistrement des analyses NLP: {e}")
@@ -0,0 +1,143 @@
+"""
+Source de rejeu de tweets pour le projet ECHO.
+Ce module relit un fichier JSONL de tweets enregistrés et les injecte dans le
+même chemin que le stream Twitter (SocialCollector.handle_tweet), en respectant
+les écarts de temps d'origine accélérés d'un facteur configurable et modulés
+par un profil de rafales. Il permet de mesurer l'ingestion sans accès à Twitter.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ReplaySource:
+    """
+    Rejoue un fichier JSONL de tweets vers une fonction on_tweet.
+    Chaque ligne est un objet JSON avec au minimum "id" et "text", et
+    optionnellement "author_id", "created_at" (ISO 8601), "lang" et "geo".
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        rate_multiplier: float = 1.0,
+        burst_profile: Optional[List[Tuple[float, float]]] = None,
+        default_interval: float = 0.01,
+    ):
+        """
+        Initialise la source de rejeu.
+
+        Args:
+            file_path: Chemin vers le fichier JSONL de tweets
+            rate_multiplier: Facteur d'accélération du temps d'origine (0 pour rejouer sans attente)
+            burst_profile: Segments (durée en secondes, multiplicateur) appliqués cycliquement
+                           au facteur d'accélération, par exemple [(5, 1), (1, 20)]
+            default_interval: Écart d'origine supposé entre deux tweets sans created_at
+
+        Raises:
+            ValueError: Segment de rafale de durée ou de multiplicateur nul ou négatif
+        """
+        for duration, multiplier in burst_profile or []:
+            # Un multiplicateur nul ou négatif rendrait l'attente entre tweets infinie ou négative
+            if duration <= 0 or multiplier <= 0:
+                raise ValueError(f"Segment de rafale invalide ({duration}, {multiplier}): durée et multiplicateur doivent être positifs")
+        self.file_path = file_path
+        self.rate_multiplier = rate_multiplier
+        self.burst_profile = burst_profile or []
+        self.default_interval = default_interval
+        self._profile_period = sum(duration for duration, _ in self.burst_profile)
+
+    def tweets(self) -> Iterator[SimpleNamespace]:
+        """
+        Lit le fichier de manière paresseuse et convertit chaque ligne en tweet.
+
+        Returns:
+            Itérateur de tweets exposant les mêmes attributs que ceux du stream
+        """
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                yield self._to_tweet(json.loads(line))
+
+    def _to_tweet(self, data: Dict[str, Any]) -> SimpleNamespace:
+        created_at = data.get("created_at")
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+
+        return SimpleNamespace(
+            id=data["id"],
+            text=data["text"],
+            author_id=data.get("author_id"),
+            created_at=created_at,
+            lang=data.get("lang", "unknown"),
+            geo=data.get("geo"),
+            retweeted=data.get("retweeted", False),
+        )
+
+    def _current_multiplier(self, elapsed: float) -> float:
+        """
+        Facteur d'accélération effectif à un instant donné du rejeu.
+
+        Args:
+            elapsed: Temps écoulé depuis le début du rejeu en secondes
+        """
+        if not self._profile_period:
+            return self.rate_multiplier
+
+        position = elapsed % self._profile_period
+        for duration, multiplier in self.burst_profile:
+            if position < duration:
+                return self.rate_multiplier * multiplier
+            position -= duration
+
+        return self.rate_multiplier
+
+    def replay(self, on_tweet: Callable[[SimpleNamespace], Any], limit: Optional[int] = None) -> int:
+        """
+        Rejoue les tweets vers on_tweet en respectant le rythme configuré.
+
+        Args:
+            on_tweet: Fonction appelée pour chaque tweet (par exemple SocialCollector.handle_tweet)
+            limit: Nombre maximum de tweets à rejouer
+
+        Returns:
+            Nombre de tweets rejoués
+        """
+        logger.info(f"Rejeu de {self.file_path} (x{self.rate_multiplier}, profil: {self.burst_profile or 'constant'})")
+
+        start = time.perf_counter()
+        deadline = start
+        previous_created_at = None
+        count = 0
+
+        for tweet in self.tweets():
+            if limit is not None and count >= limit:
+                break
+
+            if self.rate_multiplier > 0:
+                if previous_created_at and tweet.created_at:
+                    gap = max(0.0, (tweet.created_at - previous_created_at).total_seconds())
+                else:
+                    gap = self.default_interval if count else 0.0
+                previous_created_at = tweet.created_at
+
+                # Échéance absolue pour ne pas accumuler de dérive entre deux tweets
+                deadline += gap / self._current_multiplier(deadline - start)
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            on_tweet(tweet)
+            count += 1
+
+        duration = time.perf_counter() - start
+        logger.info(f"{count} tweets rejoués en {duration:.2f}s")
+        return count
@@ -0,0 +1,325 @@
+"""
+Ordonnanceur asynchrone des sources de collecte pour le projet ECHO.
+Chaque source (stream Twitter, pages Facebook, futurs flux RSS ou formulaires)
+est une tâche asyncio avec son propre intervalle, sa gigue, sa limite de
+concurrence et son état de santé. Toutes alimentent une file d'ingestion
+commune, vidée par lots vers le stockage.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Union
+
+logger = logging.getLogger(__name__)
+
+# Fonction de publication d'une mention dans la file d'ingestion
+Emit = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class SourceHealth:
+    """
+    État de santé d'une source de collecte.
+    """
+
+    FAILURE_THRESHOLD = 3
+
+    def __init__(self):
+        self.state = "idle"
+        self.last_run: Optional[datetime] = None
+        self.last_success: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self.runs = 0
+        self.items = 0
+
+    def record_success(self, items: int = 0) -> None:
+        self.last_success = datetime.now()
+        self.consecutive_failures = 0
+        self.items += items
+        self.state = "healthy"
+
+    def record_failure(self, error: Exception) -> None:
+        self.last_error = str(error)
+        self.consecutive_failures += 1
+        self.state = "failing" if self.consecutive_failures >= self.FAILURE_THRESHOLD else "degraded"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_success": self.last_success.isoformat() if self.last_success else None,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "runs": self.runs,
+            "items": self.items,
+        }
+
+
+class CollectorSource:
+    """
+    Source de collecte périodique.
+    La fonction fetch peut être synchrone (exécutée dans le pool de threads
+    partagé de la boucle) ou une coroutine, et retourne une liste de mentions
+    {"text": ..., "metadata": ...}.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Union[List[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]]],
+        interval: float = 3600,
+        jitter: float = 0.1,
+        concurrency: int = 1,
+        max_backoff: float = 8.0,
+        source: Optional[str] = None,
+    ):
+        """
+        Args:
+            name: Nom de la source (unique dans l'ordonnanceur)
+            fetch: Fonction de collecte
+            interval: Intervalle entre deux collectes en secondes
+            jitter: Gigue relative appliquée à l'intervalle (0.1 = ±10 %)
+            concurrency: Nombre maximum de collectes simultanées de cette source
+            max_backoff: Facteur maximum d'allongement de l'intervalle en cas d'échecs répétés
+            source: Libellé de source enregistré avec les mentions (par défaut, le nom)
+        """
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self.max_backoff = max_backoff
+        self.source = source or name
+        self.health = SourceHealth()
+
+    def next_delay(self) -> float:
+        """
+        Délai avant la prochaine collecte, allongé en cas d'échecs répétés.
+        """
+        backoff = min(2 ** self.health.consecutive_failures, self.max_backoff)
+        delay = self.interval * backoff
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def run(self, emit: Emit, stopping: asyncio.Event) -> None:
+        """
+        Boucle de collecte de la source.
+
+        Args:
+            emit: Fonction de publication dans la file d'ingestion
+            stopping: Événement signalant l'arrêt de l'ordonnanceur
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        running = set()
+
+        while not stopping.is_set():
+            if semaphore.locked():
+                logger.warning(f"Source {self.name}: collecte précédente toujours en cours, cycle ignoré")
+            else:
+                await semaphore.acquire()
+                task = asyncio.create_task(self._collect_once(emit))
+                running.add(task)
+                task.add_done_callback(running.discard)
+                task.add_done_callback(lambda _: semaphore.release())
+
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=self.next_delay())
+            except asyncio.TimeoutError:
+                pass
+
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def _collect_once(self, emit: Emit) -> None:
+        self.health.last_run = datetime.now()
+        self.health.runs += 1
+        self.health.state = "running"
+
+        try:
+            if asyncio.iscoroutinefunction(self.fetch):
+                items = await self.fetch()
+            else:
+                items = await asyncio.to_thread(self.fetch)
+
+            for item in items or []:
+                await emit(item)
+
+            self.health.record_success(len(items or []))
+        except Exception as e:
+            self.health.record_failure(e)
+            logger.error(f"Erreur lors de la collecte de la source {self.name}: {e}")
+
+
+class StreamSource(CollectorSource):
+    """
+    Source de collecte en continu (par exemple le stream Twitter).
+    La coroutine stream reçoit la fonction emit et ne rend la main qu'en fin
+    de flux; elle est relancée avec un délai croissant en cas d'erreur.
+    """
+
+    def __init__(self, name: str, stream: Callable[[Emit], Awaitable[None]], retry_interval: float = 5,
+                 max_backoff: float = 60.0, source: Optional[str] = None):
+        """
+        Args:
+            name: Nom de la source
+            stream: Coroutine de lecture du flux
+            retry_interval: Délai initial avant reconnexion en secondes
+            max_backoff: Facteur maximum d'allongement du délai de reconnexion
+            source: Libellé de source enregistré avec les mentions
+        """
+        super().__init__(name, fetch=None, interval=retry_interval, max_backoff=max_backoff, source=source)
+        self.stream = stream
+
+    async def run(self, emit: Emit, stopping: asyncio.Event) -> None:
+        async def counting_emit(item: Dict[str, Any]) -> None:
+            self.health.items += 1
+            await emit(item)
+
+        while not stopping.is_set():
+            self.health.last_run = datetime.now()
+            self.health.runs += 1
+            self.health.state = "running"
+
+            stream_task = asyncio.create_task(self.stream(counting_emit))
+            stop_task = asyncio.create_task(stopping.wait())
+            await asyncio.wait({stream_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+
+            if not stream_task.done():
+                stream_task.cancel()
+                await asyncio.gather(stream_task, return_exceptions=True)
+                break
+            stop_task.cancel()
+
+            error = stream_task.exception()
+            if error:
+                self.health.record_failure(error)
+                logger.error(f"Flux {self.name} interrompu: {error}")
+            else:
+                self.health.record_success()
+                logger.info(f"Flux {self.name} terminé, reconnexion")
+
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=self.next_delay())
+            except asyncio.TimeoutError:
+                pass
+
+
+class SourceScheduler:
+    """
+    Ordonnanceur des sources de collecte et consommateur de la file d'ingestion commune.
+    """
+
+    def __init__(
+        self,
+        store_batch: Callable[[List[Dict[str, Any]], str], Any],
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Args:
+            store_batch: Fonction synchrone de stockage d'un lot (mentions, source)
+            queue_size: Taille maximale de la file d'ingestion (au-delà, les sources attendent)
+            batch_size: Nombre maximum de mentions par écriture
+            flush_interval: Délai maximum avant l'écriture d'un lot incomplet
+        """
+        self.store_batch = store_batch
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sources: Dict[str, CollectorSource] = {}
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._started = asyncio.Event()
+
+    def add_source(self, source: CollectorSource) -> None:
+        """
+        Enregistre une source. Doit être appelé avant run().
+        """
+        if source.name in self.sources:
+            raise ValueError(f"Source déjà enregistrée: {source.name}")
+        self.sources[source.name] = source
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """
+        État de santé de chaque source et profondeur de la file d'ingestion.
+        """
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "sources": {name: source.health.to_dict() for name, source in self.sources.items()},
+        }
+
+    def submit_threadsafe(self, source: str, item: Dict[str, Any]) -> None:
+        """
+        Publie une mention depuis un autre thread (par exemple un SDK synchrone).
+        """
+        asyncio.run_coroutine_threadsafe(self.queue.put((source, item)), self.loop).result()
+
+    async def run(self) -> None:
+        """
+        Lance toutes les sources et le consommateur jusqu'à l'appel de stop().
+        """
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._stopping = asyncio.Event()
+        self._started.set()
+
+        logger.info(f"Démarrage de l'ordonnanceur avec {len(self.sources)} sources")
+
+        consumer = asyncio.create_task(self._consume())
+        source_tasks = [
+            asyncio.create_task(source.run(self._emitter(source), self._stopping), name=f"source-{name}")
+            for name, source in self.sources.items()
+        ]
+
+        await self._stopping.wait()
+        await asyncio.gather(*source_tasks, return_exceptions=True)
+
+        # Vidage de la file avant l'arrêt du consommateur
+        await self.queue.join()
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        logger.info("Ordonnanceur arrêté")
+
+    async def stop(self) -> None:
+        await self._started.wait()
+        self._stopping.set()
+
+    def _emitter(self, source: CollectorSource) -> Emit:
+        async def emit(item: Dict[str, Any]) -> None:
+            await self.queue.put((source.source, item))
+        return emit
+
+    async def _consume(self) -> None:
+        """
+        Vide la file d'ingestion par lots regroupés par source.
+        """
+        while True:
+            first = await self.queue.get()
+            batch = [first]
+            deadline = self.loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            by_source: Dict[str, List[Dict[str, Any]]] = {}
+            for source, item in batch:
+                by_source.setdefault(source, []).append(item)
+
+            for source, items in by_source.items():
+                try:
+                    await asyncio.to_thread(self.store_batch, items, source)
+                except Exception as e:
+                    logger.error(f"Erreur lors du stockage de {len(items)} mentions ({source}): {e}")
+
+            for _ in batch:
+                self.queue.task_done()
@@ -6,15 +6,20 @@ concernant les services publics, l'infrastructure urbaine et autres sujets d'int
 
 import os
 import json
+import asyncio
 import logging
-import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Callable
 
 import tweepy
+from tweepy.asynchronous import AsyncStreamingClient
 from textblob import TextBlob
-import requests
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from backfill import HistoricalBackfill, RateLimitBudget, TweepySearchClient
+from nlp_dispatcher import NLPDispatcher
+from scheduler import SourceScheduler, CollectorSource, StreamSource
 
 # Configuration du logging
 logging.basicConfig(
@@ -28,6 +33,8 @@ TWITTER_API_KEY = os.environ.get("TWITTER_API_KEY", "")
 TWITTER_API_SECRET = os.environ.get("TWITTER_API_SECRET", "")
 TWITTER_ACCESS_TOKEN = os.environ.get("TWITTER_ACCESS_TOKEN", "")
 TWITTER_ACCESS_SECRET = os.environ.get("TWITTER_ACCESS_SECRET", "")
+# Jeton d'application de l'API v2 (stream filtré)
+TWITTER_BEARER_TOKEN = os.environ.get("TWITTER_BEARER_TOKEN", "")
 
 # URL des services internes
 NLP_SERVICE_URL = os.environ.get("NLP_SERVICE_URL", "http://nlp-engine:5000")
@@ -39,20 +46,30 @@ class SocialCollector:
     pertinentes pour les services publics et les autorités locales.
     """
     
-    def __init__(self):
+    def __init__(self, mongo_client: Optional[MongoClient] = None):
         """
         Initialise le collecteur avec les configurations API nécessaires
         et la connexion à la base de données.
+        
+        Args:
+            mongo_client: Client MongoDB à utiliser (par défaut, connexion à MONGO_URI)
         """
         # Initialisation de l'API Twitter
         self.auth = tweepy.OAuthHandler(TWITTER_API_KEY, TWITTER_API_SECRET)
         self.auth.set_access_token(TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET)
         self.twitter_api = tweepy.API(self.auth, wait_on_rate_limit=True)
         
+        # Budget de requêtes de recherche partagé par toutes les collectes historiques
+        self.search_budget = RateLimitBudget()
+        
         # Connexion à MongoDB
-        self.mongo_client = MongoClient(MONGO_URI)
+        self.mongo_client = mongo_client or MongoClient(MONGO_URI)
         self.db = self.mongo_client.echo_project
         self.social_mentions = self.db.social_mentions
+        self._ensure_indexes()
+        
+        # Envoi groupé et asynchrone des mentions prioritaires au service NLP
+        self.nlp_dispatcher = NLPDispatcher(self.social_mentions, nlp_url=NLP_SERVICE_URL)
         
         logger.info("SocialCollector initialisé avec succès")
         
@@ -109,9 +126,9 @@ class SocialCollector:
         
         return text
     
-    def _store_in_db(self, text: str, metadata: Dict[str, Any], source: str) -> str:
+    def _build_document(self, text: str, metadata: Dict[str, Any], source: str) -> Dict[str, Any]:
         """
-        Stocke une mention dans la base de données.
+        Construit le document d'une mention (sentiment, catégories, priorité).
         
         Args:
             text: Texte de la mention
@@ -119,7 +136,7 @@ class SocialCollector:
             source: Source de la mention (Twitter, Facebook, etc.)
             
         Returns:
-            ID de l'entrée créée dans la base de données
+            Document prêt à être inséré dans la base de données
         """
         # Analyse de sentiment basique avec TextBlob
         blob = TextBlob(text)
@@ -142,7 +159,7 @@ class SocialCollector:
                     break
         
         # Création du document
-        document = {
+        return {
             "text": text,
             "source": source,
             "timestamp": datetime.now(),
@@ -156,16 +173,106 @@ class SocialCollector:
             "nlp_analysis": None,
             "priority": self._calculate_priority(text, sentiment, categories)
         }
+    
+    def _ensure_indexes(self) -> None:
+        """
+        Crée l'index unique (source, tweet_id) qui rend l'ingestion idempotente.
+        L'index est partiel: les mentions sans tweet_id (Facebook, etc.) ne sont pas concernées.
+        """
+        try:
+            self.social_mentions.create_index(
+                [("metadata.tweet_id", ASCENDING), ("source", ASCENDING)],
+                name="uniq_source_tweet_id",
+                unique=True,
+                partialFilterExpression={"metadata.tweet_id": {"$exists": True}}
+            )
+        except OperationFailure as e:
+            logger.warning(f"Impossible de créer l'index unique des tweets (doublons existants ?): {e}")
+    
+    def _store_in_db(self, text: str, metadata: Dict[str, Any], source: str) -> str:
+        """
+        Stocke une mention dans la base de données.
         
-        # Insertion dans la base de données
-        result = self.social_mentions.insert_one(document)
-        logger.debug(f"Mention stockée avec ID: {result.inserted_id}")
+        Args:
+            text: Texte de la mention
+            metadata: Métadonnées associées (langue, sentiment, etc.)
+            source: Source de la mention (Twitter, Facebook, etc.)
+            
+        Returns:
+            ID de l'entrée dans la base de données (existante si la mention était déjà connue)
+        """
+        return self._store_many([{"text": text, "metadata": metadata}], source)[0]
+    
+    def _store_many(self, items: List[Dict[str, Any]], source: str) -> List[str]:
+        """
+        Stocke un lot de mentions en une seule écriture groupée.
+        Les tweets sont insérés par upsert sur (source, tweet_id): une mention déjà
+        connue (reconnexion du stream, recherches qui se recoupent) n'est ni dupliquée
+        ni renvoyée au service NLP.
+        
+        Args:
+            items: Liste de mentions {"text": ..., "metadata": ...}
+            source: Source des mentions (Twitter, Facebook, etc.)
+            
+        Returns:
+            IDs des entrées, dans l'ordre du lot
+        """
+        if not items:
+            return []
+        
+        documents = [self._build_document(item["text"], item["metadata"], source) for item in items]
+        
+        operations = []
+        for document in documents:
+            tweet_id = (document["metadata"] or {}).get("tweet_id")
+            if tweet_id is None:
+                operations.append(InsertOne(document))
+            else:
+                operations.append(UpdateOne(
+                    {"source": source, "metadata.tweet_id": tweet_id},
+                    {"$setOnInsert": document},
+                    upsert=True
+                ))
         
-        # Envoyer pour analyse NLP si priorité élevée
-        if document["priority"] >= 3:
-            self._send_to_nlp(text, str(result.inserted_id))
+        try:
+            result = self.social_mentions.bulk_write(operations, ordered=False)
+            upserted_ids = result.upserted_ids
+        except BulkWriteError as e:
+            # Deux upserts concurrents sur le même tweet: l'un des deux échoue en doublon
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+            upserted_ids = {upsert["index"]: upsert["_id"] for upsert in e.details.get("upserted", [])}
+        
+        doc_ids = []
+        duplicates = {}
+        for index, (operation, document) in enumerate(zip(operations, documents)):
+            if isinstance(operation, InsertOne):
+                doc_ids.append(str(document["_id"]))
+            elif index in upserted_ids:
+                doc_ids.append(str(upserted_ids[index]))
+            else:
+                doc_ids.append(None)
+                duplicates.setdefault(document["metadata"]["tweet_id"], []).append(index)
+        
+        # Récupération en une requête des IDs des mentions déjà connues
+        if duplicates:
+            existing = self.social_mentions.find(
+                {"source": source, "metadata.tweet_id": {"$in": list(duplicates)}},
+                {"_id": 1, "metadata.tweet_id": 1}
+            )
+            for doc in existing:
+                for index in duplicates[doc["metadata"]["tweet_id"]]:
+                    doc_ids[index] = str(doc["_id"])
         
-        return str(result.inserted_id)
+        known = {index for indexes in duplicates.values() for index in indexes}
+        logger.debug(f"{len(items) - len(known)} mentions stockées, {len(known)} déjà connues")
+        
+        # Envoyer pour analyse NLP les nouvelles mentions à priorité élevée
+        for index, (document, doc_id) in enumerate(zip(documents, doc_ids)):
+            if document["priority"] >= 3 and index not in known:
+                self._send_to_nlp(document["text"], doc_id)
+        
+        return doc_ids
     
     def _calculate_priority(self, text: str, sentiment: str, categories: List[str]) -> int:
         """
@@ -200,89 +307,148 @@ class SocialCollector:
     
     def _send_to_nlp(self, text: str, doc_id: str) -> None:
         """
-        Envoie une mention au service NLP pour analyse approfondie.
+        Soumet une mention au répartiteur NLP pour analyse approfondie.
+        L'envoi est groupé et asynchrone: cet appel ne bloque pas l'ingestion.
         
         Args:
             text: Texte à analyser
             doc_id: ID du document dans la base de données
         """
-        try:
-            payload = {
-                "text": text,
-                "doc_id": doc_id
-            }
+        self.nlp_dispatcher.submit(doc_id, text)
+    
+    def _stream_tweet_to_item(self, tweet) -> Optional[Dict[str, Any]]:
+        """
+        Convertit un tweet reçu en temps réel en mention à stocker.
+        
+        Args:
+            tweet: Tweet exposant les attributs text, id, author_id, created_at, lang et geo
             
-            response = requests.post(
-                f"{NLP_SERVICE_URL}/analyze",
-                json=payload
-            )
+        Returns:
+            Dictionnaire {"text": ..., "metadata": ...}, ou None si le tweet est filtré
+        """
+        # Filtrer les retweets
+        if getattr(tweet, 'retweeted', False) or 'RT @' in tweet.text:
+            return None
+        
+        return {
+            "text": self._clean_text(tweet.text),
+            "metadata": {
+                "tweet_id": tweet.id,
+                "user_id": tweet.author_id,
+                "created_at": tweet.created_at,
+                "lang": getattr(tweet, 'lang', 'unknown'),
+                "geo": getattr(tweet, 'geo', None),
+            }
+        }
+    
+    def handle_tweet(self, tweet) -> Optional[str]:
+        """
+        Traite un tweet reçu en temps réel (stream Twitter ou source de rejeu).
+        
+        Args:
+            tweet: Tweet exposant les attributs text, id, author_id, created_at, lang et geo
             
-            if response.status_code == 200:
-                logger.info(f"Mention envoyée avec succès au service NLP: {doc_id}")
-            else:
-                logger.error(f"Erreur lors de l'envoi au service NLP: {response.status_code}")
-                
-        except requests.RequestException as e:
-            logger.error(f"Erreur de connexion au service NLP: {e}")
+        Returns:
+            ID de la mention stockée, ou None si le tweet a été filtré
+        """
+        item = self._stream_tweet_to_item(tweet)
+        if item is None:
+            return None
+        
+        return self._store_in_db(item["text"], item["metadata"], "twitter")
+    
+    def _default_stream_keywords(self) -> List[str]:
+        keywords = []
+        for terms in self.keywords.values():
+            keywords.extend(terms)
+        return keywords
     
-    def stream_tweets(self, keywords: Optional[List[str]] = None, locations: Optional[List[float]] = None) -> None:
+    async def _twitter_stream(self, emit, keywords: Optional[List[str]] = None) -> None:
         """
-        Lance une écoute en continu des tweets contenant les mots-clés spécifiés
-        ou provenant des zones géographiques indiquées.
+        Écoute le stream Twitter dans la boucle asyncio et publie chaque tweet
+        dans la file d'ingestion, sans thread dédié.
         
         Args:
+            emit: Fonction de publication dans la file d'ingestion
             keywords: Liste de mots-clés à surveiller
-            locations: Coordonnées géographiques à surveiller [lon1, lat1, lon2, lat2]
         """
-        if not keywords:
-            # Si aucun mot-clé spécifié, utiliser tous les mots-clés de toutes les catégories
-            keywords = []
-            for terms in self.keywords.values():
-                keywords.extend(terms)
+        keywords = keywords or self._default_stream_keywords()
+        logger.info(f"Démarrage de l'écoute Twitter asynchrone avec {len(keywords)} mots-clés")
         
-        logger.info(f"Démarrage de l'écoute Twitter avec {len(keywords)} mots-clés")
+        parent = self
         
-        # Définition de la classe d'écoute
-        class CustomStream(tweepy.StreamingClient):
-            def __init__(self, bearer_token, parent):
-                super().__init__(bearer_token)
-                self.parent = parent
+        class AsyncStream(AsyncStreamingClient):
+            async def on_tweet(self, tweet):
+                item = parent._stream_tweet_to_item(tweet)
+                if item is not None:
+                    await emit(item)
             
-            def on_tweet(self, tweet):
-                # Filtrer les retweets
-                if getattr(tweet, 'retweeted', False) or 'RT @' in tweet.text:
-                    return
-                
-                # Nettoyer le texte
-                clean_text = self.parent._clean_text(tweet.text)
-                
-                # Extraire les métadonnées pertinentes
-                metadata = {
-                    "tweet_id": tweet.id,
-                    "user_id": tweet.author_id,
-                    "created_at": tweet.created_at,
-                    "lang": getattr(tweet, 'lang', 'unknown'),
-                    "geo": getattr(tweet, 'geo', None),
-                }
-                
-                # Stocker dans la base de données
-                self.parent._store_in_db(clean_text, metadata, "twitter")
-                
-            def on_error(self, status):
-                logger.error(f"Erreur Twitter stream: {status}")
-                if status == 420:  # Rate limit
-                    logger.warning("Rate limit atteint, pause de l'écoute")
-                    return False
-        
-        # Lancement de l'écoute
-        stream = CustomStream(bearer_token=TWITTER_API_SECRET, parent=self)
-        
-        # Ajout des règles
-        for keyword in keywords:
-            stream.add_rules(tweepy.StreamRule(keyword))
-        
-        # Démarrage du stream
-        stream.filter(tweet_fields=['author_id', 'created_at', 'geo', 'lang'])
+            async def on_errors(self, errors):
+                logger.error(f"Erreur Twitter stream: {errors}")
+        
+        stream = AsyncStream(bearer_token=TWITTER_BEARER_TOKEN)
+        # Les règles sont conservées par Twitter d'une connexion à l'autre: seules les
+        # manquantes sont ajoutées (une règle en double est refusée par l'API)
+        response = await stream.get_rules()
+        existing = {rule.value for rule in (response.data or [])}
+        missing = [tweepy.StreamRule(keyword) for keyword in dict.fromkeys(keywords) if keyword not in existing]
+        if missing:
+            await stream.add_rules(missing)
+        await stream.filter(tweet_fields=['author_id', 'created_at', 'geo', 'lang'])
+    
+    def _tweet_to_item(self, tweet) -> Dict[str, Any]:
+        """
+        Convertit un tweet de l'API de recherche en mention à stocker.
+        
+        Args:
+            tweet: Tweet retourné par l'API de recherche
+            
+        Returns:
+            Dictionnaire {"text": ..., "metadata": ...}
+        """
+        return {
+            "text": self._clean_text(tweet.full_text),
+            "metadata": {
+                "tweet_id": tweet.id,
+                "user_id": tweet.user.id,
+                "created_at": tweet.created_at,
+                "lang": tweet.lang,
+                "geo": tweet.geo if hasattr(tweet, 'geo') else None,
+            }
+        }
+    
+    def backfill_tweets(self, queries: List[str], count: int = 100, max_workers: int = 4,
+                        checkpoint_path: Optional[str] = None,
+                        on_stored: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> Dict[str, int]:
+        """
+        Collecte l'historique de plusieurs requêtes en parallèle.
+        Les tweets sont dédupliqués par identifiant et stockés par lots.
+        
+        Args:
+            queries: Requêtes de recherche
+            count: Nombre maximum de tweets à récupérer par requête
+            max_workers: Nombre de requêtes parcourues simultanément
+            checkpoint_path: Fichier de points de reprise pour relancer une collecte interrompue
+            on_stored: Fonction appelée avec chaque lot stocké (mentions complétées de leur ID)
+            
+        Returns:
+            Nombre de tweets stockés par requête
+        """
+        def store_batch(items: List[Dict[str, Any]]) -> List[str]:
+            doc_ids = self._store_many(items, "twitter")
+            if on_stored:
+                on_stored([{"id": doc_id, **item} for doc_id, item in zip(doc_ids, items)])
+            return doc_ids
+        
+        backfill = HistoricalBackfill(
+            TweepySearchClient(self.twitter_api),
+            store_batch,
+            self._tweet_to_item,
+            rate_limit=self.search_budget,
+            max_workers=max_workers,
+            checkpoint_path=checkpoint_path
+        )
+        return backfill.run(queries, max_per_query=count)
     
     def search_historical_tweets(self, query: str, count: int = 100) -> List[Dict[str, Any]]:
         """
@@ -298,36 +464,10 @@ class SocialCollector:
         logger.info(f"Recherche Twitter pour: {query}")
         
         collected_tweets = []
-        try:
-            for tweet in tweepy.Cursor(self.twitter_api.search_tweets, q=query, count=count, tweet_mode="extended").items(count):
-                # Nettoyer le texte
-                clean_text = self._clean_text(tweet.full_text)
-                
-                # Extraire les métadonnées
-                metadata = {
-                    "tweet_id": tweet.id,
-                    "user_id": tweet.user.id,
-                    "created_at": tweet.created_at,
-                    "lang": tweet.lang,
-                    "geo": tweet.geo if hasattr(tweet, 'geo') else None,
-                }
-                
-                # Stocker dans la base de données
-                doc_id = self._store_in_db(clean_text, metadata, "twitter")
-                
-                # Ajouter à la liste des résultats
-                collected_tweets.append({
-                    "id": doc_id,
-                    "text": clean_text,
-                    "metadata": metadata
-                })
-            
-            logger.info(f"Collecté {len(collected_tweets)} tweets pour la requête: {query}")
-            return collected_tweets
-            
-        except tweepy.TweepyException as e:
-            logger.error(f"Erreur lors de la recherche Twitter: {e}")
-            return []
+        self.backfill_tweets([query], count=count, max_workers=1, on_stored=collected_tweets.extend)
+        
+        logger.info(f"Collecté {len(collected_tweets)} tweets pour la requête: {query}")
+        return collected_tweets
     
     def collect_facebook_mentions(self, page_ids: List[str], days_back: int = 7) -> List[Dict[str, Any]]:
         """
@@ -357,6 +497,30 @@ class SocialCollector:
         
         return collected_mentions
     
+    def build_scheduler(self, interval: int = 3600,
+                        facebook_pages: Optional[List[str]] = None) -> SourceScheduler:
+        """
+        Construit l'ordonnanceur des sources de collecte.
+        Toutes les sources alimentent la même file d'ingestion, stockée par lots.
+        
+        Args:
+            interval: Intervalle en secondes entre les collectes ponctuelles
+            facebook_pages: Pages Facebook à surveiller
+            
+        Returns:
+            Ordonnanceur prêt à être lancé
+        """
+        pages = facebook_pages or ["mairie_example", "servicePublic_example"]
+        
+        scheduler = SourceScheduler(self._store_many)
+        scheduler.add_source(StreamSource("twitter", self._twitter_stream))
+        scheduler.add_source(CollectorSource(
+            "facebook",
+            lambda: self.collect_facebook_mentions(pages),
+            interval=interval
+        ))
+        return scheduler
+    
     def start_collection(self, interval: int = 3600) -> None:
         """
         Lance la collecte continue des données sociales à intervalle régulier.
@@ -366,30 +530,16 @@ class SocialCollector:
         """
         logger.info(f"Démarrage de la collecte continue (intervalle: {interval}s)")
         
-        # Démarrage du stream Twitter
-        import threading
-        twitter_thread = threading.Thread(
-            target=self.stream_tweets,
-            args=(),
-            daemon=True
-        )
-        twitter_thread.start()
+        self.scheduler = self.build_scheduler(interval)
         
-        # Boucle de collecte périodique
         try:
-            while True:
-                # Collecter les données de Facebook (exemple)
-                pages = ["mairie_example", "servicePublic_example"]
-                self.collect_facebook_mentions(pages)
-                
-                # Attendre l'intervalle
-                logger.info(f"En attente du prochain cycle de collecte ({interval}s)")
-                time.sleep(interval)
-                
+            asyncio.run(self.scheduler.run())
         except KeyboardInterrupt:
             logger.info("Collecte arrêtée par l'utilisateur")
         except Exception as e:
             logger.error(f"Erreur lors de la collecte: {e}")
+        finally:
+            self.nlp_dispatcher.stop()
 
 # Exemple d'utilisation
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+import pytest
+import os
+import sys
+import tempfile
+from fastapi.testclient import TestClient
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base de test créée avant l'import du service
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+
+import main
+from main import app, Base, engine, verify_token, SessionLocal, DataEntry, rebuild_rollup
+from scheduler import SourceScheduler, CollectorSource
+
+
+@pytest.fixture(scope="function")
+def client():
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[verify_token] = lambda: {"valid": True, "email": "test@echo.fr"}
+    main._stats_cache["value"] = None
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    Base.metadata.drop_all(bind=engine)
+
+
+def make_entry(i, source="formulaire", category="voirie"):
+    return {
+        "source": source,
+        "category": category,
+        "content": {"message": f"Signalement {i}"},
+        "metadata": {"index": i}
+    }
+
+
+def test_collect(client):
+    response = client.post("/collect", json=make_entry(1))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["source"] == "formulaire"
+    assert data["metadata"] == {"index": 1}
+    assert data["processed"] == 0
+
+
+def test_collect_batch_returns_ids_in_order(client):
+    entries = [make_entry(i) for i in range(10)]
+    response = client.post("/collect/batch", json={"entries": entries})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 10
+    assert data["ids"] == sorted(data["ids"])
+
+    listed = client.get("/data", params={"limit": 100}).json()
+    by_id = {entry["id"]: entry for entry in listed}
+    for i, entry_id in enumerate(data["ids"]):
+        assert by_id[entry_id]["metadata"] == {"index": i}
+
+
+def test_collect_batch_validation(client):
+    assert client.post("/collect/batch", json={"entries": []}).status_code == 422
+    assert client.post("/collect/batch", json={"entries": [{"source": "formulaire"}]}).status_code == 422
+
+
+def test_data_keyset_pagination(client):
+    client.post("/collect/batch", json={"entries": [make_entry(i) for i in range(7)]})
+
+    seen = []
+    cursor = None
+    for _ in range(4):
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/data", params=params)
+        assert response.status_code == 200
+        seen.extend(entry["id"] for entry in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_data_filters_and_list_view(client):
+    client.post("/collect/batch", json={"entries": [
+        make_entry(0, source="capteur"),
+        make_entry(1, source="formulaire", category="eclairage"),
+        make_entry(2, source="formulaire"),
+    ]})
+
+    response = client.get("/data", params={"source": "formulaire", "category": "voirie", "include_content": False})
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["content"] is None
+    assert data[0]["metadata"] is None
+    assert data[0]["source"] == "formulaire"
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_data_invalid_cursor(client):
+    assert client.get("/data", params={"cursor": "invalide"}).status_code == 400
+
+
+def expected_stats():
+    db = SessionLocal()
+    try:
+        entries = db.query(DataEntry).all()
+    finally:
+        db.close()
+    stats = {"total_entries": len(entries), "processed_entries": 0, "error_entries": 0, "sources": {}, "categories": {}}
+    for entry in entries:
+        stats["processed_entries"] += entry.processed == 1
+        stats["error_entries"] += entry.processed == -1
+        stats["sources"][entry.source] = stats["sources"].get(entry.source, 0) + 1
+        stats["categories"][entry.category] = stats["categories"].get(entry.category, 0) + 1
+    return stats
+
+
+def mark_processed(ids, status):
+    db = SessionLocal()
+    try:
+        entries = db.query(DataEntry).filter(DataEntry.id.in_(ids)).all()
+        for entry in entries:
+            entry.processed = status
+        main.rollup_processed(db, entries)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_stats_rollup_tracks_inserts_and_processing(client):
+    ids = client.post("/collect/batch", json={"entries": [
+        make_entry(0, source="capteur"),
+        make_entry(1, source="formulaire", category="eclairage"),
+        make_entry(2, source="formulaire"),
+        make_entry(3, source="formulaire"),
+    ]}).json()["ids"]
+    client.post("/collect", json=make_entry(4, source="email", category="proprete"))
+    mark_processed(ids[:2], 1)
+    mark_processed(ids[2:3], -1)
+
+    stats = client.get("/stats").json()
+    # Aucune collecte sociale dans le service de test
+    assert stats.pop("collection") is None
+    assert stats == expected_stats()
+    assert stats["total_entries"] == 5
+    assert stats["processed_entries"] == 2
+    assert stats["error_entries"] == 1
+    assert stats["sources"] == {"capteur": 1, "formulaire": 3, "email": 1}
+
+
+def test_stats_fallback_matches_rollup(client, monkeypatch):
+    client.post("/collect/batch", json={"entries": [make_entry(i, category=["voirie", "transport"][i % 2]) for i in range(6)]})
+    with_rollup = main.compute_stats(SessionLocal())
+
+    monkeypatch.setattr(main, "STATS_ROLLUP_ENABLED", False)
+    assert main.compute_stats(SessionLocal()) == with_rollup == expected_stats()
+
+
+def test_rollup_is_maintained_while_disabled(client, monkeypatch):
+    monkeypatch.setattr(main, "STATS_ROLLUP_ENABLED", False)
+    ids = client.post("/collect/batch", json={"entries": [make_entry(i) for i in range(4)]}).json()["ids"]
+    mark_processed(ids[:2], 1)
+
+    # Réactivation: les agrégats reflètent les écritures faites sans eux
+    monkeypatch.setattr(main, "STATS_ROLLUP_ENABLED", True)
+    assert main.compute_stats(SessionLocal()) == expected_stats()
+    assert expected_stats()["processed_entries"] == 2
+
+
+def test_rebuild_rollup(client):
+    client.post("/collect/batch", json={"entries": [make_entry(i) for i in range(3)]})
+    db = SessionLocal()
+    db.query(main.DataStatsRollup).delete()
+    db.commit()
+    rebuild_rollup(db)
+    db.close()
+
+    assert main.compute_stats(SessionLocal()) == expected_stats()
+
+
+def test_stats_response_is_cached(client):
+    client.post("/collect", json=make_entry(0))
+    assert client.get("/stats").json()["total_entries"] == 1
+
+    client.post("/collect", json=make_entry(1))
+    assert client.get("/stats").json()["total_entries"] == 1
+
+    main._stats_cache["expires_at"] = 0.0
+    assert client.get("/stats").json()["total_entries"] == 2
+
+
+def test_health_without_collection(client):
+    assert client.get("/health").json() == {"status": "healthy", "failing_sources": [], "collection": None}
+
+
+def test_health_and_stats_expose_source_health(client, monkeypatch):
+    scheduler = SourceScheduler(lambda items, source: None)
+    scheduler.add_source(CollectorSource("facebook", lambda: []))
+    scheduler.add_source(CollectorSource("twitter", lambda: []))
+    scheduler.sources["facebook"].health.record_success(4)
+    for _ in range(3):
+        scheduler.sources["twitter"].health.record_failure(RuntimeError("401 Unauthorized"))
+    monkeypatch.setattr(main, "source_scheduler", scheduler)
+
+    health = client.get("/health").json()
+    assert health["status"] == "degraded"
+    assert health["failing_sources"] == ["twitter"]
+    assert health["collection"]["sources"]["facebook"]["items"] == 4
+
+    stats = client.get("/stats").json()
+    assert stats["total_entries"] == 0
+    assert stats["collection"]["sources"]["twitter"]["last_error"] == "401 Unauthorized"
@@ -0,0 +1,98 @@
+import pytest
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backfill import HistoricalBackfill, RateLimitBudget
+
+
+class FakeTwitterClient:
+    """Faux client de recherche: chaque requête dispose d'une liste d'identifiants de tweets."""
+
+    def __init__(self, results, fail_after=None):
+        self.results = {query: sorted(ids, reverse=True) for query, ids in results.items()}
+        self.calls = []
+        self.fail_after = fail_after
+
+    def search(self, query, count, max_id=None):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise RuntimeError("API indisponible")
+        self.calls.append((query, count, max_id))
+        ids = [i for i in self.results[query] if max_id is None or i <= max_id]
+        return [SimpleNamespace(id=i, text=f"tweet {i}") for i in ids[:count]]
+
+
+class FakeStore:
+    def __init__(self):
+        self.items = []
+
+    def __call__(self, items):
+        self.items.extend(items)
+        return [str(item["tweet_id"]) for item in items]
+
+
+def prepare(tweet):
+    return {"tweet_id": tweet.id, "text": tweet.text}
+
+
+@pytest.fixture
+def store():
+    return FakeStore()
+
+
+def make_backfill(client, store, **kwargs):
+    return HistoricalBackfill(client, store, prepare, rate_limit=RateLimitBudget(1000, 1), page_size=3, **kwargs)
+
+
+def test_pages_all_queries(store):
+    client = FakeTwitterClient({"travaux": range(1, 8), "voirie": range(10, 15)})
+
+    stored = make_backfill(client, store).run(["travaux", "voirie"], max_per_query=100)
+
+    assert stored == {"travaux": 7, "voirie": 5}
+    assert sorted(item["tweet_id"] for item in store.items) == list(range(1, 8)) + list(range(10, 15))
+
+
+def test_respects_max_per_query(store):
+    client = FakeTwitterClient({"travaux": range(1, 20)})
+
+    stored = make_backfill(client, store).run(["travaux"], max_per_query=5)
+
+    assert stored == {"travaux": 5}
+    assert [item["tweet_id"] for item in store.items] == [19, 18, 17, 16, 15]
+
+
+def test_deduplicates_across_queries(store):
+    client = FakeTwitterClient({"travaux": [1, 2, 3, 4], "route": [3, 4, 5]})
+
+    stored = make_backfill(client, store, max_workers=2).run(["travaux", "route"], max_per_query=100)
+
+    assert sorted(item["tweet_id"] for item in store.items) == [1, 2, 3, 4, 5]
+    assert sum(stored.values()) == 5
+
+
+def test_resumes_from_checkpoint(store, tmp_path):
+    checkpoint_path = str(tmp_path / "backfill.json")
+    results = {"travaux": range(1, 10)}
+
+    failing = FakeTwitterClient(results, fail_after=1)
+    make_backfill(failing, store, checkpoint_path=checkpoint_path).run(["travaux"], max_per_query=100)
+    assert [item["tweet_id"] for item in store.items] == [9, 8, 7]
+
+    with open(checkpoint_path, encoding="utf-8") as f:
+        assert json.load(f)["travaux"]["max_id"] == 6
+
+    client = FakeTwitterClient(results)
+    make_backfill(client, store, checkpoint_path=checkpoint_path).run(["travaux"], max_per_query=100)
+
+    assert client.calls[0][2] == 6
+    assert [item["tweet_id"] for item in store.items] == list(range(9, 0, -1))
+
+    # Une requête terminée n'est plus interrogée
+    client = FakeTwitterClient(results)
+    make_backfill(client, store, checkpoint_path=checkpoint_path).run(["travaux"], max_per_query=100)
+    assert client.calls == []
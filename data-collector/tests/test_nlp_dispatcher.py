@@ -0,0 +1,151 @@
+import pytest
+import httpx
+import json
+import os
+import sys
+import threading
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlp_dispatcher import NLPDispatcher
+
+
+class FakeBulkResult:
+    def __init__(self, count):
+        self.modified_count = count
+
+
+class FakeCollection:
+    def __init__(self):
+        self.operations = []
+
+    def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+        return FakeBulkResult(len(operations))
+
+
+@pytest.fixture
+def nlp_calls():
+    return []
+
+
+@pytest.fixture
+def transport(nlp_calls):
+    def handler(request):
+        texts = json.loads(request.content)["texts"]
+        nlp_calls.append(texts)
+        results = [{"sentiment_score": -0.5, "keywords": [text], "entities": [], "summary": text} for text in texts]
+        return httpx.Response(200, json={"results": results})
+
+    return httpx.MockTransport(handler)
+
+
+def test_mentions_are_batched(transport, nlp_calls):
+    collection = FakeCollection()
+    dispatcher = NLPDispatcher(collection, nlp_url="http://nlp", batch_size=4, flush_interval=0.2, transport=transport)
+
+    for i in range(10):
+        dispatcher.submit(f"doc{i}", f"texte {i}")
+    dispatcher.stop()
+
+    assert sum(len(call) for call in nlp_calls) == 10
+    assert all(len(call) <= 4 for call in nlp_calls)
+    assert len(nlp_calls) < 10
+    assert len(collection.operations) == 10
+    assert dispatcher.stats["updated"] == 10
+
+
+def test_results_written_to_matching_documents(transport):
+    collection = FakeCollection()
+    dispatcher = NLPDispatcher(collection, nlp_url="http://nlp", batch_size=8, flush_interval=0.05, transport=transport)
+
+    dispatcher.submit("doc-a", "route fermée")
+    dispatcher.stop()
+
+    operation = collection.operations[0]
+    assert operation._filter == {"_id": "doc-a"}
+    assert operation._doc["$set"]["processed"] is True
+    assert operation._doc["$set"]["nlp_analysis"]["keywords"] == ["route fermée"]
+
+
+def test_nlp_errors_do_not_write(nlp_calls):
+    transport = httpx.MockTransport(lambda request: httpx.Response(503))
+    collection = FakeCollection()
+    dispatcher = NLPDispatcher(collection, nlp_url="http://nlp", batch_size=2, flush_interval=0.05, transport=transport)
+
+    dispatcher.submit("doc1", "texte")
+    dispatcher.stop()
+
+    assert collection.operations == []
+    assert dispatcher.stats["failed"] == 1
+
+
+@pytest.mark.parametrize("response", [
+    httpx.Response(200, text="<html>passerelle</html>"),
+    httpx.Response(200, json=["résultat"]),
+    httpx.Response(200, json={"detail": "ok"}),
+    httpx.Response(200, json={"results": ["résultat"]}),
+])
+def test_malformed_responses_count_as_failures(response):
+    collection = FakeCollection()
+    dispatcher = NLPDispatcher(collection, nlp_url="http://nlp", batch_size=2, flush_interval=0.05,
+                               transport=httpx.MockTransport(lambda request: response))
+
+    dispatcher.submit("doc1", "texte")
+    dispatcher.stop()
+    # La boucle d'envoi survit à la réponse invalide
+    dispatcher.submit("doc2", "texte")
+    dispatcher.stop()
+
+    assert collection.operations == []
+    assert dispatcher.stats["failed"] == 2
+    assert dispatcher.stats["sent"] == 0
+
+
+def test_full_queue_rejects_mentions_synchronously():
+    entered, release = threading.Event(), threading.Event()
+
+    def handler(request):
+        # Bloque la boucle d'envoi: plus aucune mention n'est retirée de la file
+        entered.set()
+        release.wait(5)
+        texts = json.loads(request.content)["texts"]
+        return httpx.Response(200, json={"results": [{"summary": text} for text in texts]})
+
+    collection = FakeCollection()
+    dispatcher = NLPDispatcher(collection, nlp_url="http://nlp", batch_size=1, flush_interval=0.01,
+                               max_queue_size=2, transport=httpx.MockTransport(handler))
+
+    assert dispatcher.submit("doc0", "texte 0")
+    assert entered.wait(5)
+    assert dispatcher.submit("doc1", "texte 1")
+    assert dispatcher.submit("doc2", "texte 2")
+    assert not dispatcher.submit("doc3", "texte 3")
+    release.set()
+    dispatcher.stop()
+
+    assert dispatcher.stats["submitted"] == 3
+    assert dispatcher.stats["dropped"] == 1
+    assert len(collection.operations) == 3
+
+
+def test_concurrent_submissions_start_a_single_loop(transport):
+    collection = FakeCollection()
+    dispatcher = NLPDispatcher(collection, nlp_url="http://nlp", batch_size=8, flush_interval=0.05, transport=transport)
+    barrier = threading.Barrier(8)
+
+    def submit(i):
+        barrier.wait()
+        assert dispatcher.submit(f"doc{i}", f"texte {i}")
+
+    submitters = [threading.Thread(target=submit, args=(i,)) for i in range(8)]
+    for thread in submitters:
+        thread.start()
+    for thread in submitters:
+        thread.join()
+    loops = [thread for thread in threading.enumerate() if thread.name == "nlp-dispatcher"]
+    dispatcher.stop()
+
+    assert len(loops) == 1
+    assert len(collection.operations) == 8
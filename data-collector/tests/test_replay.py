@@ -0,0 +1,65 @@
+import pytest
+import json
+import os
+import sys
+import time
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay import ReplaySource
+
+
+@pytest.fixture
+def tweets_file(tmp_path):
+    file_path = tmp_path / "tweets.jsonl"
+    with open(file_path, "w", encoding="utf-8") as f:
+        for i in range(5):
+            f.write(json.dumps({
+                "id": i,
+                "text": f"tweet {i}",
+                "author_id": 7,
+                "created_at": f"2024-01-01T08:00:0{i}Z",
+                "lang": "fr",
+            }) + "\n")
+    return str(file_path)
+
+
+def test_replay_converts_lines_to_tweets(tweets_file):
+    received = []
+    count = ReplaySource(tweets_file, rate_multiplier=0).replay(received.append)
+
+    assert count == 5
+    assert [tweet.id for tweet in received] == [0, 1, 2, 3, 4]
+    assert received[0].text == "tweet 0"
+    assert received[0].author_id == 7
+    assert received[1].created_at.second == 1
+
+
+def test_replay_limit(tweets_file):
+    received = []
+    assert ReplaySource(tweets_file, rate_multiplier=0).replay(received.append, limit=2) == 2
+    assert len(received) == 2
+
+
+def test_replay_respects_rate_multiplier(tweets_file):
+    # 4 secondes d'origine accélérées 40 fois: environ 0,1 s
+    start = time.perf_counter()
+    ReplaySource(tweets_file, rate_multiplier=40).replay(lambda tweet: None)
+    duration = time.perf_counter() - start
+
+    assert 0.08 <= duration < 0.5
+
+
+def test_burst_profile_multiplier(tweets_file):
+    source = ReplaySource(tweets_file, rate_multiplier=2, burst_profile=[(1.0, 1), (0.5, 10)])
+
+    assert source._current_multiplier(0.2) == 2
+    assert source._current_multiplier(1.2) == 20
+    assert source._current_multiplier(1.7) == 2
+
+
+@pytest.mark.parametrize("segment", [(1.0, 0), (1.0, -2), (0, 5)])
+def test_burst_profile_rejects_non_positive_segments(tweets_file, segment):
+    with pytest.raises(ValueError):
+        ReplaySource(tweets_file, rate_multiplier=2, burst_profile=[(1.0, 1), segment])
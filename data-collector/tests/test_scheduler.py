@@ -0,0 +1,102 @@
+import pytest
+import asyncio
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import SourceScheduler, CollectorSource, StreamSource
+
+
+class FakeStore:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items, source):
+        self.batches.append((source, list(items)))
+
+    def items(self, source):
+        return [item for batch_source, items in self.batches if batch_source == source for item in items]
+
+
+async def run_for(scheduler, seconds):
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(seconds)
+    await scheduler.stop()
+    await task
+
+
+def test_sources_feed_shared_queue():
+    store = FakeStore()
+    scheduler = SourceScheduler(store, flush_interval=0.01)
+
+    calls = []
+
+    def fetch_pages():
+        calls.append(1)
+        return [{"text": f"post {len(calls)}", "metadata": {}}]
+
+    async def stream(emit):
+        for i in range(3):
+            await emit({"text": f"tweet {i}", "metadata": {"tweet_id": i}})
+        await asyncio.Event().wait()
+
+    scheduler.add_source(CollectorSource("facebook", fetch_pages, interval=0.05, jitter=0))
+    scheduler.add_source(StreamSource("twitter", stream))
+
+    asyncio.run(run_for(scheduler, 0.18))
+
+    assert [item["text"] for item in store.items("twitter")] == ["tweet 0", "tweet 1", "tweet 2"]
+    assert 3 <= len(store.items("facebook")) == len(calls) <= 5
+
+    health = scheduler.health()["sources"]
+    assert health["facebook"]["state"] == "healthy"
+    assert health["twitter"]["items"] == 3
+
+
+def test_failing_source_backs_off():
+    store = FakeStore()
+    scheduler = SourceScheduler(store, flush_interval=0.01)
+
+    def broken():
+        raise ConnectionError("page indisponible")
+
+    source = CollectorSource("rss", broken, interval=0.02, jitter=0, max_backoff=8)
+    scheduler.add_source(source)
+
+    asyncio.run(run_for(scheduler, 0.2))
+
+    # 0.02 + 0.04 + 0.08 + 0.16: l'intervalle double à chaque échec
+    assert source.health.runs <= 4
+    assert source.health.state == "failing"
+    assert source.health.last_error == "page indisponible"
+    assert store.batches == []
+
+
+def test_concurrency_limit_skips_overlapping_runs():
+    store = FakeStore()
+    scheduler = SourceScheduler(store, flush_interval=0.01)
+    active = []
+    peak = []
+
+    async def slow_fetch():
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.1)
+        active.pop()
+        return []
+
+    scheduler.add_source(CollectorSource("forms", slow_fetch, interval=0.01, jitter=0, concurrency=2))
+
+    asyncio.run(run_for(scheduler, 0.15))
+
+    assert max(peak) == 2
+
+
+def test_duplicate_source_name_rejected():
+    scheduler = SourceScheduler(FakeStore())
+    scheduler.add_source(CollectorSource("facebook", list))
+
+    with pytest.raises(ValueError):
+        scheduler.add_source(CollectorSource("facebook", list))
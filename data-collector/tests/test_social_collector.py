@@ -0,0 +1,178 @@
+import pytest
+import os
+import sys
+import asyncio
+from types import SimpleNamespace
+
+from bson import ObjectId
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import social_collector
+from social_collector import SocialCollector
+
+
+class FakeCollection:
+    """
+    Collection MongoDB minimale: upserts sur (source, tweet_id) et doublons
+    insérés par un autre collecteur pendant l'écriture (concurrent).
+    """
+
+    def __init__(self, concurrent=(), error_code=11000):
+        self.documents = {}
+        self.indexes = []
+        self.finds = []
+        self.concurrent = set(concurrent)
+        self.error_code = error_code
+
+    def create_index(self, keys, **options):
+        self.indexes.append((keys, options))
+        return options.get("name")
+
+    def bulk_write(self, operations, ordered=True):
+        upserted, errors = [], []
+        for index, operation in enumerate(operations):
+            if isinstance(operation, InsertOne):
+                document = operation._doc
+                document.setdefault("_id", ObjectId())
+                self.documents[(document["source"], document["_id"])] = document
+                continue
+
+            assert operation._upsert and list(operation._doc) == ["$setOnInsert"]
+            key = (operation._filter["source"], operation._filter["metadata.tweet_id"])
+            if key in self.documents:
+                continue
+            document = dict(operation._doc["$setOnInsert"], _id=ObjectId())
+            self.documents[key] = document
+            if key[1] in self.concurrent:
+                # Inséré par l'autre collecteur entre la recherche et l'insertion de l'upsert
+                errors.append({"index": index, "code": self.error_code, "errmsg": "E11000 duplicate key"})
+            else:
+                upserted.append({"index": index, "_id": document["_id"]})
+
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "upserted": upserted})
+        return SimpleNamespace(upserted_ids={upsert["index"]: upsert["_id"] for upsert in upserted})
+
+    def find(self, query, projection=None):
+        self.finds.append(query)
+        tweet_ids = set(query["metadata.tweet_id"]["$in"])
+        return [
+            {"_id": document["_id"], "metadata": {"tweet_id": tweet_id}}
+            for (source, tweet_id), document in self.documents.items()
+            if source == query["source"] and tweet_id in tweet_ids
+        ]
+
+    def by_tweet(self, tweet_id):
+        return self.documents[("twitter", tweet_id)]
+
+
+class RecordingDispatcher:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, doc_id, text):
+        self.submitted.append(doc_id)
+        return True
+
+
+@pytest.fixture
+def collection():
+    return FakeCollection()
+
+
+def make_collector(collection):
+    collector = SocialCollector(mongo_client=SimpleNamespace(echo_project=SimpleNamespace(social_mentions=collection)))
+    collector.nlp_dispatcher = RecordingDispatcher()
+    # Toutes les mentions sont prioritaires: chaque nouvelle mention part au service NLP
+    collector._calculate_priority = lambda text, sentiment, categories: 3
+    return collector
+
+
+def tweet(tweet_id, text="lampadaire cassé"):
+    return {"text": text, "metadata": {"tweet_id": tweet_id}}
+
+
+def test_unique_partial_index_is_created(collection):
+    make_collector(collection)
+
+    keys, options = collection.indexes[0]
+    assert keys == [("metadata.tweet_id", 1), ("source", 1)]
+    assert options["unique"] is True
+    assert options["partialFilterExpression"] == {"metadata.tweet_id": {"$exists": True}}
+
+
+def test_index_conflict_does_not_prevent_startup():
+    class ConflictingCollection(FakeCollection):
+        def create_index(self, keys, **options):
+            raise OperationFailure("E11000 duplicate key error", code=11000)
+
+    collector = make_collector(ConflictingCollection())
+
+    assert collector._store_many([tweet("t1")], "twitter")
+
+
+def test_new_tweets_and_duplicates(collection):
+    collector = make_collector(collection)
+    [known_id] = collector._store_many([tweet("t1")], "twitter")
+    collector.nlp_dispatcher.submitted.clear()
+
+    batch = [tweet("t1"), tweet("t2"), {"text": "trottoir abîmé", "metadata": {}}, tweet("t2")]
+    doc_ids = collector._store_many(batch, "twitter")
+
+    # Tweet déjà connu et doublon interne au lot: identifiant du document existant
+    assert doc_ids[0] == known_id
+    assert doc_ids[1] == str(collection.by_tweet("t2")["_id"])
+    assert doc_ids[3] == doc_ids[1]
+    assert ObjectId(doc_ids[2])
+    assert collection.finds == [{"source": "twitter", "metadata.tweet_id": {"$in": ["t1", "t2"]}}]
+    # Seules les nouvelles mentions sont envoyées au service NLP
+    assert collector.nlp_dispatcher.submitted == [doc_ids[1], doc_ids[2]]
+
+
+def test_concurrent_duplicate_key_is_resolved():
+    collection = FakeCollection(concurrent={"t9"})
+    collector = make_collector(collection)
+
+    doc_ids = collector._store_many([tweet("t9"), tweet("t10")], "twitter")
+
+    assert doc_ids == [str(collection.by_tweet("t9")["_id"]), str(collection.by_tweet("t10")["_id"])]
+    assert collector.nlp_dispatcher.submitted == [doc_ids[1]]
+
+
+def test_other_write_errors_are_raised():
+    collector = make_collector(FakeCollection(concurrent={"t1"}, error_code=121))
+
+    with pytest.raises(BulkWriteError):
+        collector._store_many([tweet("t1")], "twitter")
+
+
+def test_twitter_stream_adds_only_missing_rules(collection, monkeypatch):
+    calls = {}
+
+    class FakeStreamingClient:
+        def __init__(self, bearer_token):
+            calls["bearer_token"] = bearer_token
+
+        async def get_rules(self):
+            return SimpleNamespace(data=[SimpleNamespace(id="1", value="travaux")])
+
+        async def add_rules(self, rules):
+            calls["added"] = [rule.value for rule in rules]
+
+        async def filter(self, **params):
+            calls["filtered"] = True
+
+    monkeypatch.setattr(social_collector, "AsyncStreamingClient", FakeStreamingClient)
+    monkeypatch.setattr(social_collector, "TWITTER_BEARER_TOKEN", "jeton")
+    collector = make_collector(collection)
+
+    async def emit(item):
+        pass
+
+    asyncio.run(collector._twitter_stream(emit, ["travaux", "inondation", "inondation"]))
+
+    assert calls == {"bearer_token": "jeton", "added": ["inondation"], "filtered": True}
@@ -0,0 +1,141 @@
+import pytest
+import asyncio
+import os
+import sys
+import httpx
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from jose import jwt, jwk
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from token_verifier import TokenVerifier
+
+SECRET = "secret-de-test"
+
+
+def make_token(key=SECRET, algorithm="HS256", headers=None, **claims):
+    payload = {"sub": "agent@echo.fr", "exp": datetime.utcnow() + timedelta(minutes=5), "jti": "jti-1"}
+    payload.update(claims)
+    return jwt.encode(payload, key, algorithm=algorithm, headers=headers)
+
+
+def rsa_keys():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return private_pem, public_pem
+
+
+def jwks_transport(calls, public_pem, kid="cle-1"):
+    def handler(request):
+        calls.append(request.url.path)
+        key = jwk.construct(public_pem, "RS256").to_dict()
+        key["kid"] = kid
+        return httpx.Response(200, json={"keys": [key]})
+    return httpx.MockTransport(handler)
+
+
+def test_shared_secret_tokens_are_verified_and_cached():
+    verifier = TokenVerifier(secret=SECRET, algorithms=["HS256"])
+    token = make_token()
+
+    async def scenario():
+        return [await verifier.verify(token) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [{"valid": True, "email": "agent@echo.fr"}] * 3
+    assert verifier.stats["misses"] == 1
+    assert verifier.stats["hits"] == 2
+
+
+def test_role_claim_is_exposed():
+    verifier = TokenVerifier(secret=SECRET, algorithms=["HS256"])
+
+    result = asyncio.run(verifier.verify(make_token(role="admin", jti="jti-admin")))
+
+    assert result == {"valid": True, "email": "agent@echo.fr", "role": "admin"}
+
+
+def test_invalid_tokens_are_rejected_and_negatively_cached():
+    verifier = TokenVerifier(secret=SECRET, algorithms=["HS256"])
+    forged = make_token(key="autre-secret")
+
+    async def scenario():
+        for _ in range(2):
+            with pytest.raises(HTTPException) as error:
+                await verifier.verify(forged)
+            assert error.value.status_code == 401
+
+    asyncio.run(scenario())
+    assert verifier.stats["hits"] == 1
+
+
+def test_forged_token_reusing_jti_does_not_hit_cache():
+    verifier = TokenVerifier(secret=SECRET, algorithms=["HS256"])
+
+    async def scenario():
+        await verifier.verify(make_token())
+        with pytest.raises(HTTPException):
+            await verifier.verify(make_token(key="autre-secret", sub="intrus@echo.fr"))
+
+    asyncio.run(scenario())
+
+
+def test_expired_token_is_rejected():
+    verifier = TokenVerifier(secret=SECRET, algorithms=["HS256"])
+    expired = make_token(exp=datetime.utcnow() - timedelta(minutes=1))
+
+    with pytest.raises(HTTPException):
+        asyncio.run(verifier.verify(expired))
+
+
+def test_jwks_keys_are_fetched_once():
+    private_pem, public_pem = rsa_keys()
+    calls = []
+    verifier = TokenVerifier(algorithms=["RS256"], transport=jwks_transport(calls, public_pem))
+
+    async def scenario():
+        results = []
+        for i in range(3):
+            token = make_token(private_pem, "RS256", headers={"kid": "cle-1"}, jti=f"jti-{i}")
+            results.append(await verifier.verify(token))
+        await verifier.close()
+        return results
+
+    assert asyncio.run(scenario()) == [{"valid": True, "email": "agent@echo.fr"}] * 3
+    assert calls == ["/.well-known/jwks.json"]
+
+
+def test_unknown_key_id_is_rejected():
+    private_pem, public_pem = rsa_keys()
+    calls = []
+    verifier = TokenVerifier(algorithms=["RS256"], transport=jwks_transport(calls, public_pem))
+
+    async def scenario():
+        await verifier.verify(make_token(private_pem, "RS256", headers={"kid": "cle-1"}))
+        with pytest.raises(HTTPException):
+            await verifier.verify(make_token(private_pem, "RS256", headers={"kid": "cle-2"}, jti="jti-2"))
+        await verifier.close()
+
+    asyncio.run(scenario())
+    # Une clé inconnue déclenche un rafraîchissement, limité dans le temps
+    assert len(calls) == 1
+
+
+def test_unavailable_auth_service():
+    def handler(request):
+        raise httpx.ConnectError("service indisponible")
+
+    private_pem, _ = rsa_keys()
+    verifier = TokenVerifier(algorithms=["RS256"], transport=httpx.MockTransport(handler))
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(verifier.verify(make_token(private_pem, "RS256", headers={"kid": "cle-1"})))
+    assert error.value.status_code == 503
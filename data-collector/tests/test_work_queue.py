@@ -0,0 +1,203 @@
+import pytest
+import asyncio
+import json
+import os
+import sys
+import httpx
+from sqlalchemy import create_engine, Column, Integer, DateTime, JSON
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
+from datetime import datetime, timedelta
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from work_queue import ProcessingQueue, PENDING, PROCESSED, FAILED
+
+Base = declarative_base()
+
+
+class Entry(Base):
+    __tablename__ = "entries"
+
+    id = Column(Integer, primary_key=True)
+    content = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    processed = Column(Integer, default=0)
+    sentiment_score = Column(Integer, nullable=True)
+    keywords = Column(JSON, nullable=True)
+
+
+engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(scope="function")
+def entries():
+    Base.metadata.create_all(bind=engine)
+    db = TestingSessionLocal()
+    db.add_all([
+        Entry(content={"message": f"message {i}"}, created_at=datetime.utcnow() - timedelta(seconds=30 - i))
+        for i in range(5)
+    ])
+    db.commit()
+    db.close()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+def analyze_transport(calls, status_code=200):
+    def handler(request):
+        texts = json.loads(request.content)["texts"]
+        calls.append(texts)
+        results = [{"sentiment_score": 1, "keywords": [text]} for text in texts]
+        return httpx.Response(status_code, json={"results": results})
+    return httpx.MockTransport(handler)
+
+
+def statuses():
+    db = TestingSessionLocal()
+    try:
+        return [entry.processed for entry in db.query(Entry).order_by(Entry.id)]
+    finally:
+        db.close()
+
+
+def test_batches_are_processed_with_own_sessions(entries):
+    calls = []
+    queue = ProcessingQueue(TestingSessionLocal, Entry, nlp_url="http://nlp", workers=0, batch_size=2,
+                            transport=analyze_transport(calls))
+
+    async def scenario():
+        await queue.start()
+        processed = [await queue.process_batch() for _ in range(4)]
+        await queue.stop()
+        return processed
+
+    assert asyncio.run(scenario()) == [2, 2, 1, 0]
+    assert [len(call) for call in calls] == [2, 2, 1]
+    assert statuses() == [PROCESSED] * 5
+
+
+def test_transient_errors_leave_entries_pending(entries):
+    calls = []
+    queue = ProcessingQueue(TestingSessionLocal, Entry, nlp_url="http://nlp", workers=0,
+                            transport=analyze_transport(calls, status_code=503))
+
+    async def scenario():
+        await queue.start()
+        with pytest.raises(httpx.HTTPStatusError):
+            await queue.process_batch()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert statuses() == [PENDING] * 5
+
+
+def test_rejected_entries_are_isolated_and_marked_failed(entries):
+    calls = []
+
+    def handler(request):
+        texts = json.loads(request.content)["texts"]
+        calls.append(len(texts))
+        # Le service NLP rejette tout lot contenant le troisième message
+        if any("message 2" in text for text in texts):
+            return httpx.Response(422, json={"detail": "texte invalide"})
+        return httpx.Response(200, json={"results": [{"sentiment_score": 1, "keywords": []} for _ in texts]})
+
+    queue = ProcessingQueue(TestingSessionLocal, Entry, nlp_url="http://nlp", workers=0,
+                            transport=httpx.MockTransport(handler))
+
+    async def scenario():
+        await queue.start()
+        processed = await queue.process_batch()
+        await queue.stop()
+        return processed
+
+    assert asyncio.run(scenario()) == 5
+    assert statuses() == [PROCESSED, PROCESSED, FAILED, PROCESSED, PROCESSED]
+    # Lot divisé jusqu'à l'entrée rejetée: [0, 1] | [2, 3, 4] -> [2] | [3, 4]
+    assert calls == [5, 2, 3, 1, 2]
+
+
+@pytest.mark.parametrize("status_code", [401, 403])
+def test_authentication_errors_leave_entries_pending(entries, status_code):
+    queue = ProcessingQueue(TestingSessionLocal, Entry, nlp_url="http://nlp", workers=0,
+                            transport=analyze_transport([], status_code=status_code))
+
+    async def scenario():
+        await queue.start()
+        with pytest.raises(httpx.HTTPStatusError):
+            await queue.process_batch()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert statuses() == [PENDING] * 5
+
+
+def test_workers_drain_queue(entries):
+    calls = []
+    queue = ProcessingQueue(TestingSessionLocal, Entry, nlp_url="http://nlp", workers=2, batch_size=2,
+                            poll_interval=0.01, transport=analyze_transport(calls))
+
+    async def scenario():
+        await queue.start()
+        await asyncio.sleep(0.2)
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert statuses() == [PROCESSED] * 5
+
+
+def test_concurrent_workers_process_each_entry_once(entries):
+    calls, rolled_up = [], []
+
+    async def handler(request):
+        # Analyse lente: les deux workers réserveraient le même lot sans verrou de ligne
+        await asyncio.sleep(0.05)
+        texts = json.loads(request.content)["texts"]
+        calls.extend(texts)
+        return httpx.Response(200, json={"results": [{"sentiment_score": 1, "keywords": []} for _ in texts]})
+
+    queue = ProcessingQueue(TestingSessionLocal, Entry, nlp_url="http://nlp", workers=2, batch_size=2,
+                            poll_interval=0.01, transport=httpx.MockTransport(handler),
+                            on_processed=lambda db, batch: rolled_up.extend(entry.id for entry in batch))
+
+    async def scenario():
+        await queue.start()
+        started = queue.stats()["workers"]
+        await asyncio.sleep(0.5)
+        await queue.stop()
+        return started
+
+    # SQLite ignore SKIP LOCKED: un seul worker est démarré
+    assert asyncio.run(scenario()) == 1
+    assert statuses() == [PROCESSED] * 5
+    assert len(calls) == 5
+    assert sorted(rolled_up) == [1, 2, 3, 4, 5]
+
+
+def test_on_processed_runs_in_batch_transaction(entries):
+    seen = []
+
+    def on_processed(db, batch):
+        seen.append(sorted(entry.processed for entry in batch))
+
+    queue = ProcessingQueue(TestingSessionLocal, Entry, nlp_url="http://nlp", workers=0,
+                            transport=analyze_transport([], status_code=422), on_processed=on_processed)
+
+    async def scenario():
+        await queue.start()
+        await queue.process_batch()
+        await queue.process_batch()
+        await queue.stop()
+
+    asyncio.run(scenario())
+    assert seen == [[FAILED] * 5]
+
+
+def test_stats_report_depth_and_lag(entries):
+    stats = ProcessingQueue(TestingSessionLocal, Entry).stats()
+
+    assert stats["depth"] == 5
+    assert 25 <= stats["lag_seconds"] < 60
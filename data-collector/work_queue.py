@@ -0,0 +1,268 @@
+"""
+File de traitement durable des données collectées pour le projet ECHO.
+La table des entrées sert elle-même de file: les entrées en attente
+(processed == 0) sont réservées par lots avec SELECT ... FOR UPDATE SKIP LOCKED,
+analysées en un seul appel au service NLP puis validées dans la même
+transaction. Sous PostgreSQL, une entrée n'est donc jamais perdue ni traitée
+deux fois, quel que soit le nombre de workers ou d'instances du service.
+Les autres bases (SQLite) ignorent SKIP LOCKED: un seul worker y est démarré.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Callable
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Métriques Prometheus
+QUEUE_DEPTH = Gauge('data_collector_queue_depth', 'Nombre d\'entrées en attente de traitement')
+QUEUE_LAG = Gauge('data_collector_queue_lag_seconds', 'Âge de la plus ancienne entrée en attente')
+ENTRIES_PROCESSED = Counter('data_collector_entries_processed_total', 'Entrées traitées', ['status'])
+BATCH_DURATION = Histogram('data_collector_batch_duration_seconds', 'Durée de traitement d\'un lot')
+
+# États de la colonne processed
+PENDING, PROCESSED, FAILED = 0, 1, -1
+
+# Réponses du service NLP qui rejettent le contenu du lot (les autres erreurs,
+# authentification comprise, sont transitoires et laissent le lot en attente)
+REJECTED_STATUSES = (400, 413, 422)
+
+
+class ProcessingQueue:
+    """
+    Workers asynchrones de traitement NLP des entrées en attente.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        entry_model,
+        nlp_url: str = os.getenv("NLP_SERVICE_URL", "http://nlp-engine:5000"),
+        workers: int = int(os.getenv("PROCESSING_WORKERS", "2")),
+        batch_size: int = int(os.getenv("PROCESSING_BATCH_SIZE", "50")),
+        poll_interval: float = float(os.getenv("PROCESSING_POLL_INTERVAL", "5")),
+        max_backoff: float = 60.0,
+        timeout: float = 60.0,
+        token: Optional[str] = os.getenv("NLP_SERVICE_TOKEN"),
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        on_processed: Optional[Callable[[Session, List[Any]], None]] = None,
+    ):
+        """
+        Args:
+            session_factory: Fabrique de sessions SQLAlchemy (une session par lot)
+            entry_model: Modèle ORM des entrées (colonnes processed, content, created_at)
+            nlp_url: URL du service NLP
+            workers: Nombre de workers concurrents
+            batch_size: Nombre maximum d'entrées réservées par lot
+            poll_interval: Délai d'attente lorsque la file est vide, en secondes
+            max_backoff: Délai maximum entre deux tentatives après une erreur du service NLP
+            timeout: Délai d'expiration des requêtes NLP
+            token: Jeton d'authentification envoyé au service NLP
+            transport: Transport httpx alternatif (tests)
+            on_processed: Appelé avec la session et les entrées d'un lot dont l'état vient
+                de changer, avant la validation de la transaction
+        """
+        self.session_factory = session_factory
+        self.entry_model = entry_model
+        self.nlp_url = nlp_url.rstrip("/")
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.token = token
+        self.transport = transport
+        self.on_processed = on_processed
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    async def start(self) -> None:
+        """
+        Démarre les workers.
+        """
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+
+        workers = self.workers
+        if workers > 1 and not self._supports_skip_locked():
+            # Sans SKIP LOCKED, deux workers réserveraient les mêmes entrées
+            # et les compteurs agrégés seraient incrémentés deux fois
+            logger.warning(f"SKIP LOCKED non supporté par la base: 1 worker au lieu de {workers}")
+            workers = 1
+
+        self._client = httpx.AsyncClient(
+            base_url=self.nlp_url,
+            headers={"Authorization": f"Bearer {self.token}"} if self.token else {},
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=workers),
+            transport=self.transport
+        )
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(workers)]
+        logger.info(f"File de traitement démarrée ({workers} workers, lots de {self.batch_size})")
+
+    async def stop(self) -> None:
+        """
+        Arrête les workers après le lot en cours.
+        """
+        self._stopping = True
+        self.notify()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client:
+            await self._client.aclose()
+        logger.info("File de traitement arrêtée")
+
+    def _supports_skip_locked(self) -> bool:
+        """
+        Indique si la base verrouille les lignes réservées (SELECT ... FOR UPDATE SKIP LOCKED).
+        """
+        db = self.session_factory()
+        try:
+            return db.get_bind().dialect.name == "postgresql"
+        finally:
+            db.close()
+
+    def notify(self) -> None:
+        """
+        Réveille les workers après l'insertion de nouvelles entrées.
+        """
+        if self._wakeup:
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Profondeur et retard de la file, également publiés en métriques Prometheus.
+        """
+        db = self.session_factory()
+        try:
+            depth, oldest = db.query(
+                func.count(self.entry_model.id),
+                func.min(self.entry_model.created_at)
+            ).filter(self.entry_model.processed == PENDING).one()
+        finally:
+            db.close()
+
+        lag = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+        QUEUE_DEPTH.set(depth)
+        QUEUE_LAG.set(lag)
+        return {"depth": depth, "lag_seconds": lag, "workers": len(self._tasks)}
+
+    async def _worker(self, worker_id: int) -> None:
+        failures = 0
+
+        while not self._stopping:
+            # Remis à zéro avant la réservation pour ne manquer aucun réveil
+            self._wakeup.clear()
+            try:
+                processed = await self.process_batch()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                processed = 0
+                logger.error(f"Worker {worker_id}: erreur de traitement ({failures} échecs consécutifs): {e}")
+
+            if processed and not self._stopping:
+                continue
+
+            # File vide ou service NLP indisponible: attente (croissante en cas d'erreurs)
+            delay = min(self.poll_interval * (2 ** failures), self.max_backoff) if failures else self.poll_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def _claim(self, db: Session) -> List[Any]:
+        """
+        Réserve un lot d'entrées en attente. Les lignes restent verrouillées
+        jusqu'à la fin de la transaction; les autres workers les ignorent.
+        """
+        return (
+            db.query(self.entry_model)
+            .filter(self.entry_model.processed == PENDING)
+            .order_by(self.entry_model.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    async def _analyze(self, entries: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Analyse d'un lot par le service NLP. Un lot rejeté est divisé en deux
+        jusqu'à isoler les entrées rejetées elles-mêmes.
+
+        Returns:
+            Analyse de chaque entrée, None pour une entrée rejetée
+
+        Raises:
+            httpx.HTTPError: Erreur transitoire du service NLP (indisponibilité, authentification)
+        """
+        response = await self._client.post(
+            "/analyze/batch",
+            json={"texts": [json.dumps(entry.content) for entry in entries]}
+        )
+        if response.status_code in REJECTED_STATUSES:
+            if len(entries) == 1:
+                logger.error(f"Entrée {entries[0].id} rejetée par le service NLP: {response.status_code}")
+                return [None]
+            middle = len(entries) // 2
+            return await self._analyze(entries[:middle]) + await self._analyze(entries[middle:])
+        response.raise_for_status()
+        return response.json()["results"]
+
+    async def process_batch(self) -> int:
+        """
+        Réserve, analyse et valide un lot d'entrées.
+
+        Returns:
+            Nombre d'entrées traitées (0 si la file est vide)
+
+        Raises:
+            httpx.HTTPError: Si le service NLP est indisponible ou refuse le jeton (le lot
+                est remis en attente)
+        """
+        db = self.session_factory()
+        try:
+            entries = await asyncio.to_thread(self._claim, db)
+            if not entries:
+                db.rollback()
+                return 0
+
+            with BATCH_DURATION.time():
+                try:
+                    analyses = await self._analyze(entries)
+                except httpx.HTTPError:
+                    # Erreur transitoire (service indisponible, jeton refusé ou expiré):
+                    # le rollback libère les verrous, le lot sera repris
+                    await asyncio.to_thread(db.rollback)
+                    raise
+
+                rejected = 0
+                for entry, analysis in zip(entries, analyses):
+                    if analysis is None:
+                        entry.processed = FAILED
+                        rejected += 1
+                        continue
+                    entry.sentiment_score = analysis.get("sentiment_score")
+                    entry.keywords = analysis.get("keywords")
+                    entry.processed = PROCESSED
+                ENTRIES_PROCESSED.labels(status="processed").inc(len(entries) - rejected)
+                ENTRIES_PROCESSED.labels(status="failed").inc(rejected)
+
+                if self.on_processed:
+                    await asyncio.to_thread(self.on_processed, db, entries)
+                await asyncio.to_thread(db.commit)
+
+            return len(entries)
+        finally:
+            db.close()
@@ -6,7 +6,6 @@ import uvicorn
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-import spacy
 from transformers import pipeline
 
 app = FastAPI(title="ECHO Demo")
@@ -26,7 +25,6 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-nlp = spacy.load("fr_core_news_md")
 sentiment_analyzer = pipeline("sentiment-analysis", model="nlptown/bert-base-multilingual-uncased-sentiment")
 
 # Modèles de données
@@ -96,7 +94,6 @@ def analyze_message(message: str):
     sentiment = sentiment_analyzer(message)[0]
     
     # Analyse des catégories
-    doc = nlp(message)
     categories = []
     if any(word in message.lower() for word in ["route", "nid de poule", "trou"]):
         categories.append("infrastructure")
@@ -0,0 +1,66 @@
+"""
+Fonctions d'analyse de texte du moteur NLP ECHO.
+Elles sont exécutées dans les processus du pool d'analyse: elles ne dépendent
+que de leurs arguments et des ressources du registre (resources.py).
+"""
+
+from typing import List, Dict, Any
+
+from resources import registry
+
+# Version des analyses, à incrémenter à chaque modification de leurs résultats
+# (elle fait partie de la clé du cache de résultats)
+ANALYZER_VERSION = "4"
+
+
+def analyze_sentiment(text: str) -> float:
+    """Analyse le sentiment du texte"""
+    scores = registry.get("sentiment").polarity_scores(text)
+    return scores['compound']
+
+def extract_keywords(text: str, num_keywords: int = 5) -> List[str]:
+    """Extrait les mots-clés du texte (TF-IDF sur les textes déjà analysés)"""
+    return registry.get("keywords").extract(text, num_keywords)
+
+def generate_summary(text: str, max_length: int = 200) -> str:
+    """Génère un résumé extractif du texte (phrases classées par TextRank)"""
+    return registry.get("summarizer").summarize(text, max_length)
+
+def extract_entities(text: str) -> List[Dict[str, Any]]:
+    """Extrait les entités nommées du texte (lieux, voies, organisations)"""
+    return registry.get("entities").extract(text)
+
+def analyze(
+    text: str,
+    keywords: List[str] = None,
+    summary: str = None,
+    entities: List[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Analyse complète d'un texte.
+
+    Args:
+        text: Texte à analyser
+        keywords: Mots-clés déjà extraits (extraction par lot)
+        summary: Résumé déjà calculé (résumés par lot)
+        entities: Entités déjà extraites (nlp.pipe par lot)
+
+    Returns:
+        Champs de TextAnalysisResponse
+    """
+    return {
+        "sentiment_score": analyze_sentiment(text),
+        "keywords": extract_keywords(text) if keywords is None else keywords,
+        "entities": extract_entities(text) if entities is None else entities,
+        "summary": generate_summary(text) if summary is None else summary
+    }
+
+def analyze_many(texts: List[str]) -> List[Dict[str, Any]]:
+    """Analyse un lot de textes (unité de travail envoyée au pool)"""
+    keywords = registry.get("keywords").extract_many(texts)
+    summaries = registry.get("summarizer").summarize_many(texts)
+    entities = registry.get("entities").extract_many(texts)
+    return [
+        analyze(text, text_keywords, summary, text_entities)
+        for text, text_keywords, summary, text_entities in zip(texts, keywords, summaries, entities)
+    ]
@@ -0,0 +1,82 @@
+"""
+Benchmark du regroupement en micro-lots de /classify.
+
+Pour chaque taille de lot maximum, des clients concurrents soumettent des
+requêtes au MicroBatcher devant le classifieur multilingue; le débit et les
+latences (p50/p99) sont mesurés, sur CPU.
+
+Exemple:
+    python benchmarks/bench_classify.py --model ./model-output --requests 512
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+
+# Ajout du répertoire du service au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from micro_batcher import MicroBatcher
+from multilingual_model import MultilingualClassifier
+
+TEXTS = [
+    "L'éclairage public ne fonctionne plus dans ma rue depuis trois jours.",
+    "There is a large pothole on Main Street that needs urgent repair.",
+    "Necesito ayuda para obtener mi certificado de residencia.",
+    "Es gibt zu viele Abfälle im Stadtpark.",
+    "Le bus 12 est encore en retard ce matin.",
+]
+
+
+async def run_curve_point(classifier, max_batch: int, requests: int, concurrency: int, max_wait_ms: float) -> dict:
+    batcher = MicroBatcher(classifier.batch_predict, max_batch=max_batch, max_wait_ms=max_wait_ms,
+                           max_queue_size=requests)
+    await batcher.start()
+    latencies = []
+    counter = iter(range(requests))
+
+    async def client():
+        for i in counter:
+            start = time.perf_counter()
+            await batcher.submit(TEXTS[i % len(TEXTS)])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    duration = time.perf_counter() - start
+    await batcher.stop()
+
+    latencies.sort()
+    return {
+        "max_batch": max_batch,
+        "requests_per_s": round(requests / duration, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 2),
+        "mean_batch": round(batcher.stats["requests"] / batcher.stats["batches"], 1),
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark des micro-lots de classification")
+    parser.add_argument("--model", default=os.getenv("CLASSIFIER_MODEL", "xlm-roberta-base"), help="Modèle à charger")
+    parser.add_argument("--requests", type=int, default=256, help="Nombre de requêtes par point de mesure")
+    parser.add_argument("--concurrency", type=int, default=64, help="Nombre de clients concurrents")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Attente maximum d'un micro-lot")
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16,32,64", help="Tailles de lot maximum à mesurer")
+    args = parser.parse_args()
+
+    classifier = MultilingualClassifier(model_name=args.model)
+    # Première passe hors mesure (allocations, initialisation des noyaux)
+    classifier.batch_predict(TEXTS)
+
+    for max_batch in (int(size) for size in args.batch_sizes.split(",")):
+        point = asyncio.run(run_curve_point(classifier, max_batch, args.requests, args.concurrency, args.max_wait_ms))
+        print(json.dumps(point))
+
+
+if __name__ == "__main__":
+    main_benchmark()
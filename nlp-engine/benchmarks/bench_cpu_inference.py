@@ -0,0 +1,72 @@
+"""
+Rapport exactitude / latence des modes d'inférence CPU du classifieur multilingue.
+
+Chaque mode (fp32, int8 dynamique, TorchScript, ONNX si onnxruntime est
+installé) est évalué sur un jeu de validation au format JSONL, une requête
+par ligne: {"text": "...", "category": "infrastructure"}.
+
+Exemple:
+    python benchmarks/bench_cpu_inference.py --model ./model-output --heldout heldout.jsonl --threads 4
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import importlib.util
+
+# Ajout du répertoire du service au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multilingual_model import MultilingualClassifier
+
+
+def load_heldout(path: str):
+    texts, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                example = json.loads(line)
+                texts.append(example["text"])
+                labels.append(example["category"])
+    return texts, labels
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Rapport des modes d'inférence CPU")
+    parser.add_argument("--model", required=True, help="Répertoire du modèle entraîné")
+    parser.add_argument("--heldout", required=True, help="Jeu de validation JSONL (text, category)")
+    parser.add_argument("--threads", type=int, default=None, help="Threads de calcul torch")
+    parser.add_argument("--batch-size", type=int, default=32, help="Nombre de textes par passe")
+    args = parser.parse_args()
+
+    texts, labels = load_heldout(args.heldout)
+    export_dir = tempfile.mkdtemp()
+
+    reference = MultilingualClassifier(model_name=args.model, num_threads=args.threads)
+    modes = [("fp32", reference)]
+    modes.append(("int8", MultilingualClassifier(model_name=args.model, quantize=True, num_threads=args.threads)))
+
+    reference.export_model(export_dir, format="torchscript")
+    modes.append(("torchscript", MultilingualClassifier(model_name=export_dir, backend="torchscript")))
+
+    if importlib.util.find_spec("onnxruntime") and importlib.util.find_spec("onnx"):
+        reference.export_model(export_dir, format="onnx")
+        modes.append(("onnx", MultilingualClassifier(model_name=export_dir, backend="onnx", num_threads=args.threads)))
+
+    baseline = None
+    for name, classifier in modes:
+        # Passes hors mesure (allocations, optimisation du graphe TorchScript)
+        for _ in range(2):
+            classifier.batch_predict(texts[:args.batch_size], batch_size=args.batch_size)
+        report = classifier.evaluate(texts, labels, batch_size=args.batch_size)
+        baseline = baseline or report
+        report["mode"] = name
+        report["accuracy_delta"] = round(report["accuracy"] - baseline["accuracy"], 4)
+        report["speedup"] = round(baseline["latency_ms_per_text"] / report["latency_ms_per_text"], 2)
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,81 @@
+"""
+Benchmark du registre de ressources NLP.
+
+Compare, sur les mêmes textes, l'ancienne analyse (analyseur VADER et stopwords
+reconstruits à chaque appel) à l'analyse s'appuyant sur le registre chargé
+une seule fois, et mesure le temps de chargement du registre.
+
+Les données NLTK (punkt, stopwords, vader_lexicon) doivent être installées
+localement (NLTK_DATA).
+
+Exemple:
+    python benchmarks/bench_resources.py --requests 500
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+# Ajout du répertoire du service au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nltk.sentiment import SentimentIntensityAnalyzer
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+import analyzer
+from resources import registry
+
+TEXTS = [
+    "Le lampadaire de la rue Victor Hugo est en panne depuis trois semaines, c'est dangereux la nuit.",
+    "Merci aux équipes de la voirie pour la réparation rapide du trottoir devant l'école !",
+    "Les poubelles débordent place de la République, les odeurs sont insupportables.",
+    "Le bus 12 est encore en retard ce matin. Aucune information n'a été donnée aux usagers.",
+]
+
+
+def legacy_analyze(text: str) -> dict:
+    """Analyse telle qu'effectuée avant le registre (ressources reconstruites par appel)"""
+    sentiment = SentimentIntensityAnalyzer().polarity_scores(text)['compound']
+    stop_words = set(stopwords.words('french'))
+    tokens = [word for word in word_tokenize(text.lower()) if word.isalnum() and word not in stop_words]
+    return {"sentiment_score": sentiment, "keywords": tokens[:5], "summary": analyzer.generate_summary(text)}
+
+
+def measure(function, requests: int) -> dict:
+    latencies = []
+    for i in range(requests):
+        start = time.perf_counter()
+        function(TEXTS[i % len(TEXTS)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+    }
+
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark du registre de ressources NLP")
+    parser.add_argument("--requests", type=int, default=200, help="Nombre d'analyses par variante")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    registry.load()
+    startup = time.perf_counter() - start
+
+    print(json.dumps({
+        "requests": args.requests,
+        "registry_load_s": round(startup, 3),
+        "registry_load_times": registry.load_times,
+        "before": measure(legacy_analyze, args.requests),
+        "after": measure(analyzer.analyze, args.requests),
+    }))
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,110 @@
+"""
+Extraction des entités nommées du moteur NLP ECHO (lieux, voies, organisations).
+
+Un seul pipeline spaCy est chargé par le registre de ressources, au démarrage
+du service, puis hérité par les processus du pool d'analyse. Seuls les
+composants utiles à la reconnaissance d'entités sont chargés: étiquetage
+morphologique, analyse syntaxique et lemmatisation sont exclus. Les textes
+d'un lot sont traités ensemble par nlp.pipe.
+
+Les voies ("rue Victor Hugo", "avenue de la République") sont reconnues par
+des règles placées avant le modèle statistique, qui les étiquette sinon comme
+de simples lieux ou les découpe.
+"""
+
+import logging
+from typing import Any, Dict, List, Sequence
+
+import spacy
+
+logger = logging.getLogger(__name__)
+
+# Composants du pipeline inutiles à la reconnaissance d'entités
+EXCLUDED_COMPONENTS = (
+    "tagger", "morphologizer", "parser", "attribute_ruler", "lemmatizer",
+    "trainable_lemmatizer", "senter", "sentencizer", "textcat", "textcat_multilabel",
+)
+
+# Types de voies reconnus par les règles
+STREET_TYPES = [
+    "rue", "avenue", "boulevard", "bd", "place", "chemin", "impasse", "allée",
+    "quai", "cours", "route", "square", "passage", "esplanade", "faubourg",
+]
+_ARTICLES = ["de", "du", "des", "la", "le", "les", "l'", "d'", "l", "d"]
+STREET_PATTERNS = [
+    {"label": "STREET", "pattern": [
+        {"LOWER": {"IN": STREET_TYPES}},
+        {"LOWER": {"IN": _ARTICLES}, "OP": "*"},
+        {"IS_TITLE": True, "OP": "+"},
+    ]},
+    # Avec numéro: "12 bis rue des Lilas"
+    {"label": "STREET", "pattern": [
+        {"LIKE_NUM": True},
+        {"LOWER": {"IN": ["bis", "ter"]}, "OP": "?"},
+        {"LOWER": {"IN": STREET_TYPES}},
+        {"LOWER": {"IN": _ARTICLES}, "OP": "*"},
+        {"IS_TITLE": True, "OP": "+"},
+    ]},
+]
+
+# Étiquettes retournées par défaut (les personnes sont écartées)
+DEFAULT_LABELS = ("LOC", "GPE", "STREET", "ORG")
+
+
+class EntityExtractor:
+    """
+    Reconnaissance d'entités nommées par lots sur un pipeline spaCy partagé.
+    """
+
+    def __init__(
+        self,
+        model: str = "fr_core_news_md",
+        labels: Sequence[str] = DEFAULT_LABELS,
+        batch_size: int = 64,
+        n_process: int = 1,
+    ):
+        """
+        Args:
+            model: Nom ou chemin du pipeline spaCy
+            labels: Étiquettes d'entités retournées
+            batch_size: Nombre de textes traités ensemble par nlp.pipe
+            n_process: Processus utilisés par nlp.pipe (1 dans les processus du pool d'analyse,
+                qui parallélisent déjà les lots)
+        """
+        self.labels = frozenset(labels)
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.nlp = spacy.load(model, exclude=list(EXCLUDED_COMPONENTS))
+
+        # Représentation partagée devenue inutile si aucun composant restant ne l'utilise
+        if "tok2vec" in self.nlp.pipe_names and not self.nlp.get_pipe("tok2vec").listening_components:
+            self.nlp.disable_pipe("tok2vec")
+
+        ruler_options = {"before": "ner"} if "ner" in self.nlp.pipe_names else {}
+        ruler = self.nlp.add_pipe("entity_ruler", name="street_ruler", config={"overwrite_ents": True},
+                                  **ruler_options)
+        ruler.add_patterns(STREET_PATTERNS)
+        logger.info(f"Pipeline d'entités {model} chargé: {self.nlp.pipe_names}")
+
+    def extract_many(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Entités de chaque texte, traités par lots.
+
+        Args:
+            texts: Textes à analyser
+
+        Returns:
+            Entités (texte, étiquette, positions en caractères) de chaque texte,
+            dans l'ordre des textes
+        """
+        return [
+            [
+                {"text": ent.text, "label": ent.label_, "start": ent.start_char, "end": ent.end_char}
+                for ent in doc.ents if ent.label_ in self.labels
+            ]
+            for doc in self.nlp.pipe(texts, batch_size=self.batch_size, n_process=self.n_process)
+        ]
+
+    def extract(self, text: str) -> List[Dict[str, Any]]:
+        """Entités d'un texte (voir extract_many)"""
+        return self.extract_many([text])[0]
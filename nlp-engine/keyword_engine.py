@@ -0,0 +1,210 @@
+"""
+Extraction de mots-clés par TF-IDF du moteur NLP ECHO.
+
+La fréquence brute d'un mot dans un seul texte fait ressortir le vocabulaire
+commun à toutes les requêtes citoyennes ("mairie", "rue"...). Les mots sont
+ici pondérés par leur rareté dans l'ensemble des textes analysés: les
+fréquences documentaires sont mises à jour à chaque analyse, bornées en
+mémoire, et enregistrées périodiquement sur disque.
+
+Chaque processus du pool d'analyse tient ses propres compteurs; à chaque
+enregistrement, ses incréments sont ajoutés au fichier partagé (sous verrou)
+et il reprend les totaux fusionnés de tous les processus. Les incréments non
+encore enregistrés sont perdus à l'arrêt brutal d'un processus (et à l'arrêt
+des processus du pool), ce qui ne fait que retarder légèrement les statistiques.
+"""
+
+import os
+import re
+import json
+import math
+import time
+import fcntl
+import atexit
+import logging
+import tempfile
+import threading
+from collections import Counter
+from typing import FrozenSet, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Mots: suites de lettres ou chiffres ("l'éclairage" donne "l" et "éclairage")
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Mots en minuscules d'un texte, dans l'ordre"""
+    return WORD_PATTERN.findall(text.lower())
+
+
+class DocumentFrequencies:
+    """
+    Nombre de textes contenant chaque mot, borné à max_terms mots.
+    En mémoire, les mots ne sont élagués qu'au-delà de 2 × max_terms afin de ne
+    pas trier les compteurs à chaque texte: jusqu'à 2 × max_terms mots peuvent
+    y être suivis entre deux élagages. Le fichier enregistré en garde max_terms.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_terms: int = 100000,
+        flush_interval: float = 60.0,
+    ):
+        """
+        Args:
+            path: Fichier d'enregistrement (None: statistiques en mémoire seulement)
+            max_terms: Nombre de mots conservés à chaque élagage (les moins fréquents sont oubliés)
+            flush_interval: Intervalle minimum entre deux enregistrements, en secondes
+        """
+        self.path = path
+        self.max_terms = max_terms
+        self.flush_interval = flush_interval
+        self.counts: Counter = Counter()
+        self.documents = 0
+        self._pending: Counter = Counter()
+        self._pending_documents = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Optional[str], **options) -> "DocumentFrequencies":
+        """Statistiques enregistrées dans path (vides si le fichier n'existe pas)"""
+        stats = cls(path, **options)
+        if path:
+            stats.documents, stats.counts = stats._read()
+            # Enregistrement à l'arrêt normal du processus
+            atexit.register(stats.flush)
+            logger.info(f"Fréquences documentaires chargées: {stats.documents} textes, {len(stats.counts)} mots")
+        return stats
+
+    def update(self, documents: Iterable[Iterable[str]]) -> None:
+        """
+        Compte une fois chaque mot distinct de chaque texte.
+
+        Args:
+            documents: Mots de chaque texte
+        """
+        with self._lock:
+            for terms in documents:
+                distinct = set(terms)
+                self.counts.update(distinct)
+                self._pending.update(distinct)
+                self.documents += 1
+                self._pending_documents += 1
+            # Élagage amorti: au plus 2 × max_terms mots en mémoire
+            if len(self.counts) > self.max_terms * 2:
+                self.counts = self._prune(self.counts)
+
+    def idf(self, term: str) -> float:
+        """Fréquence documentaire inverse lissée (un mot inconnu a la valeur maximum)"""
+        return math.log((1 + self.documents) / (1 + self.counts.get(term, 0))) + 1
+
+    def maybe_flush(self) -> None:
+        """Enregistre les statistiques si l'intervalle est écoulé"""
+        if self.path and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Ajoute les incréments au fichier partagé et reprend les totaux fusionnés"""
+        if not self.path:
+            return
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_documents:
+                return
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            try:
+                with open(f"{self.path}.lock", "a") as lock:
+                    # Verrou entre processus: chaque processus ajoute ses propres incréments
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    documents, counts = self._read()
+                    counts.update(self._pending)
+                    documents += self._pending_documents
+                    counts = self._prune(counts)
+
+                    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump({"documents": documents, "counts": counts}, f, ensure_ascii=False)
+                    os.replace(tmp_path, self.path)
+            except OSError as e:
+                # Les incréments sont conservés pour le prochain enregistrement
+                logger.error(f"Erreur d'enregistrement des fréquences documentaires: {e}")
+                return
+            self.documents, self.counts = documents, counts
+            self._pending.clear()
+            self._pending_documents = 0
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0, Counter()
+        except (OSError, ValueError) as e:
+            logger.error(f"Fréquences documentaires illisibles ({self.path}): {e}")
+            return 0, Counter()
+        return data["documents"], Counter(data["counts"])
+
+    def _prune(self, counts: Counter) -> Counter:
+        if len(counts) <= self.max_terms:
+            return counts
+        return Counter(dict(counts.most_common(self.max_terms)))
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+
+class KeywordEngine:
+    """
+    Mots-clés des textes classés par TF-IDF.
+    """
+
+    def __init__(self, stop_words: FrozenSet[str], stats: DocumentFrequencies):
+        """
+        Args:
+            stop_words: Mots ignorés
+            stats: Fréquences documentaires, mises à jour par chaque extraction
+        """
+        self.stop_words = stop_words
+        self.stats = stats
+
+    def terms(self, text: str) -> List[str]:
+        """Mots candidats d'un texte (hors mots vides, nombres et lettres isolées)"""
+        return [
+            word for word in tokenize(text)
+            if len(word) > 1 and not word.isdigit() and word not in self.stop_words
+        ]
+
+    def extract_many(self, texts: List[str], num_keywords: int = 5, update: bool = True) -> List[List[str]]:
+        """
+        Mots-clés d'un lot de textes: chaque texte est découpé une seule fois,
+        les fréquences documentaires sont mises à jour pour tout le lot puis
+        chaque mot est noté tf × idf (tf logarithmique: une répétition ne
+        suffit pas à faire passer un mot courant devant un mot rare).
+
+        Args:
+            texts: Textes à analyser
+            num_keywords: Nombre maximum de mots-clés par texte
+            update: Compter les textes dans les fréquences documentaires
+
+        Returns:
+            Mots-clés de chaque texte, du plus au moins pertinent, dans l'ordre des textes
+        """
+        documents = [self.terms(text) for text in texts]
+        if update:
+            self.stats.update(documents)
+            self.stats.maybe_flush()
+
+        keywords = []
+        for terms in documents:
+            # Counter conserve l'ordre de première apparition: départage stable des ex aequo
+            scores = {term: (1 + math.log(count)) * self.stats.idf(term) for term, count in Counter(terms).items()}
+            keywords.append(sorted(scores, key=scores.get, reverse=True)[:num_keywords])
+        return keywords
+
+    def extract(self, text: str, num_keywords: int = 5, update: bool = True) -> List[str]:
+        """Mots-clés d'un texte (voir extract_many)"""
+        return self.extract_many([text], num_keywords, update)[0]
@@ -0,0 +1,233 @@
+"""
+Identification de la langue des textes du moteur NLP ECHO.
+
+Modèle bayésien naïf sur les n-grammes de caractères (1 à 3 caractères, mots
+encadrés d'espaces): l'identification d'un texte se réduit à une somme de
+log-probabilités par n-gramme, sans modèle neuronal. Seuls les premiers
+caractères d'un texte sont examinés, ce qui borne le coût par texte.
+
+Les profils par défaut sont appris au démarrage sur un petit corpus intégré
+(français, anglais, espagnol, allemand); des profils appris sur un corpus plus
+large peuvent être enregistrés (save) puis chargés (load).
+"""
+
+import json
+import math
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Tuple, Optional
+
+import numpy as np
+
+# Langue retournée pour un texte sans caractère exploitable
+UNKNOWN_LANGUAGE = "und"
+
+# Corpus d'apprentissage intégré: phrases courantes et vocabulaire des requêtes citoyennes
+DEFAULT_SAMPLES = {
+    "fr": [
+        "L'éclairage public ne fonctionne plus dans ma rue depuis trois jours.",
+        "Les poubelles débordent sur la place de la mairie et les odeurs sont insupportables.",
+        "Le bus est encore en retard ce matin, aucune information n'a été donnée aux usagers.",
+        "Je voudrais savoir comment obtenir un certificat de résidence auprès de la commune.",
+        "Il y a un nid de poule dangereux devant l'école, quelqu'un va se blesser.",
+        "Merci aux équipes de la voirie pour la réparation rapide du trottoir.",
+        "Nous avons besoin d'une aide pour le logement social de notre famille.",
+        "Le bruit des travaux commence très tôt le matin et continue jusqu'à la nuit.",
+        "C'est un problème de sécurité, la police doit intervenir dans le quartier.",
+        "Est-ce que vous pouvez nettoyer le parc avant le week-end ?",
+    ],
+    "en": [
+        "There is a large pothole on Main Street that needs urgent repair.",
+        "The street lights have not been working in our neighborhood for three days.",
+        "The bins are overflowing near the town hall and the smell is unbearable.",
+        "The bus was late again this morning and nobody told the passengers why.",
+        "I would like to know how to get a residence certificate from the council.",
+        "Thank you to the road team for fixing the sidewalk so quickly.",
+        "We need help with social housing for our family.",
+        "The noise from the construction work starts very early and goes on all night.",
+        "This is a safety issue, the police should come to the area.",
+        "Could you please clean the park before the weekend?",
+    ],
+    "es": [
+        "Hay un bache muy grande en la calle principal que necesita reparación urgente.",
+        "Las farolas de nuestro barrio no funcionan desde hace tres días.",
+        "Los contenedores de basura están llenos junto al ayuntamiento y el olor es insoportable.",
+        "El autobús llegó tarde otra vez esta mañana y nadie informó a los pasajeros.",
+        "Necesito ayuda para obtener mi certificado de residencia en el municipio.",
+        "Gracias al equipo de obras por arreglar la acera tan rápido.",
+        "Necesitamos ayuda con la vivienda social para nuestra familia.",
+        "El ruido de las obras empieza muy temprano y sigue toda la noche.",
+        "Es un problema de seguridad, la policía tiene que venir al barrio.",
+        "¿Pueden limpiar el parque antes del fin de semana?",
+    ],
+    "de": [
+        "Es gibt ein großes Schlagloch in der Hauptstraße, das dringend repariert werden muss.",
+        "Die Straßenlaternen in unserem Viertel funktionieren seit drei Tagen nicht mehr.",
+        "Die Mülltonnen am Rathaus quellen über und der Geruch ist unerträglich.",
+        "Der Bus war heute Morgen wieder zu spät und niemand hat die Fahrgäste informiert.",
+        "Ich möchte wissen, wie ich eine Meldebescheinigung bei der Gemeinde bekomme.",
+        "Vielen Dank an das Straßenteam für die schnelle Reparatur des Gehwegs.",
+        "Wir brauchen Hilfe bei der Suche nach einer Sozialwohnung für unsere Familie.",
+        "Der Lärm der Bauarbeiten beginnt sehr früh und dauert bis in die Nacht.",
+        "Das ist ein Sicherheitsproblem, die Polizei muss in das Viertel kommen.",
+        "Können Sie bitte den Park vor dem Wochenende reinigen?",
+    ],
+}
+
+
+def _prepare(text: str, max_chars: int) -> str:
+    """Texte réduit aux lettres en minuscules, mots séparés par une espace et encadrés"""
+    text = unicodedata.normalize("NFC", text[:max_chars]).lower()
+    cleaned = "".join(char if char.isalpha() else " " for char in text)
+    return f" {' '.join(cleaned.split())} "
+
+def char_ngrams(text: str, max_n: int = 3, max_chars: int = 1000) -> List[str]:
+    """
+    N-grammes de caractères d'un texte (longueurs 1 à max_n).
+
+    Args:
+        text: Texte à découper
+        max_n: Longueur maximum des n-grammes
+        max_chars: Nombre de caractères du texte examinés
+
+    Returns:
+        Liste des n-grammes (avec répétitions)
+    """
+    prepared = _prepare(text, max_chars)
+    if not prepared.strip():
+        return []
+    return [
+        prepared[i:i + n]
+        for n in range(1, max_n + 1)
+        for i in range(len(prepared) - n + 1)
+        if prepared[i:i + n] != " "
+    ]
+
+
+class LanguageDetector:
+    """
+    Identification de la langue par n-grammes de caractères.
+    """
+
+    def __init__(
+        self,
+        languages: List[str],
+        log_probs: Dict[str, List[float]],
+        unseen: List[float],
+        max_n: int = 3,
+        max_chars: int = 200,
+    ):
+        """
+        Args:
+            languages: Langues reconnues (codes ISO 639-1)
+            log_probs: Log-probabilité de chaque n-gramme par langue (dans l'ordre de languages)
+            unseen: Log-probabilité par langue d'un n-gramme absent du corpus
+            max_n: Longueur maximum des n-grammes
+            max_chars: Nombre de caractères examinés par texte
+        """
+        self.languages = list(languages)
+        self.max_n = max_n
+        self.max_chars = max_chars
+        # Une ligne de log-probabilités par n-gramme, la dernière pour les n-grammes inconnus
+        self._index = {gram: i for i, gram in enumerate(log_probs)}
+        self._matrix = np.asarray(list(log_probs.values()) + [unseen], dtype=np.float64)
+        self._matrix = self._matrix.reshape(-1, len(self.languages))
+
+    @classmethod
+    def train(
+        cls,
+        samples: Dict[str, List[str]] = None,
+        max_n: int = 3,
+        max_features: int = 2000,
+        max_chars: int = 200,
+    ) -> "LanguageDetector":
+        """
+        Apprend les profils de langue à partir de textes étiquetés.
+
+        Args:
+            samples: Textes par langue (corpus intégré par défaut)
+            max_n: Longueur maximum des n-grammes
+            max_features: Nombre de n-grammes les plus fréquents conservés par langue
+            max_chars: Nombre de caractères examinés par texte à l'identification
+
+        Returns:
+            Détecteur entraîné
+        """
+        samples = samples or DEFAULT_SAMPLES
+        languages = sorted(samples)
+        counts = {
+            language: Counter(
+                gram for text in samples[language] for gram in char_ngrams(text, max_n, max_chars=len(text))
+            )
+            for language in languages
+        }
+        vocabulary = set()
+        for language in languages:
+            vocabulary.update(gram for gram, _ in counts[language].most_common(max_features))
+
+        # Lissage de Laplace: un n-gramme jamais vu garde une probabilité non nulle
+        log_probs = {gram: [] for gram in vocabulary}
+        unseen = []
+        for language in languages:
+            total = sum(counts[language][gram] for gram in vocabulary) + len(vocabulary) + 1
+            for gram in vocabulary:
+                log_probs[gram].append(math.log((counts[language][gram] + 1) / total))
+            unseen.append(math.log(1 / total))
+
+        return cls(languages, log_probs, unseen, max_n=max_n, max_chars=max_chars)
+
+    def detect(self, text: str) -> Tuple[str, float]:
+        """
+        Identifie la langue d'un texte.
+
+        Args:
+            text: Texte à identifier
+
+        Returns:
+            Langue la plus probable et sa probabilité a posteriori
+            (UNKNOWN_LANGUAGE et 0.0 pour un texte sans lettre)
+        """
+        grams = char_ngrams(text, self.max_n, self.max_chars)
+        if not grams:
+            return UNKNOWN_LANGUAGE, 0.0
+
+        unseen = len(self._index)
+        scores = self._matrix[[self._index.get(gram, unseen) for gram in grams]].sum(axis=0)
+
+        # Probabilités a posteriori (langues équiprobables a priori)
+        probs = np.exp(scores - scores.max())
+        probs /= probs.sum()
+        best = int(probs.argmax())
+        return self.languages[best], float(probs[best])
+
+    def detect_many(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """Identifie la langue de chaque texte, dans l'ordre des textes"""
+        return [self.detect(text) for text in texts]
+
+    def save(self, path: str):
+        """Enregistre les profils de langue au format JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "languages": self.languages,
+                "max_n": self.max_n,
+                "max_chars": self.max_chars,
+                "unseen": self._matrix[-1].tolist(),
+                "log_probs": {gram: self._matrix[i].tolist() for gram, i in self._index.items()},
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "LanguageDetector":
+        """Charge des profils de langue enregistrés par save"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["languages"], data["log_probs"], data["unseen"],
+            max_n=data["max_n"], max_chars=data["max_chars"]
+        )
+
+
+def build_detector(path: Optional[str] = None) -> LanguageDetector:
+    """Détecteur à partir de profils enregistrés, ou appris sur le corpus intégré"""
+    if path:
+        return LanguageDetector.load(path)
+    return LanguageDetector.train()
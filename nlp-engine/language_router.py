@@ -0,0 +1,116 @@
+"""
+Routage par langue des classifications du moteur NLP ECHO.
+
+La langue de chaque texte est identifiée (LanguageDetector) avant la
+classification: les textes des langues dominantes, identifiées avec une
+confiance suffisante, sont confiés à un modèle monolingue plus léger; les
+autres au modèle multilingue. Chaque modèle ne reçoit qu'une passe par lot.
+"""
+
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Histogram
+
+from language_detector import LanguageDetector
+
+logger = logging.getLogger(__name__)
+
+# Nom du modèle multilingue dans les métriques
+DEFAULT_ROUTE = "multilingual"
+
+# Métriques Prometheus
+DETECTION_SECONDS = Histogram(
+    'nlp_language_detection_seconds', "Durée de l'identification de la langue d'un lot",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+)
+CLASSIFICATION_SECONDS = Histogram(
+    'nlp_classification_seconds', 'Durée de classification par texte (passe du lot répartie entre ses textes)',
+    ['language', 'model']
+)
+CLASSIFICATION_TEXTS = Counter('nlp_classification_texts_total', 'Textes classés', ['language', 'model'])
+
+ClassifyFunction = Callable[[List[str]], List[Dict[str, Any]]]
+
+
+def parse_routes(value: Optional[str]) -> Dict[str, str]:
+    """
+    Lit la configuration des routes: "fr=/app/models/classifier-fr,en=...".
+
+    Returns:
+        Chemin du modèle monolingue par langue
+    """
+    routes = {}
+    for item in (value or "").split(","):
+        if not item.strip():
+            continue
+        language, _, model = item.partition("=")
+        if not model.strip():
+            raise ValueError(f"Route de classification invalide: {item!r}")
+        routes[language.strip().lower()] = model.strip()
+    return routes
+
+
+class LanguageRouter:
+    """
+    Répartition d'un lot de textes entre modèles selon leur langue.
+    """
+
+    def __init__(
+        self,
+        detector: LanguageDetector,
+        default: ClassifyFunction,
+        routes: Optional[Dict[str, ClassifyFunction]] = None,
+        min_confidence: float = 0.9,
+    ):
+        """
+        Args:
+            detector: Détecteur de langue
+            default: Classification multilingue (langues sans route, identification incertaine)
+            routes: Classification monolingue par langue
+            min_confidence: Probabilité minimum de la langue identifiée pour suivre sa route
+        """
+        self.detector = detector
+        self.default = default
+        self.routes = routes or {}
+        self.min_confidence = min_confidence
+
+    def route(self, language: str, confidence: float) -> str:
+        """Route d'un texte: sa langue si elle a un modèle dédié, DEFAULT_ROUTE sinon"""
+        if language in self.routes and confidence >= self.min_confidence:
+            return language
+        return DEFAULT_ROUTE
+
+    def classify(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Identifie la langue des textes puis les classe, une passe par modèle.
+
+        Args:
+            texts: Textes à classifier
+
+        Returns:
+            Prédictions dans l'ordre des textes, complétées de la langue identifiée
+        """
+        start = time.perf_counter()
+        languages = self.detector.detect_many(texts)
+        DETECTION_SECONDS.observe(time.perf_counter() - start)
+
+        groups: Dict[str, List[int]] = {}
+        for i, (language, confidence) in enumerate(languages):
+            groups.setdefault(self.route(language, confidence), []).append(i)
+
+        results: List[Dict[str, Any]] = [None] * len(texts)
+        for route, indices in groups.items():
+            classify = self.routes.get(route, self.default)
+            start = time.perf_counter()
+            predictions = classify([texts[i] for i in indices])
+            per_text = (time.perf_counter() - start) / len(indices)
+
+            for i, prediction in zip(indices, predictions):
+                language = languages[i][0]
+                results[i] = dict(prediction, language=language)
+                CLASSIFICATION_SECONDS.labels(language=language, model=route).observe(per_text)
+                CLASSIFICATION_TEXTS.labels(language=language, model=route).inc()
+
+        return results
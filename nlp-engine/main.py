@@ -1,30 +1,150 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi.responses import Response, JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 import os
 import logging
-from typing import List, Dict, Any
-from pydantic import BaseModel
-import httpx
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.probability import FreqDist
-import json
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, ConfigDict, Field
+import asyncio
+from functools import partial
+from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from token_verifier import TokenVerifier
+from worker_pool import AnalysisPool
+from resources import registry
+from analyzer import ANALYZER_VERSION
+from result_cache import CACHE_REQUESTS, build_cache, cache_key
+from micro_batcher import MicroBatcher
+from language_detector import build_detector
+from language_router import DEFAULT_ROUTE, LanguageRouter, parse_routes
+from model_registry import ModelRegistry
+from ndjson_stream import NDJSONRequestBody, ndjson_response, ordered_chunks
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Téléchargement des ressources NLTK nécessaires
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('vader_lexicon')
-
 # Configuration OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-app = FastAPI(title="ECHO NLP Engine")
+# Vérification locale des tokens (remplace les appels à /verify)
+token_verifier = TokenVerifier()
+
+# Nombre maximum de textes acceptés par /analyze/batch
+MAX_BATCH_TEXTS = int(os.getenv("MAX_BATCH_TEXTS", "1000"))
+
+# Nombre maximum de paquets en cours par réponse en flux (mémoire bornée quelle que soit la taille du lot)
+STREAM_MAX_PENDING = int(os.getenv("STREAM_MAX_PENDING", "4"))
+
+# Pool de processus des analyses (hors de la boucle d'événements)
+analysis_pool = AnalysisPool()
+
+# Cache des résultats, indexé par empreinte du texte normalisé et version de l'analyseur
+result_cache = build_cache()
+
+# Classifieur multilingue, chargé depuis le disque uniquement (volume des modèles),
+# au préchauffage ou à la première classification
+MODEL_PATH = os.getenv("MODEL_PATH", "/app/models")
+CLASSIFIER_MODEL = os.getenv("CLASSIFIER_MODEL", os.path.join(MODEL_PATH, "classifier"))
+CLASSIFIER_WARMUP = os.getenv("CLASSIFIER_WARMUP", "true").lower() == "true"
+# Mode d'inférence CPU (voir MultilingualClassifier.load_model)
+CLASSIFIER_OPTIONS = {
+    "backend": os.getenv("CLASSIFIER_BACKEND", "pytorch"),
+    "quantize": os.getenv("CLASSIFIER_QUANTIZE", "false").lower() == "true",
+    "num_threads": int(os.getenv("CLASSIFIER_THREADS", "0")) or None,
+    "interop_threads": int(os.getenv("CLASSIFIER_INTEROP_THREADS", "0")) or None,
+    "embedding_cache_size": int(os.getenv("CLASSIFIER_EMBEDDING_CACHE", "10000")),
+    "local_files_only": os.getenv("CLASSIFIER_LOCAL_ONLY", "true").lower() == "true",
+}
+# Chemin rapide par centroïdes (fichier produit par MultilingualClassifier.save_centroids)
+CLASSIFIER_CENTROIDS = os.getenv("CLASSIFIER_CENTROIDS")
+CLASSIFIER_CENTROID_THRESHOLD = float(os.getenv("CLASSIFIER_CENTROID_THRESHOLD", "0.85"))
+# Modèles monolingues par langue ("fr=/app/models/classifier-fr,en=..."): les textes de
+# ces langues leur sont confiés, les autres au modèle multilingue
+CLASSIFIER_ROUTES = parse_routes(os.getenv("CLASSIFIER_ROUTES"))
+LANGUAGE_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_MIN_CONFIDENCE", "0.9"))
+# Centroïdes d'un modèle mis en service à chaud, dans son répertoire (propres à son espace de représentation)
+CENTROIDS_FILE = "centroids.pt"
+# Rôles autorisés à mettre en service un modèle (claim role du token)
+MODEL_ADMIN_ROLES = frozenset(os.getenv("MODEL_ADMIN_ROLES", "admin,service").split(","))
+
+def build_classifier(model_path: str, version: Optional[str] = None):
+    """Classifieur multilingue non chargé (le modèle est chargé au préchauffage ou à sa première utilisation)"""
+    from multilingual_model import MultilingualClassifier
+    classifier = MultilingualClassifier(model_name=model_path, version=version, **CLASSIFIER_OPTIONS)
+    if model_path == CLASSIFIER_MODEL:
+        centroids = CLASSIFIER_CENTROIDS
+    else:
+        centroids = os.path.join(model_path, CENTROIDS_FILE)
+        centroids = centroids if os.path.exists(centroids) else None
+    if centroids:
+        classifier.load_centroids(centroids)
+    return classifier
+
+def build_route_classifier(model_path: str, version: Optional[str] = None):
+    """Classifieur monolingue non chargé (sans centroïdes: espace de représentation propre)"""
+    from multilingual_model import MultilingualClassifier
+    return MultilingualClassifier(model_name=model_path, version=version, **CLASSIFIER_OPTIONS)
+
+def build_model_registry() -> ModelRegistry:
+    """Registre des classifieurs configurés: le modèle multilingue et un modèle par langue routée"""
+    models = ModelRegistry()
+    models.register(DEFAULT_ROUTE, CLASSIFIER_MODEL, build_classifier)
+    for language, model_path in CLASSIFIER_ROUTES.items():
+        models.register(language, model_path, build_route_classifier)
+    return models
+
+# Classifieurs remplaçables à chaud (POST /models/{name}/swap)
+model_registry = build_model_registry()
+
+def classify_with(name: str, texts: List[str], **options) -> List[Dict[str, Any]]:
+    """Passe d'un classifieur du registre; chaque résultat porte la version du modèle utilisé"""
+    with model_registry.use(name) as classifier:
+        results = classifier.classify(texts, **options)
+    for result in results:
+        result["model_version"] = classifier.version
+    return results
+
+def classify_multilingual(texts: List[str]) -> List[Dict[str, Any]]:
+    """Passe du classifieur multilingue"""
+    return classify_with(DEFAULT_ROUTE, texts, threshold=CLASSIFIER_CENTROID_THRESHOLD)
+
+def classify_monolingual(language: str, texts: List[str]) -> List[Dict[str, Any]]:
+    """Passe du classifieur monolingue d'une langue"""
+    return classify_with(language, texts)
+
+# Identification de la langue (profils de n-grammes de caractères) et routage vers les modèles
+language_router = LanguageRouter(
+    build_detector(os.getenv("LANGUAGE_PROFILES")),
+    default=classify_multilingual,
+    routes={language: partial(classify_monolingual, language) for language in CLASSIFIER_ROUTES},
+    min_confidence=LANGUAGE_MIN_CONFIDENCE
+)
+
+def classify_batch(texts: List[str]) -> List[Dict[str, Any]]:
+    """Classification d'un micro-lot: une passe par modèle (langue)"""
+    return language_router.classify(texts)
+
+# Regroupement des requêtes /classify en passes uniques du modèle
+classify_batcher = MicroBatcher(classify_batch)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chargement avant la création du pool: les processus héritent des ressources
+    registry.load()
+    analysis_pool.start()
+    await classify_batcher.start()
+    # Chargement et préchauffage du modèle en arrière-plan: le service démarre sans attendre
+    if CLASSIFIER_WARMUP:
+        for name in (DEFAULT_ROUTE, *CLASSIFIER_ROUTES):
+            model_registry.get(name).warm_up(background=True)
+    yield
+    await classify_batcher.stop()
+    analysis_pool.stop()
+    await token_verifier.close()
+
+app = FastAPI(title="ECHO NLP Engine", lifespan=lifespan)
 
 # Modèles Pydantic
 class TextAnalysisRequest(BaseModel):
@@ -36,94 +156,234 @@ class TextAnalysisResponse(BaseModel):
     entities: List[Dict[str, Any]]
     summary: str
 
+class ClassificationRequest(BaseModel):
+    text: str
+
+class ClassificationResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    category: str
+    category_id: int
+    confidence: float
+    all_scores: Dict[str, float]
+    method: Optional[str] = None
+    language: Optional[str] = None
+    model_version: Optional[str] = None
+
+class ModelSwapRequest(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_path: str
+    version: Optional[str] = None
+
+class TextBatchRequest(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_TEXTS)
+
+class TextBatchResponse(BaseModel):
+    results: List[TextAnalysisResponse]
+
 async def verify_token(token: str = Depends(oauth2_scheme)):
-    """Vérifie le token JWT avec le service d'authentification"""
-    auth_service_url = os.getenv("AUTH_SERVICE_URL", "http://auth-service:5003")
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{auth_service_url}/verify",
-                json={"token": token}
-            )
-            if response.status_code == 200:
-                return response.json()
-            raise HTTPException(status_code=401, detail="Token invalide")
-        except Exception as e:
-            logger.error(f"Erreur lors de la vérification du token: {e}")
-            raise HTTPException(status_code=500, detail="Erreur de service")
-
-def analyze_sentiment(text: str) -> float:
-    """Analyse le sentiment du texte"""
-    sia = SentimentIntensityAnalyzer()
-    scores = sia.polarity_scores(text)
-    return scores['compound']
-
-def extract_keywords(text: str, num_keywords: int = 5) -> List[str]:
-    """Extrait les mots-clés du texte"""
-    # Tokenization
-    tokens = word_tokenize(text.lower())
-    
-    # Suppression des stopwords
-    stop_words = set(stopwords.words('french'))
-    filtered_tokens = [word for word in tokens if word.isalnum() and word not in stop_words]
-    
-    # Calcul de la fréquence
-    fdist = FreqDist(filtered_tokens)
-    
-    # Retourne les mots les plus fréquents
-    return [word for word, freq in fdist.most_common(num_keywords)]
-
-def generate_summary(text: str, max_length: int = 200) -> str:
-    """Génère un résumé du texte"""
-    sentences = nltk.sent_tokenize(text)
-    if not sentences:
-        return ""
-    
-    # Version simple : retourne les premières phrases jusqu'à max_length
-    summary = ""
-    for sentence in sentences:
-        if len(summary) + len(sentence) <= max_length:
-            summary += sentence + " "
-        else:
-            break
-    
-    return summary.strip()
+    """Vérifie le token JWT localement (clés du service d'authentification en cache)"""
+    return await token_verifier.verify(token)
+
+async def verify_model_admin(token: dict = Depends(verify_token)):
+    """Token d'un administrateur ou d'un service interne (mise en service de modèles)"""
+    if token.get("role") not in MODEL_ADMIN_ROLES:
+        raise HTTPException(status_code=403, detail="Rôle administrateur requis")
+    return token
+
+def resolve_model_path(model_path: str) -> Optional[str]:
+    """Chemin absolu d'un modèle (relatif à MODEL_PATH), None s'il sort de MODEL_PATH"""
+    root = os.path.realpath(MODEL_PATH)
+    path = os.path.realpath(os.path.join(root, model_path))
+    return path if os.path.commonpath([root, path]) == root else None
+
+def cache_bypassed(x_cache_bypass: Optional[str] = Header(None)) -> bool:
+    """En-tête X-Cache-Bypass: force une nouvelle analyse (le résultat remplace celui en cache)"""
+    return (x_cache_bypass or "").lower() in ("1", "true", "yes")
+
+async def analyze_with_cache(texts: List[str], bypass: bool = False) -> List[Dict[str, Any]]:
+    """
+    Analyse des textes en ne soumettant au pool que ceux absents du cache
+    (une seule fois par texte distinct).
+
+    Returns:
+        Résultats dans l'ordre des textes
+    """
+    keys = [cache_key(text, ANALYZER_VERSION) for text in texts]
+    if bypass:
+        CACHE_REQUESTS.labels(result="bypass").inc(len(texts))
+        results = [None] * len(texts)
+    else:
+        results = await result_cache.get_many(keys)
+
+    pending: Dict[str, str] = {}
+    for key, text, result in zip(keys, texts, results):
+        if result is None:
+            pending.setdefault(key, text)
+
+    if pending:
+        fresh = dict(zip(pending, await analysis_pool.map(list(pending.values()))))
+        await result_cache.set_many(fresh)
+        results = [fresh.get(key, result) for key, result in zip(keys, results)]
+
+    return results
 
 @app.post("/analyze", response_model=TextAnalysisResponse)
 async def analyze_text(
     request: TextAnalysisRequest,
+    bypass: bool = Depends(cache_bypassed),
     token: dict = Depends(verify_token)
 ):
     """Analyse le texte fourni"""
     try:
-        # Analyse du sentiment
-        sentiment_score = analyze_sentiment(request.text)
-        
-        # Extraction des mots-clés
-        keywords = extract_keywords(request.text)
-        
-        # Génération du résumé
-        summary = generate_summary(request.text)
-        
-        # Pour l'instant, on retourne une liste vide pour les entités
-        # À implémenter avec un modèle NER plus tard
-        entities = []
-        
-        return TextAnalysisResponse(
-            sentiment_score=sentiment_score,
-            keywords=keywords,
-            entities=entities,
-            summary=summary
-        )
+        results = await analyze_with_cache([request.text], bypass)
+        return TextAnalysisResponse(**results[0])
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse du texte: {e}")
         raise HTTPException(status_code=500, detail="Erreur lors de l'analyse du texte")
 
+@app.post("/analyze/batch", response_model=TextBatchResponse)
+async def analyze_batch(
+    request: TextBatchRequest,
+    bypass: bool = Depends(cache_bypassed),
+    token: dict = Depends(verify_token)
+):
+    """Analyse un lot de textes; les résultats sont retournés dans l'ordre des textes"""
+    try:
+        return {"results": await analyze_with_cache(request.texts, bypass)}
+    except Exception as e:
+        logger.error(f"Erreur lors de l'analyse d'un lot de {len(request.texts)} textes: {e}")
+        raise HTTPException(status_code=500, detail="Erreur lors de l'analyse du texte")
+
+def stream_analyses(texts, bypass: bool, body: Optional[NDJSONRequestBody] = None):
+    """Analyses en flux NDJSON, par paquets du pool, en passant par le cache"""
+    results = ordered_chunks(
+        texts, lambda chunk: analyze_with_cache(chunk, bypass),
+        chunk_size=analysis_pool.chunk_size, max_pending=STREAM_MAX_PENDING
+    )
+    return ndjson_response(results, "Erreur lors de l'analyse du texte", body)
+
+async def classify_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """Classification d'un paquet de textes, regroupés avec les autres requêtes en micro-lots"""
+    results = await asyncio.gather(*(classify_batcher.submit(text) for text in texts))
+    return [ClassificationResponse(**result).model_dump() for result in results]
+
+def stream_classifications(texts, body: Optional[NDJSONRequestBody] = None):
+    """Classifications en flux NDJSON, au plus STREAM_MAX_PENDING micro-lots en attente"""
+    results = ordered_chunks(
+        texts, classify_chunk,
+        chunk_size=classify_batcher.max_batch, max_pending=STREAM_MAX_PENDING
+    )
+    return ndjson_response(results, "Erreur lors de la classification du texte", body)
+
+@app.post("/analyze/batch/stream")
+async def analyze_batch_stream(
+    request: TextBatchRequest,
+    bypass: bool = Depends(cache_bypassed),
+    token: dict = Depends(verify_token)
+):
+    """
+    Analyse un lot de textes et diffuse les résultats en NDJSON (une ligne par texte,
+    dans l'ordre des textes) au fur et à mesure de leur production.
+    """
+    return stream_analyses(request.texts, bypass)
+
+@app.post("/analyze/stream")
+async def analyze_stream(
+    request: Request,
+    bypass: bool = Depends(cache_bypassed),
+    token: dict = Depends(verify_token)
+):
+    """
+    Analyse des textes reçus en NDJSON (une ligne {"text": ...} par texte, sans limite
+    de nombre) et diffuse les résultats en NDJSON au fil de la lecture.
+    """
+    body = NDJSONRequestBody(request)
+    return stream_analyses(body, bypass, body)
+
+@app.post("/classify/batch/stream")
+async def classify_batch_stream(
+    request: TextBatchRequest,
+    token: dict = Depends(verify_token)
+):
+    """Classe un lot de textes et diffuse les résultats en NDJSON, dans l'ordre des textes"""
+    return stream_classifications(request.texts)
+
+@app.post("/classify/stream")
+async def classify_stream(
+    request: Request,
+    token: dict = Depends(verify_token)
+):
+    """Classe des textes reçus en NDJSON et diffuse les résultats en NDJSON au fil de la lecture"""
+    body = NDJSONRequestBody(request)
+    return stream_classifications(body, body)
+
+@app.post("/classify", response_model=ClassificationResponse)
+async def classify_text(
+    request: ClassificationRequest,
+    token: dict = Depends(verify_token)
+):
+    """Classe une requête citoyenne (requêtes concurrentes regroupées en micro-lots)"""
+    try:
+        return await classify_batcher.submit(request.text)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Service de classification surchargé")
+    except Exception as e:
+        logger.error(f"Erreur lors de la classification du texte: {e}")
+        raise HTTPException(status_code=500, detail="Erreur lors de la classification du texte")
+
 @app.get("/health")
 async def health_check():
     """Vérification de l'état du service"""
     return {"status": "healthy"}
 
+@app.post("/models/{name}/swap")
+async def swap_model(
+    name: str,
+    request: ModelSwapRequest,
+    token: dict = Depends(verify_model_admin)
+):
+    """
+    Met en service un modèle réentraîné sans redémarrer: chargement et préchauffage
+    hors de la boucle d'événements, le modèle en cours continue de répondre jusqu'au remplacement.
+    Réservé aux administrateurs et services internes; le modèle doit se trouver sous MODEL_PATH
+    """
+    if name not in model_registry:
+        raise HTTPException(status_code=404, detail=f"Classifieur inconnu: {name}")
+    model_path = resolve_model_path(request.model_path)
+    if model_path is None:
+        raise HTTPException(status_code=400, detail="Le modèle doit se trouver sous MODEL_PATH")
+    try:
+        await asyncio.to_thread(model_registry.swap, name, model_path, request.version)
+    except Exception as e:
+        logger.error(f"Erreur lors du remplacement du modèle {name}: {e}")
+        raise HTTPException(status_code=422, detail="Échec du chargement du modèle")
+    return model_registry.status(name)
+
+@app.get("/ready")
+async def readiness_check():
+    """Disponibilité du service: ressources NLP chargées et modèles de classification prêts"""
+    classifier = model_registry.status(DEFAULT_ROUTE)
+    routes = {language: model_registry.status(language) for language in CLASSIFIER_ROUTES}
+    body = {
+        "resources": registry.loaded,
+        "analyzer_version": ANALYZER_VERSION,
+        "classifier": classifier,
+        "routes": routes,
+    }
+    ready = registry.loaded and all(
+        status["state"] == "ready" or (status["state"] == "unloaded" and not CLASSIFIER_WARMUP)
+        for status in (classifier, *routes.values())
+    )
+    body["status"] = "ready" if ready else "not_ready"
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Métriques Prometheus"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5000) 
\ No newline at end of file
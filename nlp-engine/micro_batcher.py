@@ -0,0 +1,113 @@
+"""
+Regroupement dynamique des requêtes d'inférence du moteur NLP ECHO.
+
+Chaque requête est placée dans une file; une boucle unique regroupe les
+requêtes arrivées pendant au plus max_wait_ms (et au plus max_batch requêtes)
+et les soumet au modèle en une seule passe. Le coût fixe d'une passe est
+ainsi partagé entre les requêtes concurrentes.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Ordonnanceur d'inférence par micro-lots.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[str]], List[Dict[str, Any]]],
+        max_batch: int = int(os.getenv("CLASSIFY_MAX_BATCH", "32")),
+        max_wait_ms: float = float(os.getenv("CLASSIFY_MAX_WAIT_MS", "5")),
+        max_queue_size: int = int(os.getenv("CLASSIFY_MAX_QUEUE", "1000")),
+    ):
+        """
+        Args:
+            predict_batch: Fonction d'inférence sur une liste de textes (résultats dans l'ordre)
+            max_batch: Nombre maximum de requêtes par passe
+            max_wait_ms: Attente maximum après la première requête d'un lot, en millisecondes
+            max_queue_size: Nombre maximum de requêtes en attente
+        """
+        self.predict_batch = predict_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "batches": 0, "max_batch_seen": 0}
+
+    async def start(self) -> None:
+        """Démarre la boucle de regroupement"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Micro-lots démarrés (max {self.max_batch} requêtes, attente {self.max_wait * 1000:.1f} ms)")
+
+    async def stop(self) -> None:
+        """Arrête la boucle; les requêtes en attente échouent"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        while self._queue and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Service d'inférence arrêté"))
+
+    async def submit(self, text: str) -> Dict[str, Any]:
+        """
+        Soumet un texte et attend son résultat.
+
+        Raises:
+            asyncio.QueueFull: Si la file d'attente est pleine
+        """
+        if self._queue is None:
+            raise RuntimeError("Micro-lots non démarrés")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # Requêtes abandonnées par leur client (déconnexion, délai dépassé)
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+            try:
+                # Passe unique hors de la boucle d'événements
+                results = await asyncio.to_thread(self.predict_batch, [text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Erreur d'inférence sur un lot de {len(batch)} textes: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
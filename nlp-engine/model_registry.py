@@ -0,0 +1,179 @@
+"""
+Registre des modèles de classification du moteur ECHO, avec remplacement à chaud.
+
+Un modèle réentraîné est mis en service sans redémarrer le service: le
+nouveau classifieur est construit, chargé et préchauffé à côté de l'ancien,
+qui continue de répondre. La référence est ensuite remplacée sous verrou. Les
+classifications déjà commencées terminent sur l'ancien classifieur, libéré
+dès que la dernière d'entre elles est terminée. Un classifieur n'est jamais
+rechargé en place.
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Construction d'un classifieur non chargé: factory(model_path, version)
+Factory = Callable[[str, Optional[str]], Any]
+
+
+class ModelVersion:
+    """
+    Classifieur en service (ou en cours de retrait) et nombre de classifications en cours.
+    """
+
+    def __init__(self, name: str, classifier: Any):
+        self.name = name
+        self.classifier = classifier
+        self.in_flight = 0
+        self.activated_at = time.time()
+
+    @property
+    def version(self) -> str:
+        return self.classifier.version
+
+
+class ModelRegistry:
+    """
+    Classifieurs nommés (modèle multilingue, modèles par langue), remplaçables à chaud.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Factory] = {}
+        self._paths: Dict[str, str] = {}
+        self._current: Dict[str, ModelVersion] = {}
+        self._retiring: List[ModelVersion] = []
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        # Un seul remplacement à la fois par registre (chargements coûteux en mémoire)
+        self._swap_lock = threading.Lock()
+
+    def register(self, name: str, model_path: str, factory: Factory) -> None:
+        """
+        Déclare un classifieur, construit à sa première utilisation.
+
+        Args:
+            name: Nom du classifieur
+            model_path: Chemin du modèle initial
+            factory: Construction d'un classifieur non chargé, factory(model_path, version)
+        """
+        self._factories[name] = factory
+        self._paths[name] = model_path
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def get(self, name: str) -> Any:
+        """Classifieur en service (construit à la première utilisation)"""
+        with self._lock:
+            return self._version(name).classifier
+
+    def loaded(self, name: str) -> Optional[Any]:
+        """Classifieur en service s'il a déjà été construit, None sinon"""
+        with self._lock:
+            current = self._current.get(name)
+            return current.classifier if current else None
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """
+        Classifieur en service pour la durée d'une classification: un
+        remplacement survenant pendant ce temps ne le libère qu'à la sortie.
+        """
+        with self._lock:
+            current = self._version(name)
+            current.in_flight += 1
+        try:
+            yield current.classifier
+        finally:
+            with self._lock:
+                current.in_flight -= 1
+                if current.in_flight == 0 and current in self._retiring:
+                    self._retire(current)
+
+    def swap(self, name: str, model_path: str, version: Optional[str] = None) -> ModelVersion:
+        """
+        Met en service un nouveau modèle: chargement et préchauffage à côté du
+        modèle en service, puis remplacement atomique de la référence.
+
+        Args:
+            name: Nom du classifieur
+            model_path: Chemin du nouveau modèle
+            version: Version du nouveau modèle (par défaut, celle du répertoire)
+
+        Returns:
+            La version mise en service
+
+        Raises:
+            KeyError: Classifieur non déclaré
+            RuntimeError: Échec du chargement ou du préchauffage (le modèle en service est conservé)
+        """
+        factory = self._factories[name]
+        with self._swap_lock:
+            classifier = factory(model_path, version)
+            classifier.warm_up(background=False)
+            if not classifier.ready:
+                raise RuntimeError(f"Échec du chargement du modèle {model_path}: {classifier.error}")
+
+            replacement = ModelVersion(name, classifier)
+            with self._lock:
+                previous = self._current.get(name)
+                self._current[name] = replacement
+                self._paths[name] = model_path
+                draining = previous.in_flight if previous else 0
+                if draining:
+                    self._retiring.append(previous)
+                elif previous is not None:
+                    self._retire(previous)
+            logger.info(
+                f"Modèle {name} remplacé: {previous.version if previous else None} -> {replacement.version}"
+                f" ({draining} classifications en cours sur l'ancien)"
+            )
+            return replacement
+
+    def wait_drained(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attend la fin des classifications en cours sur les modèles remplacés.
+
+        Returns:
+            True si tous les modèles remplacés sont libérés
+        """
+        with self._drained:
+            return self._drained.wait_for(lambda: not self._retiring, timeout)
+
+    def status(self, name: str) -> Dict[str, Any]:
+        """État d'un classifieur pour la sonde de disponibilité"""
+        with self._lock:
+            current = self._current.get(name)
+            classifier = current.classifier if current else None
+            return {
+                "state": classifier.state if classifier else "unloaded",
+                "model": self._paths[name],
+                "version": classifier.version if classifier else None,
+                "load_seconds": classifier.load_seconds if classifier else None,
+                "error": classifier.error if classifier else None,
+                "in_flight": current.in_flight if current else 0,
+                "activated_at": current.activated_at if current else None,
+                # Modèles remplacés attendant la fin de leurs classifications
+                "retiring": [
+                    {"version": retiring.version, "in_flight": retiring.in_flight}
+                    for retiring in self._retiring if retiring.name == name
+                ],
+            }
+
+    def _version(self, name: str) -> ModelVersion:
+        # Appelé sous self._lock
+        if name not in self._current:
+            self._current[name] = ModelVersion(name, self._factories[name](self._paths[name], None))
+        return self._current[name]
+
+    def _retire(self, version: ModelVersion) -> None:
+        # Appelé sous self._lock: la dernière référence au classifieur remplacé est abandonnée
+        if version in self._retiring:
+            self._retiring.remove(version)
+        logger.info(f"Modèle {version.name} {version.version} libéré")
+        self._drained.notify_all()
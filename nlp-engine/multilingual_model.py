@@ -4,6 +4,11 @@ Ce module utilise des modèles transformers pour analyser et classifier les requ
 citoyennes dans plusieurs langues.
 """
 
+import os
+import time
+import threading
+import unicodedata
+from collections import OrderedDict
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 from transformers import Trainer, TrainingArguments
@@ -27,28 +32,166 @@ CATEGORIES = [
     "administration",  # papiers, procédures, etc.
 ]
 
+# Moteurs d'inférence disponibles et fichiers exportés correspondants
+BACKENDS = ("pytorch", "torchscript", "onnx")
+TORCHSCRIPT_FILE = "model.torchscript.pt"
+ONNX_FILE = "model.onnx"
+# Version déclarée d'un modèle enregistré (à défaut, nom de son répertoire)
+VERSION_FILE = "VERSION"
+# Modèles dont la tête de classification ne lit que la représentation du token <s>
+# (appliquée directement à la représentation mise en cache par classify)
+FIRST_TOKEN_HEAD_MODELS = ("roberta", "xlm-roberta", "camembert")
+
+def model_version(model_path: str) -> str:
+    """Version d'un modèle: contenu de son fichier VERSION, sinon nom de son répertoire"""
+    try:
+        with open(os.path.join(model_path, VERSION_FILE), encoding="utf-8") as f:
+            version = f.read().strip()
+        if version:
+            return version
+    except OSError:
+        pass
+    return os.path.basename(os.path.normpath(model_path))
+
+def normalize_text(text: str) -> str:
+    """Forme normalisée d'un texte, clé du cache d'embeddings (casse et espaces ignorés)"""
+    return " ".join(unicodedata.normalize("NFC", text).lower().split())
+
+def configure_cpu_threads(num_threads: Optional[int] = None, interop_threads: Optional[int] = None):
+    """
+    Configure les threads de calcul de torch sur CPU.
+    
+    Args:
+        num_threads: Threads utilisés à l'intérieur d'une opération (produits matriciels)
+        interop_threads: Threads exécutant des opérations indépendantes en parallèle
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            # Ne peut être fixé qu'une fois, avant toute opération parallèle
+            logger.warning("Nombre de threads inter-opérations déjà fixé, paramètre ignoré")
+
+class _LogitsModule(torch.nn.Module):
+    """Enveloppe retournant uniquement les logits (export TorchScript et ONNX)"""
+    
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+    
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
 class MultilingualClassifier:
     """
     Classifieur multilingue basé sur XLM-RoBERTa pour catégoriser les requêtes citoyennes
     dans différentes langues.
     """
     
-    def __init__(self, model_name: str = "xlm-roberta-base", num_labels: int = len(CATEGORIES)):
+    def __init__(
+        self,
+        model_name: str = "xlm-roberta-base",
+        num_labels: int = len(CATEGORIES),
+        embedding_cache_size: int = 10000,
+        lazy: bool = True,
+        version: Optional[str] = None,
+        **options
+    ):
         """
-        Initialise le classifieur multilingue.
+        Initialise le classifieur multilingue. Le modèle est chargé à la première
+        utilisation (ou par warm_up), pas à la construction.
         
         Args:
             model_name: Nom du modèle pré-entraîné à utiliser
             num_labels: Nombre de catégories de classification
+            embedding_cache_size: Nombre maximum de textes dont les représentations sont conservées
+            lazy: Si False, le modèle est chargé immédiatement
+            version: Version du modèle reportée dans les résultats (voir model_version par défaut)
+            **options: Options d'inférence de load_model (quantize, num_threads, backend,
+                local_files_only...)
         """
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(
-            model_name,
-            num_labels=num_labels
-        )
+        if options.get("backend", "pytorch") not in BACKENDS:
+            raise ValueError(f"Moteur d'inférence inconnu: {options['backend']}")
+        self.model_name = model_name
+        self.version = version or model_version(model_name)
+        self.load_options = dict(options, num_labels=num_labels)
+        self.embedding_cache_size = embedding_cache_size
+        self.stats = {"centroid": 0, "model": 0, "cache_hits": 0}
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
-        logger.info(f"Modèle initialisé sur {self.device}")
+        self.centroids: Optional[torch.Tensor] = None
+        self.tokenizer = None
+        self.model = None
+        self.backend = options.get("backend", "pytorch")
+        self.quantized = False
+        
+        # État du modèle: "unloaded", "loading", "warming_up", "ready" ou "failed"
+        self.state = "unloaded"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._load_lock = threading.Lock()
+        if not lazy:
+            self._ensure_loaded()
+    
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+    
+    def _ensure_loaded(self):
+        """Charge le modèle au premier appel (une seule fois, même entre threads)"""
+        if self.state in ("ready", "warming_up"):
+            return
+        with self._load_lock:
+            if self.state in ("ready", "warming_up"):
+                return
+            self.state = "loading"
+            start = time.perf_counter()
+            try:
+                self.load_model(self.model_name, **self.load_options)
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                logger.error(f"Échec du chargement du modèle {self.model_name}: {e}")
+                raise
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self.state = "ready"
+    
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        Charge le modèle et exécute un lot factice pour déclencher les allocations
+        et l'initialisation des noyaux de calcul avant la première requête.
+        
+        Args:
+            background: Exécution dans un thread (le démarrage du service n'attend pas)
+            
+        Returns:
+            Le thread de préchauffage en arrière-plan, None sinon
+        """
+        def run():
+            try:
+                self._ensure_loaded()
+                with self._load_lock:
+                    self.state = "warming_up"
+                start = time.perf_counter()
+                self.batch_predict([
+                    "Préchauffage du modèle.",
+                    "Préchauffage du modèle de classification avec une phrase un peu plus longue.",
+                ] * 4)
+                self.state = "ready"
+                logger.info(f"Modèle préchauffé en {time.perf_counter() - start:.2f}s")
+            except Exception as e:
+                if self.state != "failed":
+                    self.state = "failed"
+                    self.error = str(e)
+                logger.error(f"Échec du préchauffage du modèle: {e}")
+        
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="classifier-warm-up", daemon=True)
+        thread.start()
+        return thread
         
     def train(self, dataset: Dict[str, Any], output_dir: str = "./model-output"):
         """
@@ -58,6 +201,10 @@ class MultilingualClassifier:
             dataset: Dataset d'entraînement (format transformers Dataset)
             output_dir: Répertoire où sauvegarder le modèle entraîné
         """
+        self._ensure_loaded()
+        if self.backend != "pytorch" or self.quantized:
+            raise RuntimeError("L'entraînement nécessite le modèle PyTorch non quantifié")
+        
         logger.info(f"Début de l'entraînement sur {len(dataset['train'])} exemples")
         
         # Configuration de l'entraînement
@@ -85,6 +232,9 @@ class MultilingualClassifier:
         # Entraînement du modèle
         trainer.train()
         
+        # Retour en mode inférence après l'entraînement
+        self.model.eval()
+
         # Sauvegarde du modèle final
         self.model.save_pretrained(output_dir)
         self.tokenizer.save_pretrained(output_dir)
@@ -107,100 +257,389 @@ class MultilingualClassifier:
         Returns:
             Dictionnaire contenant la catégorie prédite et le score de confiance
         """
-        # Préparation des inputs
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=512
-        ).to(self.device)
-        
-        # Prédiction
-        self.model.eval()
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
-            
-        # Conversion en probabilités
-        probs = torch.nn.functional.softmax(logits, dim=-1)
-        
-        # Obtention de la classe prédite et du score
-        predicted_class_idx = torch.argmax(probs, dim=-1).item()
-        confidence_score = probs[0, predicted_class_idx].item()
-        
-        # Construction du résultat
-        result = {
-            "category": CATEGORIES[predicted_class_idx],
-            "category_id": predicted_class_idx,
-            "confidence": confidence_score,
-            "all_scores": {
-                category: probs[0, i].item() 
-                for i, category in enumerate(CATEGORIES)
-            }
-        }
-        
+        result = self.batch_predict([text])[0]
+        del result["text"]
         return result
     
-    def batch_predict(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def batch_predict(self, texts: List[str], batch_size: int = 32, max_length: int = 512) -> List[Dict[str, Any]]:
         """
         Prédit les catégories pour une liste de requêtes.
         
+        Les textes sont triés par longueur en tokens puis traités par paquets,
+        complétés (padding) à la longueur du plus long texte du paquet seulement:
+        un texte long n'impose plus sa longueur à tous les autres, et la mémoire
+        reste bornée par la taille des paquets.
+        
         Args:
             texts: Liste des textes à classifier
+            batch_size: Nombre de textes par passe du modèle
+            max_length: Longueur maximum en tokens (au-delà, le texte est tronqué)
             
         Returns:
-            Liste de dictionnaires contenant les prédictions
-        """
-        # Préparation des inputs
-        inputs = self.tokenizer(
-            texts,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=512
-        ).to(self.device)
-        
-        # Prédiction
-        self.model.eval()
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
+            Liste de dictionnaires contenant les prédictions, dans l'ordre des textes
+        """
+        self._ensure_loaded()
+        results: List[Dict[str, Any]] = [None] * len(texts)
+        for indices, inputs in self._chunks(texts, batch_size, max_length):
+            # Prédiction
+            with torch.inference_mode():
+                logits = self._logits(inputs)
             
-        # Conversion en probabilités
+            for i, result in zip(indices, self._results_from_logits(logits)):
+                results[i] = self._with_text(result, texts[i])
+        
+        return results
+    
+    def _chunks(self, texts: List[str], batch_size: int, max_length: int):
+        """
+        Paquets de textes de longueurs voisines: (indices des textes, entrées du modèle).
+        Les textes sont tokenisés une seule fois; chaque paquet est complété à la
+        longueur de son plus long texte.
+        """
+        if not texts:
+            return
+        encodings = self.tokenizer(texts, truncation=True, max_length=max_length)
+        order = sorted(range(len(texts)), key=lambda i: len(encodings["input_ids"][i]))
+        
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            inputs = self.tokenizer.pad(
+                {key: [values[i] for i in indices] for key, values in encodings.items()},
+                return_tensors="pt"
+            ).to(self.device)
+            yield indices, inputs
+    
+    @staticmethod
+    def _results_from_logits(logits: torch.Tensor) -> List[Dict[str, Any]]:
+        """Prédictions à partir des logits, transférés en une seule fois"""
         probs = torch.nn.functional.softmax(logits, dim=-1)
+        confidences, predicted = probs.max(dim=-1)
+        return [
+            {
+                "category": CATEGORIES[class_idx],
+                "category_id": class_idx,
+                "confidence": confidence,
+                "all_scores": dict(zip(CATEGORIES, scores))
+            }
+            for scores, class_idx, confidence in zip(probs.tolist(), predicted.tolist(), confidences.tolist())
+        ]
+    
+    @staticmethod
+    def _with_text(result: Dict[str, Any], text: str) -> Dict[str, Any]:
+        return {"text": text[:50] + "..." if len(text) > 50 else text, **result}
+    
+    def _encode(self, texts: List[str], batch_size: int = 32, max_length: int = 512) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Passe de l'encodeur seul, avec cache par texte normalisé (le premier
+        texte d'origine de chaque clé est encodé).
+        
+        Returns:
+            Embeddings (moyenne des tokens, normalisée L2) et représentations du
+            token <s> utilisées par la tête de classification, dans l'ordre des textes
+        """
+        self._ensure_loaded()
+        if self.backend != "pytorch":
+            raise RuntimeError("Les embeddings nécessitent le modèle PyTorch")
+        
+        keys = [normalize_text(text) for text in texts]
+        # Texte d'origine encodé pour chaque clé absente: le modèle est sensible à la casse,
+        # la forme normalisée ne sert que de clé de cache
+        originals: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self._embedding_cache:
+                originals.setdefault(key, text)
+        missing = list(originals)
+        self.stats["cache_hits"] += len(keys) - sum(key in originals for key in keys)
+        
+        for indices, inputs in self._chunks([originals[key] for key in missing], batch_size, max_length):
+            with torch.inference_mode():
+                hidden = self.model.base_model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            embeddings = torch.nn.functional.normalize((hidden * mask).sum(1) / mask.sum(1), dim=-1)
+            for i, embedding, first_token in zip(indices, embeddings, hidden[:, 0]):
+                self._embedding_cache[missing[i]] = (embedding.cpu(), first_token.cpu())
+        
+        entries = []
+        for key in keys:
+            self._embedding_cache.move_to_end(key)
+            entries.append(self._embedding_cache[key])
+        while len(self._embedding_cache) > self.embedding_cache_size:
+            self._embedding_cache.popitem(last=False)
         
-        # Construction des résultats
-        results = []
-        for i, text_probs in enumerate(probs):
-            predicted_class_idx = torch.argmax(text_probs).item()
-            confidence_score = text_probs[predicted_class_idx].item()
+        return torch.stack([e for e, _ in entries]), torch.stack([t for _, t in entries])
+    
+    def embed(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        """
+        Embeddings de phrases (moyenne des représentations des tokens, normalisée L2).
+        
+        Args:
+            texts: Textes à représenter
+            batch_size: Nombre de textes par passe de l'encodeur
             
-            result = {
-                "text": texts[i][:50] + "..." if len(texts[i]) > 50 else texts[i],
-                "category": CATEGORIES[predicted_class_idx],
-                "category_id": predicted_class_idx,
-                "confidence": confidence_score,
-                "all_scores": {
-                    category: text_probs[j].item() 
-                    for j, category in enumerate(CATEGORIES)
-                }
-            }
-            results.append(result)
+        Returns:
+            Un vecteur par texte
+        """
+        if not texts:
+            return []
+        return self._encode(texts, batch_size)[0].tolist()
+    
+    def fit_centroids(self, texts: List[str], labels: List[str]):
+        """
+        Calcule le centroïde des embeddings de chaque catégorie.
+        
+        Args:
+            texts: Requêtes représentatives
+            labels: Catégorie de chaque requête
+        """
+        embeddings, _ = self._encode(texts)
+        centroids = torch.zeros(len(CATEGORIES), embeddings.shape[1])
+        for idx, category in enumerate(CATEGORIES):
+            rows = [i for i, label in enumerate(labels) if label == category]
+            if rows:
+                centroids[idx] = embeddings[rows].mean(0)
+        # Catégories sans exemple: centroïde nul, jamais retenu
+        self.centroids = torch.nn.functional.normalize(centroids, dim=-1)
+        logger.info(f"Centroïdes calculés sur {len(texts)} requêtes")
+    
+    def save_centroids(self, path: str):
+        """Sauvegarde les centroïdes calculés par fit_centroids"""
+        torch.save({"categories": CATEGORIES, "centroids": self.centroids}, path)
+    
+    def load_centroids(self, path: str):
+        """Charge des centroïdes sauvegardés par save_centroids"""
+        # Tenseurs et types simples uniquement: aucun objet arbitraire n'est désérialisé
+        data = torch.load(path, map_location="cpu", weights_only=True)
+        if data["categories"] != CATEGORIES:
+            raise ValueError("Les centroïdes ne correspondent pas aux catégories du classifieur")
+        self.centroids = data["centroids"]
+        logger.info(f"Centroïdes chargés depuis {path}")
+    
+    def classify(self, texts: List[str], threshold: float = 0.85, batch_size: int = 32) -> List[Dict[str, Any]]:
+        """
+        Classification avec chemin rapide par centroïdes.
+        
+        Une seule passe de l'encodeur par texte distinct, mise en cache par texte
+        normalisé: les requêtes répétées ne sollicitent plus le modèle. Un texte
+        dont la similarité cosinus au centroïde le plus proche atteint threshold
+        est classé par ce centroïde (all_scores contient alors les similarités);
+        les autres passent par la tête de classification, appliquée à la
+        représentation déjà calculée pour les modèles de la famille RoBERTa
+        (passe complète du modèle pour les autres têtes).
+        
+        Args:
+            texts: Liste des textes à classifier
+            threshold: Similarité cosinus minimum du chemin rapide
+            batch_size: Nombre de textes par passe de l'encodeur
             
+        Returns:
+            Liste de prédictions dans l'ordre des textes, avec la méthode utilisée
+        """
+        if not texts:
+            return []
+        self._ensure_loaded()
+        if self.backend != "pytorch":
+            return [dict(result, method="model") for result in self.batch_predict(texts, batch_size)]
+        
+        embeddings, first_tokens = self._encode(texts, batch_size)
+        results: List[Dict[str, Any]] = [None] * len(texts)
+        
+        fallback = list(range(len(texts)))
+        if self.centroids is not None:
+            similarities = embeddings @ self.centroids.T
+            best, best_idx = similarities.max(dim=-1)
+            fallback = []
+            for i, (scores, similarity, class_idx) in enumerate(
+                zip(similarities.tolist(), best.tolist(), best_idx.tolist())
+            ):
+                if similarity >= threshold:
+                    results[i] = self._with_text({
+                        "category": CATEGORIES[class_idx],
+                        "category_id": class_idx,
+                        "confidence": similarity,
+                        "all_scores": dict(zip(CATEGORIES, scores)),
+                        "method": "centroid"
+                    }, texts[i])
+                else:
+                    fallback.append(i)
+        
+        if fallback and self.model.config.model_type in FIRST_TOKEN_HEAD_MODELS:
+            with torch.inference_mode():
+                # La tête de classification ne lit que la représentation du token <s>
+                logits = self.model.classifier(first_tokens[fallback].unsqueeze(1).to(self.device))
+            for i, result in zip(fallback, self._results_from_logits(logits)):
+                results[i] = self._with_text(dict(result, method="model"), texts[i])
+        elif fallback:
+            # Autres têtes (BERT, DistilBERT...): passe complète du modèle
+            for i, result in zip(fallback, self.batch_predict([texts[i] for i in fallback], batch_size)):
+                results[i] = dict(result, method="model")
+        
+        self.stats["centroid"] += len(texts) - len(fallback)
+        self.stats["model"] += len(fallback)
         return results
     
-    def load_model(self, model_path: str):
+    def _logits(self, inputs) -> torch.Tensor:
+        """Passe avant du moteur d'inférence chargé"""
+        if self.backend == "onnx":
+            outputs = self.session.run(["logits"], {
+                "input_ids": inputs["input_ids"].cpu().numpy(),
+                "attention_mask": inputs["attention_mask"].cpu().numpy(),
+            })
+            return torch.from_numpy(outputs[0])
+        if self.backend == "torchscript":
+            return self.model(inputs["input_ids"], inputs["attention_mask"])
+        return self.model(**inputs).logits
+    
+    def load_model(
+        self,
+        model_path: str,
+        quantize: bool = False,
+        num_threads: Optional[int] = None,
+        interop_threads: Optional[int] = None,
+        backend: str = "pytorch",
+        num_labels: Optional[int] = None,
+        local_files_only: bool = False
+    ):
         """
         Charge un modèle pré-entraîné.
         
         Args:
             model_path: Chemin vers le modèle sauvegardé
+            quantize: Quantification dynamique int8 des couches linéaires (CPU)
+            num_threads: Threads de calcul torch (voir configure_cpu_threads)
+            interop_threads: Threads inter-opérations torch
+            backend: Moteur d'inférence: "pytorch", "torchscript" ou "onnx"
+                (modèle exporté au préalable avec export_model)
+            num_labels: Nombre de catégories, si le modèle n'en définit pas
+            local_files_only: Chargement depuis le disque uniquement (aucun accès réseau)
+            
+        Raises:
+            RuntimeError: Modèle déjà en service (les prédictions en cours utiliseraient
+                un tokenizer et un modèle remplacés sous leurs pieds): un nouveau modèle
+                est chargé dans un nouveau classifieur, voir model_registry.ModelRegistry
+        """
+        if self.state in ("ready", "warming_up"):
+            raise RuntimeError(f"Modèle {self.model_name} en service: il ne peut pas être rechargé en place")
+        if backend not in BACKENDS:
+            raise ValueError(f"Moteur d'inférence inconnu: {backend}")
+        configure_cpu_threads(num_threads, interop_threads)
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path, local_files_only=local_files_only)
+        self.backend = backend
+        self.quantized = False
+        self.session = None
+        # Représentations propres au modèle chargé
+        self._embedding_cache: "OrderedDict[str, Tuple[torch.Tensor, torch.Tensor]]" = OrderedDict()
+        
+        if backend == "onnx":
+            import onnxruntime
+            
+            session_options = onnxruntime.SessionOptions()
+            if num_threads:
+                session_options.intra_op_num_threads = num_threads
+            if interop_threads:
+                session_options.inter_op_num_threads = interop_threads
+            self.device = torch.device("cpu")
+            self.model = None
+            self.session = onnxruntime.InferenceSession(
+                os.path.join(model_path, ONNX_FILE), session_options, providers=["CPUExecutionProvider"]
+            )
+        elif backend == "torchscript":
+            self.device = torch.device("cpu")
+            self.model = torch.jit.load(os.path.join(model_path, TORCHSCRIPT_FILE), map_location="cpu")
+        else:
+            kwargs = {"num_labels": num_labels} if num_labels else {}
+            self.model = AutoModelForSequenceClassification.from_pretrained(
+                model_path, local_files_only=local_files_only, **kwargs
+            )
+            if quantize:
+                # Quantification dynamique: poids int8, activations quantifiées à la volée (CPU uniquement)
+                self.device = torch.device("cpu")
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+                self.quantized = True
+            self.model.to(self.device)
+        
+        if self.model is not None:
+            # Mode inférence fixé une fois (train() le rétablit pendant l'entraînement)
+            self.model.eval()
+        logger.info(
+            f"Modèle chargé depuis {model_path} (moteur {backend}"
+            f"{', quantifié int8' if self.quantized else ''}, {self.device})"
+        )
+    
+    def export_model(self, output_dir: str, format: str = "torchscript") -> str:
+        """
+        Exporte le modèle PyTorch chargé pour l'inférence sur CPU. Le tokenizer est
+        sauvegardé à côté: MultilingualClassifier(output_dir, backend=format) recharge l'ensemble.
+        
+        Args:
+            output_dir: Répertoire de destination
+            format: "torchscript" ou "onnx"
+            
+        Returns:
+            Chemin du fichier exporté
         """
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
-        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
+        self._ensure_loaded()
+        if self.backend != "pytorch":
+            raise RuntimeError("L'export nécessite le modèle PyTorch")
+        os.makedirs(output_dir, exist_ok=True)
+        self.tokenizer.save_pretrained(output_dir)
+        
+        module = _LogitsModule(self.model).to("cpu").eval()
+        example = self.tokenizer(["exemple d'export", "exemple"], padding=True, return_tensors="pt")
+        inputs = (example["input_ids"], example["attention_mask"])
+        
+        if format == "torchscript":
+            path = os.path.join(output_dir, TORCHSCRIPT_FILE)
+            with torch.inference_mode():
+                traced = torch.jit.trace(module, inputs, check_trace=False)
+            torch.jit.save(traced, path)
+        elif format == "onnx":
+            path = os.path.join(output_dir, ONNX_FILE)
+            torch.onnx.export(
+                module, inputs, path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=14
+            )
+        else:
+            raise ValueError(f"Format d'export inconnu: {format}")
+        
         self.model.to(self.device)
-        logger.info(f"Modèle chargé depuis {model_path}")
+        logger.info(f"Modèle exporté au format {format} dans {path}")
+        return path
+    
+    def evaluate(self, texts: List[str], labels: List[str], batch_size: int = 32) -> Dict[str, Any]:
+        """
+        Mesure l'exactitude et la latence du moteur chargé sur un jeu de validation.
+        
+        Args:
+            texts: Textes du jeu de validation
+            labels: Catégories attendues
+            batch_size: Nombre de textes par passe
+            
+        Returns:
+            Exactitude, latence moyenne par texte et débit
+        """
+        start = time.perf_counter()
+        predictions = self.batch_predict(texts, batch_size=batch_size)
+        duration = time.perf_counter() - start
+        
+        correct = sum(prediction["category"] == label for prediction, label in zip(predictions, labels))
+        return {
+            "backend": self.backend,
+            "quantized": self.quantized,
+            "texts": len(texts),
+            "accuracy": correct / len(texts) if texts else 0.0,
+            "latency_ms_per_text": duration * 1000 / len(texts) if texts else 0.0,
+            "texts_per_s": len(texts) / duration if duration else 0.0,
+        }
 
 # Exemple d'utilisation
 if __name__ == "__main__":
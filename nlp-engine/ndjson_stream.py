@@ -0,0 +1,178 @@
+"""
+Réponses NDJSON en flux du moteur NLP ECHO.
+
+Les traitements de lots volumineux (rattrapage du collecteur, retraitement)
+produisent leurs résultats au fil de l'eau, une ligne JSON par texte, au lieu
+d'un tableau construit en mémoire. Les textes peuvent eux-mêmes être lus en
+flux depuis un corps de requête NDJSON: seuls quelques paquets sont en cours
+à un instant donné, la mémoire du service ne dépend donc pas de la taille du
+lot.
+"""
+
+import json
+import asyncio
+import logging
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def iterate(texts: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    """Parcours asynchrone d'une liste ou d'un flux de textes"""
+    if hasattr(texts, "__aiter__"):
+        async for text in texts:
+            yield text
+    else:
+        for text in texts:
+            yield text
+
+class NDJSONRequestBody:
+    """
+    Textes d'un corps de requête NDJSON, lus au fil de la réception.
+    Chaque ligne est un objet {"text": ...} ou une chaîne JSON; les lignes vides sont ignorées.
+
+    Le corps est lu pendant l'envoi de la réponse: ndjson_response attend la fin
+    de la lecture (done) avant de surveiller la déconnexion du client, les deux
+    lecteurs se disputeraient sinon les messages reçus.
+    """
+
+    def __init__(self, request: Request, max_line_bytes: int = 1_000_000):
+        """
+        Args:
+            request: Requête dont le corps est lu
+            max_line_bytes: Taille maximum d'une ligne
+        """
+        self.request = request
+        self.max_line_bytes = max_line_bytes
+        self.done = asyncio.Event()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """
+        Raises:
+            ValueError: Ligne invalide ou plus longue que max_line_bytes
+        """
+        buffer = b""
+        line_number = 0
+        try:
+            async for chunk in self.request.stream():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    line_number += 1
+                    if line.strip():
+                        yield self._parse(line, line_number)
+                if len(buffer) > self.max_line_bytes:
+                    raise ValueError(f"Ligne {line_number + 1}: plus de {self.max_line_bytes} octets")
+            if buffer.strip():
+                yield self._parse(buffer, line_number + 1)
+        finally:
+            self.done.set()
+
+    @staticmethod
+    def _parse(line: bytes, line_number: int) -> str:
+        value = json.loads(line)
+        text = value.get("text") if isinstance(value, dict) else value
+        if not isinstance(text, str):
+            raise ValueError(f"Ligne {line_number}: texte attendu")
+        return text
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Réponse en flux dont le corps de requête est lu pendant l'envoi (voir NDJSONRequestBody)"""
+
+    def __init__(self, content, body: Optional[NDJSONRequestBody] = None, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body = body
+
+    async def listen_for_disconnect(self, receive) -> None:
+        if self.body is not None:
+            await self.body.done.wait()
+        await super().listen_for_disconnect(receive)
+
+
+async def ordered_chunks(
+    texts: Union[Iterable[str], AsyncIterable[str]],
+    process: Callable[[List[str]], Awaitable[List[Dict[str, Any]]]],
+    chunk_size: int,
+    max_pending: int,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Traite des textes par paquets, au plus max_pending paquets en cours, et
+    produit les résultats dans l'ordre des textes.
+
+    Args:
+        texts: Textes (liste ou flux)
+        process: Traitement d'un paquet (résultats dans l'ordre du paquet)
+        chunk_size: Nombre de textes par paquet
+        max_pending: Nombre maximum de paquets en cours de traitement
+
+    Returns:
+        Résultats, texte par texte
+    """
+    pending: deque = deque()
+    chunk: List[str] = []
+    input_error: Optional[Exception] = None
+    reader = iterate(texts).__aiter__()
+    try:
+        while True:
+            try:
+                text = await reader.__anext__()
+            except StopAsyncIteration:
+                break
+            except Exception as e:
+                # Texte illisible: les textes déjà lus sont traités avant de signaler l'erreur
+                input_error = e
+                break
+            chunk.append(text)
+            if len(chunk) < chunk_size:
+                continue
+            pending.append(asyncio.ensure_future(process(chunk)))
+            chunk = []
+            # Fenêtre pleine: le paquet le plus ancien est attendu avant de lire la suite
+            while len(pending) >= max_pending:
+                for result in await pending.popleft():
+                    yield result
+        if chunk:
+            pending.append(asyncio.ensure_future(process(chunk)))
+        while pending:
+            for result in await pending.popleft():
+                yield result
+        if input_error is not None:
+            raise input_error
+    finally:
+        # Client déconnecté ou erreur: les paquets en cours sont abandonnés
+        for future in pending:
+            future.cancel()
+
+def ndjson_response(
+    results: AsyncIterator[Dict[str, Any]],
+    error_detail: str,
+    body: Optional[NDJSONRequestBody] = None
+) -> StreamingResponse:
+    """
+    Réponse NDJSON: une ligne {"index": i, ...résultat} par texte. Les en-têtes
+    étant envoyés dès la première ligne, une erreur est signalée par une
+    dernière ligne {"index": i, "error": error_detail}.
+
+    Args:
+        results: Résultats, texte par texte
+        error_detail: Message de la ligne d'erreur
+        body: Corps NDJSON dont les textes sont lus pendant l'envoi de la réponse
+    """
+    async def lines():
+        index = 0
+        try:
+            async for result in results:
+                yield json.dumps({"index": index, **result}) + "\n"
+                index += 1
+        except Exception as e:
+            logger.error(f"Erreur lors du traitement en flux (texte {index}): {e}")
+            yield json.dumps({"index": index, "error": error_detail}) + "\n"
+
+    return NDJSONStreamingResponse(lines(), body=body, media_type=NDJSON_MEDIA_TYPE)
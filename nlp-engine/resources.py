@@ -0,0 +1,94 @@
+"""
+Registre des ressources NLP du moteur ECHO (lexique VADER, stopwords, mots-clés,
+résumés, pipeline spaCy des entités nommées).
+
+Les ressources sont chargées une seule fois, au démarrage du service, à partir
+des données NLTK installées dans l'image (NLTK_DATA): aucun téléchargement
+n'a lieu à l'exécution. Le pool d'analyse est créé après le chargement; ses
+processus, obtenus par fork, héritent des ressources sans les recharger.
+"""
+
+import os
+import time
+import logging
+from typing import Any, Callable, Dict
+
+from nltk.sentiment import SentimentIntensityAnalyzer
+from nltk.corpus import stopwords
+
+from keyword_engine import DocumentFrequencies, KeywordEngine
+from summarizer import Summarizer
+from entity_extractor import DEFAULT_LABELS, EntityExtractor
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceRegistry:
+    """
+    Ressources partagées, chargées une fois par processus.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._resources: Dict[str, Any] = {}
+        self.load_times: Dict[str, float] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """
+        Déclare une ressource.
+
+        Args:
+            name: Nom de la ressource
+            loader: Fonction de chargement, appelée une seule fois
+        """
+        self._loaders[name] = loader
+
+    def load(self) -> "ResourceRegistry":
+        """Charge toutes les ressources déclarées qui ne le sont pas encore"""
+        for name in self._loaders:
+            self._load(name)
+        logger.info(f"Ressources NLP chargées en {sum(self.load_times.values()):.2f}s: {self.load_times}")
+        return self
+
+    def get(self, name: str) -> Any:
+        """
+        Retourne une ressource, chargée à la demande si le processus ne l'a
+        pas héritée (démarrage sans lifespan, processus créés par spawn).
+        """
+        if name not in self._resources:
+            self._load(name)
+        return self._resources[name]
+
+    @property
+    def loaded(self) -> bool:
+        return all(name in self._resources for name in self._loaders)
+
+    def _load(self, name: str) -> None:
+        if name in self._resources:
+            return
+        start = time.perf_counter()
+        self._resources[name] = self._loaders[name]()
+        self.load_times[name] = round(time.perf_counter() - start, 4)
+
+
+registry = ResourceRegistry()
+registry.register("sentiment", SentimentIntensityAnalyzer)
+registry.register("stop_words", lambda: frozenset(stopwords.words('french')))
+registry.register("keywords", lambda: KeywordEngine(
+    registry.get("stop_words"),
+    DocumentFrequencies.load(
+        os.getenv("NLP_KEYWORD_STATS", os.path.join(os.getenv("MODEL_PATH", "/app/models"), "keyword_stats.json")),
+        max_terms=int(os.getenv("NLP_KEYWORD_MAX_TERMS", "100000")),
+        flush_interval=float(os.getenv("NLP_KEYWORD_FLUSH_INTERVAL", "60"))
+    )
+))
+registry.register("summarizer", lambda: Summarizer(
+    registry.get("stop_words"),
+    cache_size=int(os.getenv("NLP_SUMMARY_CACHE_SIZE", "1024"))
+))
+registry.register("entities", lambda: EntityExtractor(
+    os.getenv("SPACY_MODEL", "fr_core_news_md"),
+    labels=os.getenv("NER_LABELS", ",".join(DEFAULT_LABELS)).split(","),
+    batch_size=int(os.getenv("NER_BATCH_SIZE", "64")),
+    n_process=int(os.getenv("NER_PROCESSES", "1"))
+))
@@ -0,0 +1,207 @@
+"""
+Cache des résultats d'analyse du moteur NLP ECHO.
+
+Les relances du collecteur, les doublons et le chatbot soumettent souvent des
+textes identiques. Les résultats sont indexés par l'empreinte du texte
+normalisé et de la version de l'analyseur: un changement d'analyse invalide
+donc naturellement les entrées existantes.
+
+Deux niveaux:
+- un cache LRU en mémoire, borné et avec expiration, propre au processus;
+- un cache partagé optionnel (répertoire local ou serveur compatible Redis),
+  commun aux instances et conservé entre les redémarrages.
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import tempfile
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+# Métriques Prometheus
+CACHE_REQUESTS = Counter('nlp_cache_requests_total', 'Consultations du cache de résultats', ['result'])
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalise un texte avant le calcul de son empreinte (forme Unicode NFC,
+    espaces consécutifs réduits). La casse est conservée: VADER en tient compte.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def cache_key(text: str, version: str) -> str:
+    """Empreinte d'un texte pour une version donnée de l'analyseur"""
+    return hashlib.sha256(f"{version}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class MemoryBackend:
+    """
+    Cache LRU en mémoire avec expiration.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskBackend:
+    """
+    Cache partagé sur disque local: un fichier JSON par résultat,
+    expiré d'après sa date de modification.
+    """
+
+    def __init__(self, directory: str, ttl: float = 86400.0):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Sous-répertoires par préfixe pour limiter la taille des répertoires
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        results = []
+        now = time.time()
+        for key in keys:
+            path = self._path(key)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+                    results.append(None)
+                    continue
+                with open(path, encoding="utf-8") as f:
+                    results.append(json.load(f))
+            except (OSError, ValueError):
+                results.append(None)
+        return results
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        for key, value in items.items():
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Écriture atomique: un lecteur concurrent ne voit jamais un fichier partiel
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+
+
+class RedisBackend:
+    """
+    Cache partagé sur un serveur compatible Redis, avec expiration native.
+    """
+
+    def __init__(self, url: str, ttl: float = 86400.0, prefix: str = "nlp:analyze:", client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        values = self.client.mget([self.prefix + key for key in keys])
+        return [json.loads(value) if value is not None else None for value in values]
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(self.prefix + key, json.dumps(value), ex=int(self.ttl))
+        pipeline.execute()
+
+
+class ResultCache:
+    """
+    Cache à deux niveaux des résultats d'analyse.
+    """
+
+    def __init__(self, memory: MemoryBackend, shared=None):
+        """
+        Args:
+            memory: Cache en mémoire du processus
+            shared: Cache partagé optionnel (DiskBackend, RedisBackend)
+        """
+        self.memory = memory
+        self.shared = shared
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Résultats en cache, None pour les clés absentes.
+        Le cache partagé n'est consulté que pour les absences en mémoire.
+        """
+        results = [self.memory.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if self.shared and missing:
+            try:
+                found = await asyncio.to_thread(self.shared.get_many, [keys[i] for i in missing])
+            except Exception as e:
+                # Cache partagé indisponible: l'analyse est simplement refaite
+                logger.error(f"Erreur de lecture du cache partagé: {e}")
+                found = [None] * len(missing)
+            for i, value in zip(missing, found):
+                if value is not None:
+                    results[i] = value
+                    self.memory.set(keys[i], value)
+
+        hits = sum(result is not None for result in results)
+        CACHE_REQUESTS.labels(result="hit").inc(hits)
+        CACHE_REQUESTS.labels(result="miss").inc(len(keys) - hits)
+        return results
+
+    async def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """Enregistre des résultats dans les deux niveaux"""
+        for key, value in items.items():
+            self.memory.set(key, value)
+        if self.shared and items:
+            try:
+                await asyncio.to_thread(self.shared.set_many, items)
+            except Exception as e:
+                logger.error(f"Erreur d'écriture du cache partagé: {e}")
+
+
+def build_cache() -> ResultCache:
+    """Construit le cache à partir de la configuration (NLP_CACHE_*)"""
+    memory = MemoryBackend(
+        max_entries=int(os.getenv("NLP_CACHE_SIZE", "10000")),
+        ttl=float(os.getenv("NLP_CACHE_TTL", "3600"))
+    )
+    backend = os.getenv("NLP_CACHE_BACKEND", "memory")
+    shared_ttl = float(os.getenv("NLP_CACHE_SHARED_TTL", "86400"))
+    if backend == "disk":
+        shared = DiskBackend(os.getenv("NLP_CACHE_DIR", "/app/cache"), ttl=shared_ttl)
+    elif backend == "redis":
+        shared = RedisBackend(os.getenv("REDIS_URL", "redis://redis:6379"), ttl=shared_ttl)
+    else:
+        shared = None
+    return ResultCache(memory, shared)
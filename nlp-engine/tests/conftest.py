@@ -0,0 +1,79 @@
+import pytest
+import os
+import sys
+from fastapi.testclient import TestClient
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multilingual_model import CATEGORIES
+
+VOCABULARY = [
+    "<pad>", "<s>", "</s>", "<unk>", "<mask>",
+    "lampadaire", "cassé", "rue", "poubelle", "pollution", "police", "urgence",
+    "logement", "aide", "papiers", "mairie", "bus", "retard", "trottoir", "bruit",
+]
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory):
+    """Petit modèle XLM-RoBERTa aléatoire enregistré localement (aucun téléchargement)"""
+    import torch
+    from tokenizers import Tokenizer, models, pre_tokenizers
+    from transformers import PreTrainedTokenizerFast, XLMRobertaConfig, XLMRobertaForSequenceClassification
+
+    torch.manual_seed(0)
+    tokenizer = Tokenizer(models.WordLevel({word: i for i, word in enumerate(VOCABULARY)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    fast_tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, pad_token="<pad>", unk_token="<unk>",
+        bos_token="<s>", eos_token="</s>", mask_token="<mask>"
+    )
+    config = XLMRobertaConfig(
+        vocab_size=len(VOCABULARY), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=32, max_position_embeddings=520, num_labels=len(CATEGORIES), pad_token_id=0
+    )
+
+    path = tmp_path_factory.mktemp("tiny-xlmr")
+    fast_tokenizer.save_pretrained(path)
+    XLMRobertaForSequenceClassification(config).save_pretrained(path)
+    return str(path)
+
+
+def fake_analyze_many(texts):
+    return [{"sentiment_score": 0.0, "keywords": [], "entities": [], "summary": text} for text in texts]
+
+
+@pytest.fixture
+def analyze_many():
+    """Analyse exécutée par le pool du client de test (redéfinie par les modules qui en ont besoin)"""
+    return fake_analyze_many
+
+
+@pytest.fixture
+def service_overrides():
+    """Autres attributs de main remplacés pour le client de test ({nom: valeur})"""
+    return {}
+
+
+@pytest.fixture
+def client(monkeypatch, analyze_many, service_overrides):
+    """Client du service, sans données NLTK ni préchauffage du modèle, authentification désactivée"""
+    import main
+    from resources import ResourceRegistry
+    from worker_pool import AnalysisPool
+
+    # Données NLTK absentes de l'environnement de test: registre vide
+    monkeypatch.setattr(main, "registry", ResourceRegistry())
+    monkeypatch.setattr(main, "CLASSIFIER_WARMUP", False)
+    monkeypatch.setattr(main, "analysis_pool", AnalysisPool(analyze_many, workers=0, chunk_size=2))
+    for name, value in service_overrides.items():
+        monkeypatch.setattr(main, name, value)
+    # Classifieurs construits d'après la configuration éventuellement remplacée
+    monkeypatch.setattr(main, "model_registry", main.build_model_registry())
+    main.app.dependency_overrides[main.verify_token] = lambda: {"valid": True, "email": "test@echo.fr"}
+    try:
+        with TestClient(main.app) as client:
+            yield client
+    finally:
+        main.app.dependency_overrides.clear()
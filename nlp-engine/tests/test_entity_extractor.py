@@ -0,0 +1,57 @@
+import pytest
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entity_extractor import EntityExtractor
+
+
+@pytest.fixture(scope="module")
+def pipeline_dir(tmp_path_factory):
+    """Pipeline spaCy à règles enregistré localement (aucun modèle à télécharger)"""
+    import spacy
+
+    nlp = spacy.blank("fr")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns([
+        {"label": "LOC", "pattern": "Lyon"},
+        {"label": "ORG", "pattern": "Mairie de Lyon"},
+        {"label": "PER", "pattern": "Jean Dupont"},
+    ])
+    nlp.add_pipe("sentencizer")
+    path = tmp_path_factory.mktemp("spacy-fr")
+    nlp.to_disk(path)
+    return str(path)
+
+
+def test_unneeded_components_are_excluded(pipeline_dir):
+    extractor = EntityExtractor(pipeline_dir)
+    assert "sentencizer" not in extractor.nlp.pipe_names
+    assert "street_ruler" in extractor.nlp.pipe_names
+
+
+def test_extracts_streets_places_and_organizations(pipeline_dir):
+    extractor = EntityExtractor(pipeline_dir)
+    text = "Jean Dupont signale un lampadaire cassé au 12 bis rue des Lilas à Lyon, la Mairie de Lyon est prévenue."
+
+    entities = extractor.extract(text)
+
+    assert [(entity["text"], entity["label"]) for entity in entities] == [
+        ("12 bis rue des Lilas", "STREET"), ("Lyon", "LOC"), ("Mairie de Lyon", "ORG")
+    ]
+    # Les personnes ne sont pas retournées par défaut
+    assert all(entity["label"] != "PER" for entity in entities)
+    assert text[entities[0]["start"]:entities[0]["end"]] == "12 bis rue des Lilas"
+
+
+def test_batch_extraction_keeps_text_order(pipeline_dir):
+    extractor = EntityExtractor(pipeline_dir, labels=["STREET"], batch_size=2)
+    texts = ["Trou avenue de la République", "Rien à signaler", "Poubelles place Bellecour", "Lyon"]
+
+    results = extractor.extract_many(texts)
+
+    assert [[entity["text"] for entity in entities] for entities in results] == [
+        ["avenue de la République"], [], ["place Bellecour"], []
+    ]
@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_engine import DocumentFrequencies, KeywordEngine
+
+STOP_WORDS = frozenset({"le", "la", "de", "du", "est", "en", "dans", "depuis", "une", "des"})
+
+
+def test_common_words_rank_below_rare_words():
+    engine = KeywordEngine(STOP_WORDS, DocumentFrequencies())
+    engine.extract_many([
+        "La mairie doit réparer la rue",
+        "La mairie ne répond pas, la rue est sale",
+        "Rue bloquée, la mairie est prévenue",
+    ])
+
+    keywords = engine.extract("Mairie, rue, mairie: lampadaire cassé dans la rue", num_keywords=2)
+
+    # "mairie" et "rue" sont plus fréquents dans le texte, mais présents dans tous les textes
+    assert keywords == ["lampadaire", "cassé"]
+
+
+def test_batch_extraction_updates_frequencies_once_per_text():
+    stats = DocumentFrequencies()
+    engine = KeywordEngine(STOP_WORDS, stats)
+
+    results = engine.extract_many(["bus bus retard", "bus bondé", "12 l'éclairage"], num_keywords=3)
+
+    assert stats.documents == 3
+    assert stats.counts["bus"] == 2
+    # Nombres, lettres isolées et mots vides ne sont pas des mots-clés
+    assert results[2] == ["éclairage"]
+    assert results[0][0] == "bus"
+
+
+def test_extraction_without_update_leaves_frequencies_unchanged():
+    stats = DocumentFrequencies()
+    KeywordEngine(STOP_WORDS, stats).extract("trottoir dégradé", update=False)
+    assert stats.documents == 0 and len(stats) == 0
+
+
+def test_frequencies_are_bounded():
+    stats = DocumentFrequencies(max_terms=2)
+    stats.update([["a", "b", "c"], ["a", "b"], ["a"]])
+    # Élagage amorti: jusqu'à 2 × max_terms mots en mémoire
+    assert len(stats) == 3
+
+    stats.update([["d", "e"]])
+    assert len(stats) == 2
+    assert set(stats.counts) == {"a", "b"}
+
+
+def test_saved_frequencies_keep_max_terms(tmp_path):
+    path = str(tmp_path / "keyword_stats.json")
+    stats = DocumentFrequencies.load(path, max_terms=2)
+    stats.update([["a", "b", "c"], ["a", "b"], ["a"]])
+    stats.flush()
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["counts"] == {"a": 3, "b": 2}
+    assert len(stats) == 2
+
+
+def test_processes_merge_their_increments_on_flush(tmp_path):
+    path = str(tmp_path / "keyword_stats.json")
+    first = DocumentFrequencies.load(path, max_terms=10)
+    second = DocumentFrequencies.load(path, max_terms=10)
+
+    first.update([["bus", "retard"]])
+    second.update([["bus"], ["poubelle"]])
+    first.flush()
+    second.flush()
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["documents"] == 3
+    assert data["counts"] == {"bus": 2, "retard": 1, "poubelle": 1}
+    # Le dernier processus enregistré a repris les totaux fusionnés
+    assert second.documents == 3 and second.counts["bus"] == 2
+
+    # Un nouveau processus démarre avec les statistiques enregistrées
+    restarted = DocumentFrequencies.load(path)
+    assert restarted.documents == 3
+    assert restarted.idf("bus") < restarted.idf("retard") < restarted.idf("inconnu")
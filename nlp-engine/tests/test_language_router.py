@@ -0,0 +1,102 @@
+import pytest
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_detector import LanguageDetector, UNKNOWN_LANGUAGE, build_detector
+from language_router import DEFAULT_ROUTE, LanguageRouter, parse_routes
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return build_detector()
+
+
+@pytest.mark.parametrize("text,language", [
+    ("Le lampadaire de ma rue est cassé depuis hier soir", "fr"),
+    ("The street light in front of my house is broken", "en"),
+    ("La farola de mi calle está rota desde ayer", "es"),
+    ("Die Laterne vor meinem Haus ist kaputt", "de"),
+    ("Mon voisin fait trop de bruit la nuit", "fr"),
+    ("My neighbour is too loud at night", "en"),
+])
+def test_detects_language(detector, text, language):
+    detected, confidence = detector.detect(text)
+    assert detected == language
+    assert confidence > 0.9
+
+
+def test_text_without_letters_is_unknown(detector):
+    assert detector.detect("12 / 34 !") == (UNKNOWN_LANGUAGE, 0.0)
+
+
+def test_profiles_roundtrip(detector, tmp_path):
+    path = str(tmp_path / "profiles.json")
+    detector.save(path)
+    loaded = LanguageDetector.load(path)
+
+    texts = ["Les poubelles débordent", "The bins are full", "Los contenedores están llenos"]
+    assert loaded.detect_many(texts) == detector.detect_many(texts)
+
+
+def test_parse_routes():
+    assert parse_routes("fr=/models/fr, EN = /models/en") == {"fr": "/models/fr", "en": "/models/en"}
+    assert parse_routes("") == {}
+    with pytest.raises(ValueError):
+        parse_routes("fr")
+
+
+def test_router_sends_each_language_to_its_model(detector):
+    calls = {}
+
+    def model(name):
+        def classify(texts):
+            calls[name] = list(texts)
+            return [{"category": name} for _ in texts]
+        return classify
+
+    router = LanguageRouter(detector, default=model(DEFAULT_ROUTE), routes={"fr": model("fr")})
+    texts = [
+        "Le bus est encore en retard ce matin",
+        "The bus is late again this morning",
+        "Les poubelles débordent devant la mairie",
+        "El autobús llega tarde otra vez",
+    ]
+    results = router.classify(texts)
+
+    # Une passe par modèle, résultats dans l'ordre des textes
+    assert calls == {"fr": [texts[0], texts[2]], DEFAULT_ROUTE: [texts[1], texts[3]]}
+    assert [result["category"] for result in results] == ["fr", DEFAULT_ROUTE, "fr", DEFAULT_ROUTE]
+    assert [result["language"] for result in results] == ["fr", "en", "fr", "es"]
+
+
+def test_uncertain_language_goes_to_default_model(detector):
+    router = LanguageRouter(
+        detector,
+        default=lambda texts: [{"category": DEFAULT_ROUTE} for _ in texts],
+        routes={"fr": lambda texts: [{"category": "fr"} for _ in texts]},
+        min_confidence=1.1
+    )
+    assert router.classify(["Le bus est encore en retard"])[0]["category"] == DEFAULT_ROUTE
+
+
+@pytest.fixture
+def service_overrides(tiny_model_dir):
+    return {"CLASSIFIER_MODEL": tiny_model_dir, "CLASSIFIER_ROUTES": {"fr": tiny_model_dir}}
+
+
+def test_classify_endpoint_routes_by_language(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main.language_router, "routes", {"fr": lambda texts: main.classify_monolingual("fr", texts)})
+    french = client.post("/classify", json={"text": "Le lampadaire de la rue est cassé"})
+    english = client.post("/classify", json={"text": "The street light is broken"})
+
+    assert french.status_code == 200 and english.status_code == 200
+    assert french.json()["language"] == "fr"
+    assert english.json()["language"] == "en"
+    # Le texte français a chargé le modèle monolingue, l'anglais le modèle multilingue
+    assert main.model_registry.loaded("fr") is not None
+    assert main.model_registry.loaded(DEFAULT_ROUTE) is not None
@@ -0,0 +1,117 @@
+import pytest
+import asyncio
+import os
+import sys
+import time
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from micro_batcher import MicroBatcher
+from language_router import DEFAULT_ROUTE
+
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    def predict(texts):
+        batches.append(list(texts))
+        return [{"category": text.upper()} for text in texts]
+
+    batcher = MicroBatcher(predict, max_batch=4, max_wait_ms=50)
+
+    async def scenario():
+        await batcher.start()
+        results = await asyncio.gather(*(batcher.submit(f"texte {i}") for i in range(10)))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert [result["category"] for result in results] == [f"TEXTE {i}" for i in range(10)]
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_wait_is_bounded():
+    batcher = MicroBatcher(lambda texts: [{} for _ in texts], max_batch=64, max_wait_ms=20)
+
+    async def scenario():
+        await batcher.start()
+        start = time.perf_counter()
+        await batcher.submit("seul")
+        elapsed = time.perf_counter() - start
+        await batcher.stop()
+        return elapsed
+
+    assert asyncio.run(scenario()) < 0.5
+
+
+def test_errors_fail_the_whole_batch():
+    def predict(texts):
+        raise ValueError("modèle indisponible")
+
+    batcher = MicroBatcher(predict, max_wait_ms=10)
+
+    async def scenario():
+        await batcher.start()
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+        await batcher.stop()
+        return results
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(scenario()))
+
+
+def test_full_queue_is_rejected():
+    batcher = MicroBatcher(lambda texts: [{} for _ in texts], max_queue_size=1)
+
+    async def scenario():
+        batcher._queue = asyncio.Queue(maxsize=1)
+        batcher._queue.put_nowait(("a", asyncio.get_running_loop().create_future()))
+        with pytest.raises(asyncio.QueueFull):
+            await batcher.submit("b")
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def service_overrides(tiny_model_dir):
+    return {"CLASSIFIER_MODEL": tiny_model_dir}
+
+
+def test_classify_endpoint(client):
+    from multilingual_model import CATEGORIES
+
+    response = client.post("/classify", json={"text": "lampadaire cassé rue"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["category"] in CATEGORIES
+    assert set(data["all_scores"]) == set(CATEGORIES)
+    assert abs(sum(data["all_scores"].values()) - 1) < 1e-4
+
+
+def test_readiness_reports_model_state(client):
+    import main
+
+    assert client.get("/ready").json()["classifier"]["state"] == "unloaded"
+    main.model_registry.get(DEFAULT_ROUTE).warm_up(background=True)
+    for _ in range(100):
+        response = client.get("/ready")
+        if response.status_code == 200:
+            break
+        time.sleep(0.05)
+
+    assert response.status_code == 200
+    assert response.json()["classifier"]["state"] == "ready"
+
+
+def test_readiness_reports_missing_model(client, monkeypatch, tmp_path):
+    import main
+
+    monkeypatch.setattr(main, "CLASSIFIER_MODEL", str(tmp_path / "absent"))
+    monkeypatch.setattr(main, "model_registry", main.build_model_registry())
+    main.model_registry.get(DEFAULT_ROUTE).warm_up(background=False)
+    response = client.get("/ready")
+
+    assert response.status_code == 503
+    assert response.json()["classifier"]["state"] == "failed"
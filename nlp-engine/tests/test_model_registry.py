@@ -0,0 +1,186 @@
+import pytest
+import os
+import sys
+import shutil
+import threading
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model_registry import ModelRegistry
+from multilingual_model import MultilingualClassifier, VERSION_FILE, model_version
+
+
+class FakeClassifier:
+    """Classifieur factice: chargement immédiat, classification éventuellement bloquée"""
+
+    def __init__(self, model_path, version=None, fail=False):
+        self.model_name = model_path
+        self.version = version or os.path.basename(model_path)
+        self.state = "unloaded"
+        self.error = None
+        self.load_seconds = None
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+        self.started = threading.Event()
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def warm_up(self, background=True):
+        if self.fail:
+            self.state, self.error = "failed", "modèle illisible"
+        else:
+            self.state = "ready"
+
+    def classify(self, texts):
+        self.started.set()
+        self.release.wait(5)
+        return [{"category": "infrastructure", "model": self.model_name} for _ in texts]
+
+
+def fake_registry(**options):
+    models = ModelRegistry()
+    models.register("multilingual", "/models/v1", lambda path, version: FakeClassifier(path, version, **options))
+    return models
+
+
+def test_swap_replaces_current_model():
+    models = fake_registry()
+    assert models.get("multilingual").version == "v1"
+
+    swapped = models.swap("multilingual", "/models/v2")
+
+    assert swapped.version == "v2"
+    assert models.get("multilingual").version == "v2"
+    assert models.status("multilingual")["model"] == "/models/v2"
+
+
+def test_replaced_model_drains_in_flight_calls():
+    models = fake_registry()
+    old = models.get("multilingual")
+    old.release.clear()
+    results = []
+
+    def classify():
+        with models.use("multilingual") as classifier:
+            results.append(classifier.classify(["texte"])[0]["model"])
+
+    worker = threading.Thread(target=classify)
+    worker.start()
+    assert old.started.wait(5)
+
+    models.swap("multilingual", "/models/v2")
+    # La classification en cours garde l'ancien modèle, les suivantes ont le nouveau
+    assert models.status("multilingual")["retiring"] == [{"version": "v1", "in_flight": 1}]
+    assert not models.wait_drained(timeout=0.01)
+    with models.use("multilingual") as classifier:
+        assert classifier.version == "v2"
+
+    old.release.set()
+    worker.join(5)
+    assert models.wait_drained(timeout=5)
+    assert results == ["/models/v1"]
+    assert models.status("multilingual")["retiring"] == []
+
+
+def test_failed_swap_keeps_current_model():
+    models = ModelRegistry()
+    models.register("multilingual", "/models/v1",
+                    lambda path, version: FakeClassifier(path, version, fail=path.endswith("v2")))
+    models.get("multilingual").warm_up()
+
+    with pytest.raises(RuntimeError):
+        models.swap("multilingual", "/models/v2")
+
+    assert models.get("multilingual").version == "v1"
+    assert models.status("multilingual")["state"] == "ready"
+
+
+def test_model_version_from_file(tmp_path):
+    assert model_version(str(tmp_path / "classifier-2024-06")) == "classifier-2024-06"
+    (tmp_path / VERSION_FILE).write_text("3.1\n")
+    assert model_version(str(tmp_path)) == "3.1"
+
+
+def test_loaded_model_is_not_reloaded_in_place(tiny_model_dir):
+    classifier = MultilingualClassifier(model_name=tiny_model_dir, lazy=False)
+
+    with pytest.raises(RuntimeError):
+        classifier.load_model(tiny_model_dir)
+
+
+@pytest.fixture
+def versioned_models(tmp_path, tiny_model_dir):
+    """Deux versions du petit modèle, dans deux répertoires"""
+    paths = {}
+    for version in ("v1", "v2"):
+        path = tmp_path / f"classifier-{version}"
+        shutil.copytree(tiny_model_dir, path)
+        (path / VERSION_FILE).write_text(version)
+        paths[version] = str(path)
+    return paths
+
+
+@pytest.fixture
+def service_overrides(versioned_models, tmp_path):
+    return {"CLASSIFIER_MODEL": versioned_models["v1"], "MODEL_PATH": str(tmp_path)}
+
+
+@pytest.fixture
+def admin(client):
+    """Requêtes authentifiées par un token administrateur"""
+    import main
+    main.app.dependency_overrides[main.verify_token] = lambda: {"valid": True, "email": "admin@echo.fr", "role": "admin"}
+
+
+def test_classify_requests_during_swap(client, admin, versioned_models):
+    assert client.post("/classify", json={"text": "lampadaire cassé"}).json()["model_version"] == "v1"
+
+    swap = {}
+    # Chemin relatif à MODEL_PATH
+    swapper = threading.Thread(target=lambda: swap.update(
+        response=client.post("/models/multilingual/swap", json={"model_path": "classifier-v2"})
+    ))
+    swapper.start()
+    versions = []
+    while swapper.is_alive() or not versions:
+        response = client.post("/classify", json={"text": "poubelle rue"})
+        assert response.status_code == 200
+        versions.append(response.json()["model_version"])
+    swapper.join()
+
+    assert swap["response"].status_code == 200
+    assert swap["response"].json()["version"] == "v2"
+    assert set(versions) <= {"v1", "v2"}
+    assert client.post("/classify", json={"text": "bus retard"}).json()["model_version"] == "v2"
+
+    ready = client.get("/ready").json()
+    assert ready["classifier"]["version"] == "v2"
+    assert ready["classifier"]["state"] == "ready"
+    assert "analyzer_version" in ready
+
+
+def test_failed_swap_endpoint(client, admin, tmp_path):
+    client.post("/classify", json={"text": "lampadaire cassé"})
+
+    response = client.post("/models/multilingual/swap", json={"model_path": str(tmp_path / "absent")})
+    assert response.status_code == 422
+    assert client.get("/ready").json()["classifier"]["version"] == "v1"
+    assert client.post("/models/inconnu/swap", json={"model_path": "x"}).status_code == 404
+
+
+def test_swap_requires_admin_role(client, versioned_models):
+    response = client.post("/models/multilingual/swap", json={"model_path": versioned_models["v2"]})
+
+    assert response.status_code == 403
+    assert client.get("/ready").json()["classifier"]["model"] == versioned_models["v1"]
+
+
+@pytest.mark.parametrize("model_path", ["/etc", "../autre-modele", "classifier-v1/../../autre-modele"])
+def test_swap_rejects_paths_outside_model_path(client, admin, model_path):
+    response = client.post("/models/multilingual/swap", json={"model_path": model_path})
+
+    assert response.status_code == 400
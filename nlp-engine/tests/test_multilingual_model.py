@@ -0,0 +1,196 @@
+import pytest
+import os
+import sys
+import shutil
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from multilingual_model import MultilingualClassifier, CATEGORIES
+
+TEXTS = [
+    "lampadaire cassé rue",
+    "bus",
+    "poubelle pollution " * 40,
+    "police urgence",
+    "logement aide papiers mairie " * 10,
+    "trottoir bruit",
+    "retard",
+]
+
+
+@pytest.fixture(scope="module")
+def classifier(tiny_model_dir):
+    return MultilingualClassifier(model_name=tiny_model_dir)
+
+
+def test_batch_predict_matches_individual_predictions(classifier):
+    results = classifier.batch_predict(TEXTS, batch_size=2)
+
+    assert len(results) == len(TEXTS)
+    for text, result in zip(TEXTS, results):
+        single = classifier.predict(text)
+        assert result["category"] == single["category"]
+        assert result["confidence"] == pytest.approx(single["confidence"], abs=1e-5)
+        for category in CATEGORIES:
+            assert result["all_scores"][category] == pytest.approx(single["all_scores"][category], abs=1e-5)
+
+
+def test_batch_predict_keeps_input_order(classifier):
+    results = classifier.batch_predict(TEXTS, batch_size=3)
+
+    assert [result["text"] for result in results] == [text[:50] + "..." if len(text) > 50 else text for text in TEXTS]
+
+
+def test_long_texts_are_truncated(classifier):
+    results = classifier.batch_predict(["rue " * 2000, "bus"], max_length=512)
+
+    assert len(results) == 2
+    assert sum(results[0]["all_scores"].values()) == pytest.approx(1.0, abs=1e-4)
+
+
+def test_empty_input(classifier):
+    assert classifier.batch_predict([]) == []
+
+
+def test_quantized_model_stays_close_to_fp32(classifier, tiny_model_dir):
+    quantized = MultilingualClassifier(model_name=tiny_model_dir, quantize=True, num_threads=1, lazy=False)
+
+    assert quantized.quantized
+    for text in TEXTS:
+        expected = classifier.predict(text)["all_scores"]
+        scores = quantized.predict(text)["all_scores"]
+        for category in CATEGORIES:
+            assert scores[category] == pytest.approx(expected[category], abs=0.05)
+
+
+def test_torchscript_export_round_trip(classifier, tmp_path):
+    classifier.export_model(str(tmp_path), format="torchscript")
+    scripted = MultilingualClassifier(model_name=str(tmp_path), backend="torchscript")
+
+    for expected, result in zip(classifier.batch_predict(TEXTS, batch_size=3), scripted.batch_predict(TEXTS, batch_size=3)):
+        assert result["category"] == expected["category"]
+        assert result["confidence"] == pytest.approx(expected["confidence"], abs=1e-4)
+
+    with pytest.raises(RuntimeError):
+        scripted.train({"train": [], "validation": []})
+
+
+def test_onnx_export_round_trip(classifier, tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    classifier.export_model(str(tmp_path), format="onnx")
+    exported = MultilingualClassifier(model_name=str(tmp_path), backend="onnx")
+
+    for expected, result in zip(classifier.batch_predict(TEXTS), exported.batch_predict(TEXTS)):
+        assert result["confidence"] == pytest.approx(expected["confidence"], abs=1e-4)
+
+
+def test_evaluate_reports_accuracy_and_latency(classifier):
+    labels = [result["category"] for result in classifier.batch_predict(TEXTS)]
+    report = classifier.evaluate(TEXTS, labels)
+
+    assert report["accuracy"] == 1.0
+    assert report["texts"] == len(TEXTS)
+    assert report["latency_ms_per_text"] > 0
+
+
+def test_unknown_backend(tiny_model_dir):
+    with pytest.raises(ValueError):
+        MultilingualClassifier(model_name=tiny_model_dir, backend="tensorrt")
+
+
+def test_embeddings_are_normalized_and_cached(tiny_model_dir):
+    classifier = MultilingualClassifier(model_name=tiny_model_dir, embedding_cache_size=3)
+
+    first = classifier.embed(["Lampadaire  cassé rue", "bus"])
+    again = classifier.embed(["lampadaire cassé rue"])
+
+    assert again[0] == pytest.approx(first[0])
+    assert sum(value * value for value in first[1]) == pytest.approx(1.0, abs=1e-5)
+    assert classifier.stats["cache_hits"] == 1
+
+    classifier.embed(["police", "logement", "papiers"])
+    assert len(classifier._embedding_cache) == 3
+
+
+def test_classify_without_centroids_matches_batch_predict(tiny_model_dir):
+    classifier = MultilingualClassifier(model_name=tiny_model_dir)
+
+    for expected, result in zip(classifier.batch_predict(TEXTS), classifier.classify(TEXTS, batch_size=2)):
+        assert result["method"] == "model"
+        assert result["category"] == expected["category"]
+        assert result["confidence"] == pytest.approx(expected["confidence"], abs=1e-5)
+
+
+def test_classify_encodes_original_case(tiny_model_dir):
+    classifier = MultilingualClassifier(model_name=tiny_model_dir)
+    # Le tokenizer distingue la casse: "Lampadaire" et "Rue" sont des mots inconnus
+    cased, lowered = classifier.classify(["Lampadaire cassé Rue", "lampadaire cassé rue"])
+
+    expected = classifier.batch_predict(["Lampadaire cassé Rue"])[0]
+    assert cased["all_scores"] == pytest.approx(expected["all_scores"], abs=1e-5)
+    assert expected["all_scores"] != pytest.approx(classifier.batch_predict(["lampadaire cassé rue"])[0]["all_scores"], abs=1e-5)
+    # Même clé de cache: seul le premier texte d'origine a été encodé
+    assert lowered["all_scores"] == cased["all_scores"]
+
+
+@pytest.fixture(scope="module")
+def tiny_bert_dir(tiny_model_dir, tmp_path_factory):
+    """Petit modèle BERT aléatoire (tête de classification sur la sortie poolée)"""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification
+
+    torch.manual_seed(0)
+    path = tmp_path_factory.mktemp("tiny-bert") / "model"
+    shutil.copytree(tiny_model_dir, path)
+    config = BertConfig(
+        vocab_size=30, hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=32, num_labels=len(CATEGORIES), pad_token_id=0
+    )
+    BertForSequenceClassification(config).save_pretrained(path)
+    return str(path)
+
+
+def test_classify_with_other_classification_heads(tiny_bert_dir):
+    classifier = MultilingualClassifier(model_name=tiny_bert_dir)
+    classifier.fit_centroids(["police urgence"], ["securite"])
+
+    results = classifier.classify(TEXTS, threshold=0.999, batch_size=2)
+
+    assert results[3]["method"] == "centroid"
+    for text, expected, result in zip(TEXTS, classifier.batch_predict(TEXTS), results):
+        if result["method"] == "model":
+            assert result["text"] == expected["text"]
+            assert result["all_scores"] == pytest.approx(expected["all_scores"], abs=1e-5)
+
+
+def test_centroid_fast_path(tiny_model_dir, tmp_path):
+    classifier = MultilingualClassifier(model_name=tiny_model_dir)
+    examples = ["lampadaire cassé rue", "police urgence", "logement aide"]
+    labels = ["infrastructure", "securite", "social"]
+    classifier.fit_centroids(examples, labels)
+
+    results = classifier.classify(examples + ["trottoir bruit retard"], threshold=0.999)
+
+    assert [result["category"] for result in results[:3]] == labels
+    assert [result["method"] for result in results[:3]] == ["centroid"] * 3
+    assert results[3]["method"] == "model"
+    assert classifier.stats["centroid"] == 3
+
+    path = str(tmp_path / "centroids.pt")
+    classifier.save_centroids(path)
+    reloaded = MultilingualClassifier(model_name=tiny_model_dir)
+    reloaded.load_centroids(path)
+    assert reloaded.classify(["police urgence"], threshold=0.999)[0]["category"] == "securite"
+
+
+def test_model_is_loaded_lazily(tiny_model_dir):
+    classifier = MultilingualClassifier(model_name=tiny_model_dir, local_files_only=True)
+    assert classifier.state == "unloaded"
+
+    classifier.warm_up(background=False)
+
+    assert classifier.ready
+    assert classifier.load_seconds is not None
+    assert classifier.predict("bus")["category"] in CATEGORIES
@@ -0,0 +1,108 @@
+import pytest
+import os
+import sys
+import json
+import asyncio
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ndjson_stream import ordered_chunks
+from micro_batcher import MicroBatcher
+
+
+def fake_classify(texts):
+    return [
+        {"text": text, "category": "infrastructure", "category_id": 0, "confidence": 1.0,
+         "all_scores": {"infrastructure": 1.0}, "method": "model", "language": "fr"}
+        for text in texts
+    ]
+
+
+def test_ordered_chunks_bounds_pending_work():
+    in_flight = []
+    peak = []
+
+    async def process(chunk):
+        in_flight.append(chunk)
+        peak.append(len(in_flight))
+        # Les paquets les plus récents se terminent en premier
+        await asyncio.sleep(0.01 / (len(in_flight)))
+        in_flight.remove(chunk)
+        return [text.upper() for text in chunk]
+
+    async def texts():
+        for i in range(20):
+            yield f"t{i}"
+
+    async def collect():
+        return [result async for result in ordered_chunks(texts(), process, chunk_size=3, max_pending=2)]
+
+    assert asyncio.run(collect()) == [f"T{i}" for i in range(20)]
+    assert max(peak) <= 2
+
+
+def test_ordered_chunks_propagates_errors():
+    async def process(chunk):
+        raise ValueError("échec")
+
+    async def collect():
+        return [result async for result in ordered_chunks(["a", "b"], process, chunk_size=1, max_pending=2)]
+
+    with pytest.raises(ValueError):
+        asyncio.run(collect())
+
+
+@pytest.fixture
+def service_overrides():
+    return {"classify_batcher": MicroBatcher(fake_classify, max_batch=4, max_wait_ms=1)}
+
+
+def ndjson(response):
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_analyze_stream_reads_ndjson_body(client):
+    texts = [f"texte {i}" for i in range(7)]
+    body = "\n".join(json.dumps({"text": text}) for text in texts[:-1]) + "\n\n" + json.dumps(texts[-1])
+
+    lines = ndjson(client.post("/analyze/stream", content=body.encode(),
+                               headers={"Content-Type": "application/x-ndjson"}))
+
+    assert [(line["index"], line["summary"]) for line in lines] == list(enumerate(texts))
+
+
+def test_invalid_line_ends_stream_with_error(client):
+    lines = ndjson(client.post("/analyze/stream", content=b'{"text": "un"}\n{"texte": 2}\n'))
+    assert lines[-1] == {"index": 1, "error": "Erreur lors de l'analyse du texte"}
+
+
+def test_classify_streams(client):
+    texts = [f"demande {i}" for i in range(10)]
+
+    batch = ndjson(client.post("/classify/batch/stream", json={"texts": texts}))
+    streamed = ndjson(client.post("/classify/stream", content="\n".join(json.dumps(text) for text in texts).encode()))
+
+    assert batch == streamed
+    assert [line["index"] for line in batch] == list(range(10))
+    assert batch[0]["language"] == "fr" and "text" not in batch[0]
+
+
+def test_ordered_chunks_processes_texts_read_before_input_error():
+    async def texts():
+        yield "un"
+        yield "deux"
+        raise ValueError("ligne invalide")
+
+    async def process(chunk):
+        return [{"text": text} for text in chunk]
+
+    async def collect():
+        results = []
+        with pytest.raises(ValueError):
+            async for result in ordered_chunks(texts(), process, chunk_size=4, max_pending=2):
+                results.append(result["text"])
+        return results
+
+    assert asyncio.run(collect()) == ["un", "deux"]
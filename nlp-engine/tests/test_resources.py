@@ -0,0 +1,36 @@
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resources import ResourceRegistry
+
+
+def test_resources_are_loaded_once():
+    calls = []
+    registry = ResourceRegistry()
+    registry.register("lexique", lambda: calls.append("lexique") or {"bon": 1.0})
+    registry.register("stopwords", lambda: calls.append("stopwords") or frozenset({"le", "la"}))
+
+    assert not registry.loaded
+    registry.load()
+    registry.load()
+
+    assert registry.loaded
+    assert calls == ["lexique", "stopwords"]
+    assert registry.get("lexique") == {"bon": 1.0}
+    assert set(registry.load_times) == {"lexique", "stopwords"}
+
+
+def test_resources_are_loaded_on_demand():
+    calls = []
+    registry = ResourceRegistry()
+    registry.register("lexique", lambda: calls.append("lexique") or {})
+    registry.register("stopwords", lambda: calls.append("stopwords") or frozenset())
+
+    registry.get("stopwords")
+    registry.get("stopwords")
+
+    assert calls == ["stopwords"]
+    assert not registry.loaded
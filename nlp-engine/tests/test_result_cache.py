@@ -0,0 +1,100 @@
+import pytest
+import asyncio
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from result_cache import ResultCache, MemoryBackend, DiskBackend, RedisBackend, cache_key
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+
+    def execute(self):
+        pass
+
+
+def test_cache_key_normalizes_whitespace_and_version():
+    assert cache_key("Rue  en\tpanne ", "1") == cache_key("Rue en panne", "1")
+    assert cache_key("Rue en panne", "1") != cache_key("Rue en panne", "2")
+    assert cache_key("Rue en panne", "1") != cache_key("RUE EN PANNE", "1")
+
+
+def test_memory_backend_lru_and_ttl(monkeypatch):
+    memory = MemoryBackend(max_entries=2, ttl=10)
+    memory.set("a", {"v": 1})
+    memory.set("b", {"v": 2})
+    memory.get("a")
+    memory.set("c", {"v": 3})
+
+    assert memory.get("b") is None
+    assert memory.get("a") == {"v": 1}
+
+    import result_cache
+    now = result_cache.time.monotonic()
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: now + 11)
+    assert memory.get("a") is None
+
+
+@pytest.mark.parametrize("make_shared", [
+    lambda tmp_path: DiskBackend(str(tmp_path)),
+    lambda tmp_path: RedisBackend("redis://test", client=FakeRedis()),
+])
+def test_shared_backend_fills_memory(tmp_path, make_shared):
+    shared = make_shared(tmp_path)
+    first = ResultCache(MemoryBackend(), shared)
+    second = ResultCache(MemoryBackend(), shared)
+
+    async def scenario():
+        await first.set_many({"k1": {"sentiment_score": 0.5}})
+        return await second.get_many(["k1", "k2"])
+
+    assert asyncio.run(scenario()) == [{"sentiment_score": 0.5}, None]
+    assert second.memory.get("k1") == {"sentiment_score": 0.5}
+
+
+def counting_analyze_many(texts):
+    counting_analyze_many.calls.append(list(texts))
+    return [{"sentiment_score": 0.0, "keywords": [], "entities": [], "summary": text} for text in texts]
+
+
+@pytest.fixture
+def analyze_many():
+    counting_analyze_many.calls = []
+    return counting_analyze_many
+
+
+@pytest.fixture
+def service_overrides():
+    return {"result_cache": ResultCache(MemoryBackend())}
+
+
+def test_repeated_analyses_are_served_from_cache(client):
+    for _ in range(3):
+        assert client.post("/analyze", json={"text": "Rue en panne"}).json()["summary"] == "Rue en panne"
+    assert counting_analyze_many.calls == [["Rue en panne"]]
+
+    client.post("/analyze", json={"text": "Rue en panne"}, headers={"X-Cache-Bypass": "1"})
+    assert len(counting_analyze_many.calls) == 2
+
+
+def test_batch_analyzes_only_missing_distinct_texts(client):
+    client.post("/analyze", json={"text": "a"})
+
+    response = client.post("/analyze/batch", json={"texts": ["a", "b", "b", "c"]})
+
+    assert [result["summary"] for result in response.json()["results"]] == ["a", "b", "b", "c"]
+    assert counting_analyze_many.calls == [["a"], ["b", "c"]]
+    assert "nlp_cache_requests_total" in client.get("/metrics").text
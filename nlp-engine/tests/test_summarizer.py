@@ -0,0 +1,67 @@
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from summarizer import Summarizer, split_sentences
+
+REPORT = (
+    "Bonjour. Le lampadaire de la rue Victor Hugo est en panne depuis lundi. "
+    "La rue Victor Hugo est très sombre la nuit sans lampadaire. "
+    "Mon chat adore les croquettes au saumon. "
+    "Les habitants de la rue ont peur de rentrer à pied le soir."
+)
+
+
+def test_split_sentences():
+    assert split_sentences("Première phrase. Deuxième ! Troisième ?\nQuatrième") == [
+        "Première phrase.", "Deuxième !", "Troisième ?", "Quatrième"
+    ]
+    assert split_sentences("   ") == []
+
+
+def test_summary_keeps_central_sentences_in_order():
+    summary = Summarizer().summarize(REPORT, max_length=130)
+
+    assert len(summary) <= 130
+    assert "lampadaire" in summary
+    assert "croquettes" not in summary
+    assert summary.index("panne") < summary.index("sombre")
+
+
+def test_summarize_many_matches_individual_summaries():
+    texts = [REPORT, "", "Une seule phrase.", "Bus en retard. Le bus 12 est en retard tous les matins. Merci."]
+    summarizer = Summarizer(cache_size=0)
+
+    batch = summarizer.summarize_many(texts, max_length=80)
+
+    assert batch == [summarizer.summarize(text, max_length=80) for text in texts]
+    assert batch[1] == ""
+    assert batch[2] == "Une seule phrase."
+
+
+def test_long_sentence_is_truncated():
+    summary = Summarizer().summarize("mot " * 100, max_length=50)
+    assert len(summary) <= 50 and summary.endswith("...")
+
+
+def test_cluster_summary_skips_redundant_reports():
+    reports = [
+        "Inondation rue de la Gare, l'eau monte dans les caves.",
+        "Inondation rue de la Gare, l'eau monte dans les caves !",
+        "Les pompiers sont attendus rue de la Gare pour pomper l'eau des caves.",
+    ]
+    summary = Summarizer().summarize_cluster(reports, max_length=300)
+
+    assert summary.count("Inondation") == 1
+    assert "pompiers" in summary
+
+
+def test_summaries_are_cached():
+    summarizer = Summarizer()
+    first = summarizer.summarize_groups([[REPORT], ["Autre rapport. Encore une phrase."]])
+    second = summarizer.summarize_groups([[REPORT]])
+
+    assert second == first[:1]
+    assert summarizer.stats == {"hits": 1, "misses": 2}
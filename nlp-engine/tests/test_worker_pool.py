@@ -0,0 +1,74 @@
+import pytest
+import asyncio
+import json
+import os
+import sys
+
+# Ajout du répertoire parent au PYTHONPATH
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from worker_pool import AnalysisPool
+
+
+def fake_analyze_many(texts):
+    return [
+        {"sentiment_score": float(len(text)), "keywords": [text], "entities": [], "summary": text, "pid": os.getpid()}
+        for text in texts
+    ]
+
+
+def failing_analyze_many(texts):
+    raise ValueError("analyse impossible")
+
+
+def run_pool(pool, coroutine_factory):
+    async def scenario():
+        pool.start()
+        try:
+            return await coroutine_factory()
+        finally:
+            pool.stop()
+    return asyncio.run(scenario())
+
+
+def test_map_preserves_order_across_processes():
+    pool = AnalysisPool(fake_analyze_many, workers=2, chunk_size=3)
+    texts = [f"texte {i}" * (i % 4 + 1) for i in range(20)]
+
+    results = run_pool(pool, lambda: pool.map(texts))
+
+    assert [result["summary"] for result in results] == texts
+    assert all(result["pid"] != os.getpid() for result in results)
+
+
+def test_errors_are_propagated():
+    pool = AnalysisPool(failing_analyze_many, workers=0)
+
+    with pytest.raises(ValueError):
+        run_pool(pool, lambda: pool.map(["texte"]))
+
+
+def test_pool_must_be_started():
+    with pytest.raises(RuntimeError):
+        asyncio.run(AnalysisPool(fake_analyze_many).map(["texte"]))
+
+
+@pytest.fixture
+def analyze_many():
+    return fake_analyze_many
+
+
+def test_analyze_batch_endpoint(client):
+    response = client.post("/analyze/batch", json={"texts": ["un", "deux", "trois"]})
+    assert response.status_code == 200
+    assert [result["summary"] for result in response.json()["results"]] == ["un", "deux", "trois"]
+
+    assert client.post("/analyze/batch", json={"texts": []}).status_code == 422
+
+
+def test_analyze_batch_stream_endpoint(client):
+    response = client.post("/analyze/batch/stream", json={"texts": ["un", "deux", "trois"]})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["index"], line["summary"]) for line in lines] == [(0, "un"), (1, "deux"), (2, "trois")]
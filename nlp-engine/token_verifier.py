@@ -0,0 +1,187 @@
+"""
+Vérification locale des tokens JWT émis par le service d'authentification.
+
+Les tokens sont validés sans appel réseau à /verify:
+- secret partagé (JWT_SECRET) pour les algorithmes HS*;
+- clés publiques publiées par le service d'authentification
+  (/.well-known/jwks.json), mises en cache et rafraîchies périodiquement.
+
+Un petit cache positif/négatif indexé par le jti évite de revalider
+la signature d'un token déjà vu.
+
+Ce module est dupliqué à l'identique dans chaque service
+(data-collector, nlp-engine, alert-system, api-gateway).
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+from jose import JWTError, jwt
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVerifier:
+    """
+    Vérificateur de tokens JWT avec clés et résultats en cache.
+    """
+
+    def __init__(
+        self,
+        auth_service_url: str = os.getenv("AUTH_SERVICE_URL", "http://auth-service:5003"),
+        secret: Optional[str] = os.getenv("JWT_SECRET"),
+        algorithms: Optional[List[str]] = None,
+        jwks_refresh_interval: float = float(os.getenv("JWKS_REFRESH_INTERVAL", "300")),
+        cache_size: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+        cache_ttl: float = float(os.getenv("TOKEN_CACHE_TTL", "300")),
+        negative_ttl: float = float(os.getenv("TOKEN_NEGATIVE_CACHE_TTL", "30")),
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            auth_service_url: URL du service d'authentification (publication des clés)
+            secret: Secret partagé des algorithmes HS*
+            algorithms: Algorithmes acceptés (JWT_ALGORITHM par défaut)
+            jwks_refresh_interval: Durée de validité des clés publiques en cache, en secondes
+            cache_size: Nombre maximum de tokens en cache
+            cache_ttl: Durée maximum de mise en cache d'un token valide
+            negative_ttl: Durée de mise en cache d'un token rejeté
+            transport: Transport httpx alternatif (tests)
+        """
+        self.auth_service_url = auth_service_url.rstrip("/")
+        self.secret = secret
+        self.algorithms = algorithms or [os.getenv("JWT_ALGORITHM", "HS256")]
+        self.jwks_refresh_interval = jwks_refresh_interval
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = negative_ttl
+        self.transport = transport
+
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._keys_expire_at = 0.0
+        self._refreshed_at = float("-inf")
+        self._keys_lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        # jti -> (empreinte du token, expiration du cache, claims ou None si rejeté)
+        self._cache: "OrderedDict[str, Tuple[str, float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "jwks_refreshes": 0}
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Vérifie un token et retourne la même réponse que /verify du service d'authentification.
+
+        Raises:
+            HTTPException: 401 si le token est invalide, 503 si aucune clé n'est disponible
+        """
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        key = self._cache_key(token, digest)
+        now = time.monotonic()
+
+        cached = self._cache.get(key)
+        if cached and cached[0] == digest and cached[1] > now:
+            self._cache.move_to_end(key)
+            self.stats["hits"] += 1
+            if cached[2] is None:
+                raise HTTPException(status_code=401, detail="Token invalide")
+            return cached[2]
+        self.stats["misses"] += 1
+
+        try:
+            claims = jwt.decode(token, await self._key_for(token), algorithms=self.algorithms)
+            email = claims.get("sub")
+            if email is None:
+                raise JWTError("claim sub manquant")
+        except JWTError:
+            self._remember(key, digest, now + self.negative_ttl, None)
+            raise HTTPException(status_code=401, detail="Token invalide")
+
+        result = {"valid": True, "email": email}
+        if "role" in claims:
+            # Rôle de l'utilisateur (admin, user) ou d'un service appelant
+            result["role"] = claims["role"]
+        ttl = self.cache_ttl
+        if "exp" in claims:
+            # Un token n'est jamais servi depuis le cache après son expiration
+            ttl = min(ttl, claims["exp"] - time.time())
+        self._remember(key, digest, now + ttl, result)
+        return result
+
+    async def close(self) -> None:
+        """Ferme le client HTTP de récupération des clés"""
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def _cache_key(self, token: str, digest: str) -> str:
+        try:
+            jti = jwt.get_unverified_claims(token).get("jti")
+        except JWTError:
+            jti = None
+        # Tokens sans jti (émis avant son introduction): indexés par empreinte
+        return f"jti:{jti}" if jti else f"sha256:{digest}"
+
+    def _remember(self, key: str, digest: str, expires_at: float, result: Optional[Dict[str, Any]]) -> None:
+        self._cache[key] = (digest, expires_at, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _key_for(self, token: str):
+        """Clé de vérification du token: secret partagé ou clé publique désignée par kid"""
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg", "")
+
+        if algorithm.startswith("HS"):
+            if not self.secret:
+                raise JWTError("aucun secret partagé configuré")
+            return self.secret
+
+        kid = header.get("kid")
+        if time.monotonic() >= self._keys_expire_at:
+            await self._refresh_keys()
+        elif kid not in self._keys:
+            # Clé inconnue: rotation possible côté service d'authentification
+            await self._refresh_keys(force=True)
+
+        if kid in self._keys:
+            return self._keys[kid]
+        if kid is None and len(self._keys) == 1:
+            return next(iter(self._keys.values()))
+        raise JWTError(f"clé inconnue: {kid}")
+
+    async def _refresh_keys(self, force: bool = False) -> None:
+        async with self._keys_lock:
+            now = time.monotonic()
+            # Une autre requête a déjà rafraîchi les clés pendant l'attente du verrou
+            if now < self._keys_expire_at and not force:
+                return
+            # Rafraîchissements forcés limités à un toutes les 10 secondes
+            if force and now < self._refreshed_at + 10:
+                return
+            self._refreshed_at = now
+
+            if self._client is None:
+                self._client = httpx.AsyncClient(base_url=self.auth_service_url, timeout=5.0, transport=self.transport)
+            try:
+                response = await self._client.get("/.well-known/jwks.json")
+                response.raise_for_status()
+                keys = response.json().get("keys", [])
+            except (httpx.HTTPError, ValueError) as e:
+                logger.error(f"Erreur lors de la récupération des clés d'authentification: {e}")
+                if not self._keys:
+                    raise HTTPException(status_code=503, detail="Clés d'authentification indisponibles")
+                # Les clés précédentes restent utilisées jusqu'à la prochaine tentative
+                self._keys_expire_at = now + min(self.jwks_refresh_interval, 30)
+                return
+
+            self._keys = {key.get("kid"): key for key in keys}
+            self._keys_expire_at = now + self.jwks_refresh_interval
+            self.stats["jwks_refreshes"] += 1
+            logger.info(f"{len(self._keys)} clés d'authentification chargées")
@@ -0,0 +1,79 @@
+"""
+Pool de processus d'analyse du moteur NLP ECHO.
+Les analyses (VADER, tokenisation, résumé) sont coûteuses en CPU: elles sont
+exécutées hors de la boucle d'événements, dans un pool dimensionné au nombre
+de cœurs, par paquets de textes pour amortir le coût des échanges entre processus.
+"""
+
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional
+
+from analyzer import analyze_many
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisPool:
+    """
+    Exécute une fonction d'analyse par lots dans un pool de processus.
+    """
+
+    def __init__(
+        self,
+        analyze_batch: Callable[[List[str]], List[Dict[str, Any]]] = analyze_many,
+        workers: int = int(os.getenv("NLP_WORKERS", str(os.cpu_count() or 1))),
+        chunk_size: int = int(os.getenv("NLP_CHUNK_SIZE", "16")),
+    ):
+        """
+        Args:
+            analyze_batch: Fonction de niveau module analysant une liste de textes
+            workers: Nombre de processus (0: un thread, sans processus dédié)
+            chunk_size: Nombre de textes envoyés à un processus en une fois
+        """
+        self.analyze_batch = analyze_batch
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        """Crée le pool (les processus héritent des ressources déjà chargées)"""
+        if self.workers > 0:
+            # fork: les processus partagent les ressources chargées par le processus parent
+            context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            # Création immédiate des processus, avant le chargement d'autres modèles (torch)
+            self._executor.submit(os.getpid).result()
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        logger.info(f"Pool d'analyse démarré ({self.workers} processus, paquets de {self.chunk_size} textes)")
+
+    def stop(self) -> None:
+        """Arrête le pool après les analyses en cours"""
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _submit(self, texts: List[str]) -> List[asyncio.Future]:
+        if self._executor is None:
+            raise RuntimeError("Pool d'analyse non démarré")
+        loop = asyncio.get_running_loop()
+        return [
+            loop.run_in_executor(self._executor, self.analyze_batch, texts[i:i + self.chunk_size])
+            for i in range(0, len(texts), self.chunk_size)
+        ]
+
+    async def map(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyse des textes en parallèle.
+
+        Returns:
+            Résultats dans l'ordre des textes
+        """
+        results = []
+        for chunk in await asyncio.gather(*self._submit(texts)):
+            results.extend(chunk)
+        return results